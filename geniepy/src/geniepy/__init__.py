@@ -29,13 +29,16 @@ def run_predictions():
     for records in daomgr.gen_records(chunksize):
         predicted_df = classmgr.predict(records)
         daomgr.save_predictions(predicted_df)
+    # Close the gaps of the pubmed table for the next predictions
+    if config.get_efetch_enabled():
+        daomgr.fetch_missing_pubmeds(chunksize)
 
 
 def update_tables():
     """Call scrapes to download data and create/append tables."""
     daomgr: DaoManager = config.get_daomgr()
-    chunksize = config.get_classmgr()
-    daomgr.download(chunksize)
+    chunksize = config.get_chunksize()
+    daomgr.download(chunksize, config.get_pipeline(), config.get_ctd_delta())
 
 
 def run():
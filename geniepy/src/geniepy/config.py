@@ -4,13 +4,24 @@ GeniePy Configuration Module.
 This module is intended to provide functions that interprets content from the
 package configuration file and generate the corresponding python objects.
 """
+from functools import partial
 from pathlib import Path
 import yaml
 from geniepy.errors import ConfigError
 import geniepy.datamgmt.daos as daos
 import geniepy.datamgmt.repositories as dr
-from geniepy.datamgmt.tables import PUBMED_PROPTY, CTD_PROPTY, CLSFR_PROPTY
+from geniepy.datamgmt.tables import (  # pylint: disable=bad-continuation
+    PUBMED_PROPTY,
+    CTD_PROPTY,
+    CTD_COMPACT_PROPTY,
+    CLSFR_PROPTY,
+    CLSFR_COMPACT_PROPTY,
+)
 from geniepy.datamgmt import DaoManager
+from geniepy.datamgmt.cache import RawCache
+from geniepy.datamgmt.connections import REGISTRY, ConnectionRegistry
+from geniepy.datamgmt.pipeline import Pipeline
+from geniepy.datamgmt.scrapers import CtdScraper, EfetchScraper, PubMedScraper
 from geniepy.classmgmt import ClassificationMgr
 from geniepy.classmgmt.classifiers import Classifier
 from geniepy.classmgmt.classifiers import PCPCLSFR_NAME, CTCLSFR_NAME
@@ -32,10 +43,87 @@ def get_chunksize() -> int:
     return int(configdict["chunksize"])
 
 
-def get_daomgr() -> DaoManager:
-    """Configure data mgmt subsystem."""
-    # TODO Retrieve from config file
+def get_pipeline() -> Pipeline:
+    """Retrieve download pipeline stages configuration."""
+    configdict = read_yaml()
+    pipeline = configdict.get("pipeline", {})
+    return Pipeline(
+        parse_workers=int(pipeline.get("parse_workers", 2)),
+        queue_size=int(pipeline.get("queue_size", 4)),
+        ordered=bool(pipeline.get("ordered", True)),
+    )
+
+
+def get_raw_cache() -> RawCache:
+    """Retrieve raw artifacts cache, None if not configured."""
+    configdict = read_yaml()
+    cache = configdict.get("cache") or {}
+    if not cache.get("path"):
+        return None
+    max_size_mb = cache.get("max_size_mb")
+    max_bytes = int(max_size_mb * 1e6) if max_size_mb else None
+    return RawCache(str(Path(cache["path"]).expanduser()), max_bytes)
+
+
+def get_connection_registry() -> ConnectionRegistry:
+    """Configure pool sizes of the registry of connections shared by repositories."""
+    configdict = read_yaml()
+    connections = configdict.get("connections") or {}
+    REGISTRY.pool_size = int(connections.get("pool_size", REGISTRY.pool_size))
+    REGISTRY.max_overflow = int(connections.get("max_overflow", REGISTRY.max_overflow))
+    return REGISTRY
+
+
+def get_ctd_scraper() -> CtdScraper:
+    """Retrieve CTD release scraper configuration."""
+    configdict = read_yaml()
+    ctd = configdict.get("ctd", {})
+    source = ctd.get("source") or CtdScraper.DEFAULT_SOURCE
+    if "://" not in source:
+        source = str(Path(source).expanduser())
+    state = ctd.get("state")
+    state_path = str(Path(state).expanduser()) if state else None
+    return CtdScraper(source, state_path, get_raw_cache())
+
+
+def get_ctd_delta() -> bool:
+    """Retrieve whether CTD downloads only write changed records."""
+    configdict = read_yaml()
+    return bool(configdict.get("ctd", {}).get("delta", False))
+
+
+def get_pubmed_scraper() -> PubMedScraper:
+    """Retrieve PubMed local mirror scraper configuration."""
     configdict = read_yaml()
+    pubmed = configdict.get("pubmed", {})
+    mirror = pubmed.get("mirror")
+    mirror_path = str(Path(mirror).expanduser()) if mirror else None
+    manifest = pubmed.get("manifest")
+    manifest_path = str(Path(manifest).expanduser()) if manifest else None
+    return PubMedScraper(mirror_path, manifest_path, pubmed.get("engine"))
+
+
+def get_efetch_scraper() -> EfetchScraper:
+    """Retrieve E-utilities efetch scraper configuration."""
+    configdict = read_yaml()
+    efetch = configdict.get("efetch", {})
+    rate = efetch.get("rate")
+    return EfetchScraper(
+        api_keys=efetch.get("api_keys") or [],
+        url=efetch.get("url") or EfetchScraper.EFETCH_URL,
+        rate=float(rate) if rate else None,
+        cache=get_raw_cache(),
+    )
+
+
+def get_efetch_enabled() -> bool:
+    """Retrieve whether missing PubMed articles are fetched after predictions."""
+    configdict = read_yaml()
+    return bool(configdict.get("efetch", {}).get("enabled", True))
+
+
+def _gbq_repositories(configdict: dict):
+    """Retrieve BigQuery repositories factory, and whether keys are compact."""
     credentials_file = Path(configdict["gbq"]["credentials"]).expanduser()
     credentials_path = Path.cwd().joinpath(credentials_file).resolve()
     if not credentials_path.exists():
@@ -45,18 +133,54 @@ def get_daomgr() -> DaoManager:
     # Google BigQuery Project Name
     projname = configdict["gbq"]["proj"]
     dataset = configdict["gbq"]["dataset"]
-    # Construct
-    ctd_dao = daos.CtdDao(
-        dr.GbqRepository(projname, CTD_PROPTY, dataset, credentials_path)
-    )
-    pubmed_dao = daos.PubMedDao(
-        dr.GbqRepository(projname, PUBMED_PROPTY, dataset, credentials_path)
+    # Repositories share credentials and client
+    registry = get_connection_registry()
+    repository = partial(
+        dr.GbqRepository,
+        projname,
+        dataset=dataset,
+        credentials=credentials_path,
+        registry=registry,
     )
-    classifier_dao = daos.ClassifierDao(
-        dr.GbqRepository(projname, CLSFR_PROPTY, dataset, credentials_path)
+    return repository, bool(configdict["gbq"].get("compact_keys", False))
+
+
+def _parquet_repositories(configdict: dict):
+    """Retrieve Parquet repositories factory, and whether keys are compact."""
+    parquet = configdict.get("parquet") or {}
+    if not parquet.get("root"):
+        raise ConfigError("Parquet tables root directory not set")
+    root = str(Path(parquet["root"]).expanduser())
+    return (
+        partial(dr.ParquetRepository, root),
+        bool(parquet.get("compact_keys", False)),
     )
+
+
+def get_daomgr() -> DaoManager:
+    """Configure data mgmt subsystem on the configured storage backend."""
+    configdict = read_yaml()
+    backend = configdict.get("backend") or "gbq"
+    if backend == "gbq":
+        repository, compact = _gbq_repositories(configdict)
+    elif backend == "parquet":
+        repository, compact = _parquet_repositories(configdict)
+    else:
+        raise ConfigError(f"Unknown storage backend {backend}")
+    # Tables keyed by compact integer digests instead of hex digests
+    ctd_propty = CTD_COMPACT_PROPTY if compact else CTD_PROPTY
+    clsfr_propty = CLSFR_COMPACT_PROPTY if compact else CLSFR_PROPTY
+    ctd_dao_cls = daos.CompactCtdDao if compact else daos.CtdDao
+    clsfr_dao_cls = daos.CompactClassifierDao if compact else daos.ClassifierDao
+    # Construct
+    ctd_dao = ctd_dao_cls(repository(ctd_propty), get_ctd_scraper())
+    pubmed_dao = daos.PubMedDao(repository(PUBMED_PROPTY), get_pubmed_scraper())
+    classifier_dao = clsfr_dao_cls(repository(clsfr_propty))
     daomgr = DaoManager(
-        ctd_dao=ctd_dao, pubmed_dao=pubmed_dao, classifier_dao=classifier_dao
+        ctd_dao=ctd_dao,
+        pubmed_dao=pubmed_dao,
+        classifier_dao=classifier_dao,
+        efetch_scraper=get_efetch_scraper(),
     )
     return daomgr
 
@@ -0,0 +1,258 @@
+"""
+Content addressed local cache of raw source artifacts.
+
+Artifacts (i.e. CTD releases, PubMed article sets, E-utilities responses) are stored
+once under the sha256 digest of their content, and found through references from
+logical keys, i.e. the url and ETag of a download or the PMIDs of a request:
+    <root>/objects/3f/3fa9...  content, named after its sha256 digest
+    <root>/refs/9b/9bc1....json  key reference: digest, size and metadata
+
+Every file is written to a temporary file first and atomically renamed, so readers,
+including other processes, never see partial artifacts. Objects are checked against
+their digest when read, and the least recently used ones are evicted once the cache
+grows beyond its max size. The cache keeps a running total of the size of the
+objects it writes, the cache directory is only walked once the total goes beyond
+the max size, so writes don't scan the cache.
+"""
+from typing import BinaryIO, Iterable
+import hashlib
+import json
+import os
+import tempfile
+
+BLOCK_SIZE = 1 << 20
+"""Size of blocks copied and hashed at a time."""
+
+
+class RawCache:
+    """Size bounded content addressed cache of raw artifacts."""
+
+    __slots__ = ["root", "max_bytes", "_size"]
+
+    def __init__(self, root: str, max_bytes: int = None):
+        """
+        Initialize cache in root directory, created on first write.
+
+        Arguments:
+            root {str} -- Path to cache directory
+
+        Keyword Arguments:
+            max_bytes {int} -- Max total size of objects, unbounded if None
+                (default: {None})
+        """
+        self.root = root
+        """Path to cache directory."""
+        self.max_bytes = max_bytes
+        """Max total size of cached objects."""
+        self._size = None
+
+    @staticmethod
+    def key_digest(key: str) -> str:
+        """Digest of logical key, naming its reference file."""
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def object_path(self, sha256: str) -> str:
+        """Path of object with given content digest."""
+        return os.path.join(self.root, "objects", sha256[:2], sha256)
+
+    def _ref_path(self, key: str) -> str:
+        """Path of reference of logical key."""
+        digest = self.key_digest(key)
+        return os.path.join(self.root, "refs", digest[:2], digest + ".json")
+
+    def _replace(self, tmp_path: str, path: str):
+        """Atomically move temporary file into place."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+
+    def _tmp_file(self):
+        """Create temporary file in cache, on the same filesystem as its targets."""
+        tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+
+    @staticmethod
+    def checksum(path: str) -> str:
+        """Compute sha256 digest of file content."""
+        sha = hashlib.sha256()
+        with open(path, "rb") as cached_file:
+            for block in iter(lambda: cached_file.read(BLOCK_SIZE), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def lookup(self, key: str) -> dict:
+        """
+        Find reference of logical key.
+
+        Arguments:
+            key {str} -- The logical key
+
+        Returns:
+            dict -- The key's object digest, size and metadata, None if missing
+        """
+        try:
+            with open(self._ref_path(key)) as ref_file:
+                ref = json.load(ref_file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not os.path.exists(self.object_path(ref["sha256"])):
+            return None  # Evicted
+        return ref
+
+    def get(self, key: str, verify: bool = True) -> str:
+        """
+        Find path of object referenced by logical key, marking it as recently used.
+
+        Arguments:
+            key {str} -- The logical key
+
+        Keyword Arguments:
+            verify {bool} -- Check object content against its digest, corrupt
+                objects are deleted and reported missing (default: {True})
+
+        Returns:
+            str -- Path of cached object, None if missing
+        """
+        ref = self.lookup(key)
+        if ref is None:
+            return None
+        path = self.object_path(ref["sha256"])
+        try:
+            if verify and self.checksum(path) != ref["sha256"]:
+                os.remove(path)
+                self._size = None  # Recomputed by next write
+                return None
+            os.utime(path)
+        except FileNotFoundError:
+            return None  # Evicted meanwhile
+        return path
+
+    def get_bytes(self, key: str, verify: bool = True) -> bytes:
+        """Read object referenced by logical key, None if missing."""
+        path = self.get(key, verify)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as cached_file:
+                return cached_file.read()
+        except FileNotFoundError:
+            return None
+
+    def put_stream(self, key: str, stream: BinaryIO, meta: dict = None) -> str:
+        """
+        Cache content of binary stream under logical key.
+
+        Arguments:
+            key {str} -- The logical key
+            stream {BinaryIO} -- Stream read until exhausted
+
+        Keyword Arguments:
+            meta {dict} -- JSON serializable metadata kept in reference
+                (default: {None})
+
+        Returns:
+            str -- Path of cached object
+        """
+        return self.put_blocks(key, iter(lambda: stream.read(BLOCK_SIZE), b""), meta)
+
+    def put_bytes(self, key: str, data: bytes, meta: dict = None) -> str:
+        """Cache bytes under logical key, returning path of cached object."""
+        return self.put_blocks(key, [data], meta)
+
+    def put_blocks(self, key: str, blocks: Iterable[bytes], meta: dict = None) -> str:
+        """Cache blocks of bytes under logical key, returning path of cached object."""
+        sha = hashlib.sha256()
+        size = 0
+        with self._tmp_file() as tmp_file:
+            try:
+                for block in blocks:
+                    sha.update(block)
+                    size += len(block)
+                    tmp_file.write(block)
+            except BaseException:
+                tmp_file.close()
+                os.remove(tmp_file.name)
+                raise
+        sha256 = sha.hexdigest()
+        path = self.object_path(sha256)
+        if os.path.exists(path):
+            # Same content already cached under another key
+            os.remove(tmp_file.name)
+            os.utime(path)
+        else:
+            self._replace(tmp_file.name, path)
+            if self._size is not None:
+                self._size += size
+        ref = {"key": key, "sha256": sha256, "size": size, "meta": meta or {}}
+        with self._tmp_file() as ref_file:
+            ref_file.write(json.dumps(ref).encode())
+        self._replace(ref_file.name, self._ref_path(key))
+        if self.max_bytes is not None:
+            if self._size is None:
+                self.size()
+            if self._size > self.max_bytes:
+                self.evict(keep=sha256)
+        return path
+
+    def size(self) -> int:
+        """Total size of cached objects, also resetting the running total."""
+        self._size = sum(size for _, size, _ in self._objects())
+        return self._size
+
+    def _objects(self) -> [(float, int, str)]:
+        """List access time, size and path of cached objects."""
+        objects = []
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, "objects")):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                objects.append((stat.st_mtime, stat.st_size, path))
+        return objects
+
+    def evict(self, keep: str = None):
+        """
+        Delete least recently used objects until cache fits in its max size.
+
+        The references of evicted objects are deleted along with them. The running
+        total is reset to the size of the remaining objects, including the objects
+        written by other processes meanwhile.
+
+        Keyword Arguments:
+            keep {str} -- Digest of object never evicted, i.e. just cached
+                (default: {None})
+        """
+        if self.max_bytes is None:
+            return
+        objects = sorted(self._objects())
+        total = sum(size for _, size, _ in objects)
+        evicted = set()
+        for _, size, path in objects:
+            if total <= self.max_bytes:
+                break
+            if os.path.basename(path) == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            evicted.add(os.path.basename(path))
+            total -= size
+        self._size = total
+        if evicted:
+            self._prune_refs(evicted)
+
+    def _prune_refs(self, evicted: set):
+        """Delete references of evicted objects."""
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, "refs")):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    with open(path) as ref_file:
+                        sha256 = json.load(ref_file)["sha256"]
+                    if sha256 in evicted:
+                        os.remove(path)
+                except (FileNotFoundError, ValueError, KeyError):
+                    continue
@@ -0,0 +1,160 @@
+"""
+Registry of database engines and clients shared across repositories.
+
+Repositories pointing at the same database reuse the registry's engine, and its pool
+of connections, instead of creating their own. BigQuery repositories of the same
+project and credentials reuse the same client, and the credentials are loaded once
+per key file. The registry is thread safe, engines and clients are created once even
+if requested concurrently.
+
+In memory SQLite databases only exist within their engine, so they are never shared,
+every repository gets its own database.
+"""
+from pathlib import Path
+import threading
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import bigquery
+from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from geniepy.errors import ConnectionError
+
+
+def is_memory_db(db_loc: str) -> bool:
+    """Check whether database url points at an in memory SQLite database."""
+    url = make_url(db_loc)
+    if url.get_backend_name() != "sqlite":
+        return False
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+class ConnectionRegistry:
+    """Thread safe registry of engines, clients and credentials."""
+
+    __slots__ = [
+        "pool_size",
+        "max_overflow",
+        "_engines",
+        "_clients",
+        "_credentials",
+        "_lock",
+    ]
+
+    def __init__(self, pool_size: int = 5, max_overflow: int = 10):
+        """
+        Initialize empty registry.
+
+        Keyword Arguments:
+            pool_size {int} -- Connections kept open per engine or client
+                (default: {5})
+            max_overflow {int} -- Connections opened beyond the pool size while
+                busy (default: {10})
+        """
+        self.pool_size = pool_size
+        """Connections kept open per engine or client."""
+        self.max_overflow = max_overflow
+        """Connections opened beyond the pool size while busy."""
+        self._engines = {}
+        self._clients = {}
+        self._credentials = {}
+        self._lock = threading.Lock()
+
+    def engine(self, db_loc: str) -> Engine:
+        """
+        Get engine of database, created on first request.
+
+        SQLite engines don't pool connections of file databases, pool sizes only
+        apply to database servers.
+
+        Arguments:
+            db_loc {str} -- Database url
+
+        Returns:
+            Engine -- The database's shared engine, a new one for in memory databases
+        """
+        if is_memory_db(db_loc):
+            return create_engine(db_loc)
+        with self._lock:
+            engine = self._engines.get(db_loc)
+            if engine is None:
+                kwargs = {}
+                if make_url(db_loc).get_backend_name() != "sqlite":
+                    kwargs = dict(
+                        pool_size=self.pool_size,
+                        max_overflow=self.max_overflow,
+                        pool_pre_ping=True,
+                    )
+                engine = create_engine(db_loc, **kwargs)
+                self._engines[db_loc] = engine
+            return engine
+
+    def credentials(self, credentials_path: str) -> service_account.Credentials:
+        """
+        Get service account credentials, loaded on first request.
+
+        Arguments:
+            credentials_path {str} -- path to gcp credentials json
+
+        Raises:
+            ConnectionError: if credentials cannot be loaded
+
+        Returns:
+            service_account.Credentials -- The loaded credentials
+        """
+        key = str(Path(credentials_path).resolve())
+        with self._lock:
+            credentials = self._credentials.get(key)
+            if credentials is None:
+                try:
+                    credentials = service_account.Credentials.from_service_account_file(
+                        key
+                    )
+                except Exception as exp:
+                    raise ConnectionError(exp)
+                self._credentials[key] = credentials
+            return credentials
+
+    def client(self, project: str, credentials_path: str) -> bigquery.Client:
+        """
+        Get BigQuery client of project, created on first request.
+
+        Arguments:
+            project {str} -- name of BigQuery project
+            credentials_path {str} -- path to gcp credentials json
+
+        Returns:
+            bigquery.Client -- The project's shared client
+        """
+        credentials = self.credentials(credentials_path)
+        key = (project, str(Path(credentials_path).resolve()))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                session = AuthorizedSession(credentials)
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_size,
+                    pool_maxsize=self.pool_size + self.max_overflow,
+                )
+                session.mount("https://", adapter)
+                client = bigquery.Client(
+                    project=project, credentials=credentials, _http=session
+                )
+                self._clients[key] = client
+            return client
+
+    def dispose(self):
+        """Close connections of registered engines and clients, and forget them."""
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            for client in self._clients.values():
+                client.close()
+            self._engines.clear()
+            self._clients.clear()
+            self._credentials.clear()
+
+
+REGISTRY = ConnectionRegistry()
+"""Process wide registry used by repositories unless given their own."""
@@ -4,9 +4,12 @@ Data Access Object Manager.
 The DAO manager coordinates the DAOs from each one of the necessary sources to
 generate the dataframe usef by the classifiers to calculate a prediction score.
 """
-from typing import Generator
+from typing import Generator, Iterable
 import pandas as pd
 import geniepy.datamgmt.daos as daos
+from geniepy.datamgmt.delta import DeltaSummary
+from geniepy.datamgmt.pipeline import Pipeline
+from geniepy.datamgmt.scrapers import EfetchScraper
 
 
 class DaoManager:
@@ -23,7 +26,13 @@ class DaoManager:
     the classifiers.
     """
 
-    __slots__ = ["_ctd_dao", "_pubmed_dao", "_classifier_dao"]
+    __slots__ = [
+        "_ctd_dao",
+        "_pubmed_dao",
+        "_classifier_dao",
+        "_efetch_scraper",
+        "_missing_pmids",
+    ]
 
     # pylint: disable=bad-continuation
     def __init__(
@@ -31,6 +40,7 @@ class DaoManager:
         ctd_dao: daos.CtdDao,
         pubmed_dao: daos.PubMedDao,
         classifier_dao: daos.ClassifierDao,
+        efetch_scraper: EfetchScraper = None,
     ):
         """Initializa DAO mgr with corresponding DAO children."""
         self._ctd_dao = ctd_dao
@@ -39,34 +49,87 @@ class DaoManager:
         """The PubMed DAO handles data from PubMed databases."""
         self._classifier_dao = classifier_dao
         """The output DAO stores output data after classifiers calc predictions."""
+        self._efetch_scraper = efetch_scraper or EfetchScraper()
+        """Scraper fetching PubMed articles missing from the PubMed DAO."""
+        self._missing_pmids = set()
+        """PMIDs referenced by CTD records but missing from the PubMed DAO."""
 
-    def download(self, chunksize: int):
-        """Download (scrapes) data for DAOs and creates internal tables."""
-        self._ctd_dao.download(chunksize)
-        self._pubmed_dao.download(chunksize)
+    # pylint: disable=bad-continuation
+    def download(
+        self, chunksize: int, pipeline: Pipeline = None, delta: bool = False
+    ) -> DeltaSummary:
+        """
+        Download (scrapes) data for DAOs and creates internal tables.
+
+        Keyword Arguments:
+            pipeline {Pipeline} -- Overlap scraping, parsing and saving of chunks
+                through pipeline (default: {None})
+            delta {bool} -- Only write the CTD records that changed since the stored
+                release (default: {False})
 
-    def _get_pubmeds_df(self, pmids: str):
+        Returns:
+            DeltaSummary -- The changed CTD digests if delta, otherwise None
         """
-        Get pubmed dao dataframes.
+        summary = self._ctd_dao.download(chunksize, pipeline, delta=delta)
+        self._pubmed_dao.download(chunksize, pipeline)
+        return summary
+
+    def _get_pubmeds(self, pmids: Iterable[int], chunksize: int) -> pd.DataFrame:
+        """
+        Get pubmed dao records of many pmids at once.
 
         Arguments:
-            pubmeds {str} -- pipe delimtied string with pmids
+            pmids {Iterable[int]} -- The pmids of the records
             chunksize {int} -- limits max chunksize internally to limit memory usage
 
+        Returns:
+            pd.DataFrame -- The first record of each found pmid, indexed by pmid
+        """
+        chunks = list(self._pubmed_dao.query_pkeys(pmids, chunksize))
+        if not chunks:
+            return pd.DataFrame(index=pd.Index([], dtype=int))
+        pubmeds = pd.concat(chunks, ignore_index=True)
+        # Only care about 1 pmid entry (table shouldn't have duplicates)
+        pubmeds = pubmeds.drop_duplicates("pmid")
+        return pubmeds.set_index(pubmeds.pmid.values)
+
+    def _get_pubmeds_df(self, pmids: str, pubmeds: pd.DataFrame):
+        """
+        Get pubmed dao dataframes.
+
+        Arguments:
+            pmids {str} -- pipe delimtied string with pmids
+            pubmeds {DataFrame} -- pubmed records of the pmids, see _get_pubmeds
+
         Returns: Dataframe with pubmed dao dataframe.
         """
-        pmids = pmids.split("|")
-        pubmed_df = pd.DataFrame()
-        for pmid in pmids:
-            try:
-                pmid_query = self._pubmed_dao.query_pkey(int(pmid))
-                # Only care about 1 pmid entry (table shouldn't have duplicates)
-                pmid_df = next(self._pubmed_dao.query(pmid_query, 1))
-                pubmed_df = pubmed_df.append(pmid_df, ignore_index=True)
-            except StopIteration:  # pragma: no cover
-                # TODO log instead of print
-                print(f"PMID: {pmid} not found!")
-        return pubmed_df
+        pmids = [int(pmid) for pmid in pmids.split("|")]
+        found = [pmid for pmid in pmids if pmid in pubmeds.index]
+        # Fetched later on by fetch_missing_pubmeds
+        self._missing_pmids.update(pmid for pmid in pmids if pmid not in pubmeds.index)
+        if not found:
+            return pd.DataFrame()
+        return pubmeds.loc[found].reset_index(drop=True)
+
+    @property
+    def missing_pmids(self) -> set:
+        """PMIDs found missing from the PubMed DAO while generating records."""
+        return self._missing_pmids
+
+    def fetch_missing_pubmeds(self, chunksize: int) -> int:
+        """
+        Fetch and save the PubMed articles found missing while generating records.
+
+        Arguments:
+            chunksize {int} -- number of articles parsed and saved at a time
+
+        Returns:
+            int -- number of articles saved, PMIDs unknown to PubMed are dropped
+        """
+        pmids = sorted(self._missing_pmids)
+        count = self._pubmed_dao.download_pmids(pmids, chunksize, self._efetch_scraper)
+        self._missing_pmids.clear()
+        return count
 
     def gen_records(self, chunksize: int) -> Generator[pd.DataFrame, None, None]:
         """
@@ -96,8 +159,13 @@ class DaoManager:
         record_df = pd.DataFrame()
         query_all = self._ctd_dao.query_all
         for record_df in self._ctd_dao.query(query_all, chunksize):
+            # Look up the pmids of all records of the chunk at once
+            pmids = {
+                int(pmid) for pmids in record_df.pmids for pmid in pmids.split("|")
+            }
+            pubmeds = self._get_pubmeds(pmids, chunksize)
             record_df["pubmeds"] = record_df.apply(
-                lambda row: self._get_pubmeds_df(row.pmids), axis=1
+                lambda row: self._get_pubmeds_df(row.pmids, pubmeds), axis=1
             )
             yield record_df
 
@@ -105,7 +173,10 @@ class DaoManager:
         """
         Save computed predictions and supporting data into output tables.
 
+        Predictions replace the stored ones of the same digests, so rerunning the
+        predictions doesn't duplicate them.
+
         Arguments:
             records {DataFrame} -- [description]
         """
-        self._classifier_dao.save(predictions)
+        self._classifier_dao.save(predictions, mode="upsert")
@@ -4,16 +4,26 @@ Data Access Managers Module.
 DAOs are responsible for scraping, parsing, storing and delivering a specific type of
 data. i.e. Pubmed Publications, Clinical Trials, Gene-Disease Relationships.
 """
-from typing import Generator
+from typing import Generator, Iterable
 from abc import ABC
+import os
+import tempfile
+import pandas as pd
 from pandas import DataFrame
 from geniepy.errors import SchemaError
 from geniepy.datamgmt.parsers import (
     BaseParser,
     CtdParser,
+    CompactCtdParser,
     PubMedParser,
     ClassifierParser,
+    CompactClassifierParser,
 )
+from geniepy.datamgmt.pipeline import Pipeline
+import geniepy.datamgmt.delta as dd
+from geniepy.datamgmt.delta import DeltaSummary
+from geniepy.datamgmt.scrapers import BaseScraper, EfetchScraper
+from geniepy.datamgmt.tables import CTD_PKEY
 import geniepy.datamgmt.repositories as dr
 
 
@@ -30,10 +40,24 @@ class BaseDao(ABC):
     """Database repository used by DAO to store objects."""
     _parser: BaseParser
     """DAO's parser to scraping and validating data."""
+    DOWNLOAD_MODE = "append"
+    """Mode of saving downloaded records, upsert if sources revise records."""
 
-    def __init__(self, repository: dr.BaseRepository):
-        """Initialize DAO state."""
+    def __init__(self, repository: dr.BaseRepository, scraper: BaseScraper = None):
+        """
+        Initialize DAO state.
+
+        Arguments:
+            repository {dr.BaseRepository} -- Database repository storing objects
+
+        Keyword Arguments:
+            scraper {BaseScraper} -- Scraper replacing the parser's default one for
+                this DAO only (default: {None})
+        """
         self._repository = repository
+        if scraper is not None:
+            self._parser = type(self._parser)()
+            self._parser.scraper = scraper
 
     @property
     def query_all(self):
@@ -52,19 +76,54 @@ class BaseDao(ABC):
         """
         return self._repository.query_pkey(val)
 
-    def download(self, chunksize: int):
+    # pylint: disable=bad-continuation
+    def query_pkeys(
+        self, values: Iterable, chunksize: int
+    ) -> Generator[DataFrame, None, None]:
+        """
+        Query records by many primary key values in a few round trips.
+
+        Arguments:
+            values {Iterable} -- The primary key values of the records
+            chunksize {int} -- Number of rows of dataframe per chunk
+
+        Returns:
+            Generator[DataFrame] -- Generator of the matching records, in no
+                particular order. Values without records are left out.
+        """
+        return self._repository.query_pkeys(values, chunksize)
+
+    def download(self, chunksize: int, pipeline: Pipeline = None):
         """
         Download new data from online sources if available.
 
+        The scraper only records scraped data as done once committed after saving.
+        Chunks saved in scraped order are committed along the download, otherwise,
+        or if the repository defers upserts, once the whole download succeeded.
+
         Keyword Arguments:
             chunksize {[type]} -- The download method can be very computationally and
             memory intentive since it could possibly need to download and parse all
             records if the tables are empty. The chunksize allows the caller to limit
             how much memory is processed at a time while downloading and parsing the
             data.
+            pipeline {Pipeline} -- Overlap scraping, parsing and saving of chunks
+                through pipeline (default: {None})
         """
-        for chunk_df in self._parser.fetch(chunksize):
-            self._repository.save(chunk_df)
+        scraper = self._parser.scraper
+        ordered = pipeline is None or pipeline.ordered
+        if self.DOWNLOAD_MODE == "upsert" and self._repository.DEFERRED_UPSERTS:
+            # Saved chunks are only written once the bulk load ends
+            ordered = False
+        with self._repository.bulk_load():
+            saved = 0
+            for chunk_df in self._parser.fetch(chunksize, pipeline):
+                if ordered:
+                    # Scraper resumed past the saved chunks, commit them
+                    scraper.commit(saved)
+                self.save(chunk_df, self.DOWNLOAD_MODE)
+                saved += 1
+        scraper.commit()
 
     def purge(self):
         """Purge all dao's database records."""
@@ -85,21 +144,29 @@ class BaseDao(ABC):
         # pylint: disable=no-member
         return self._repository.query(query=query, chunksize=chunksize)
 
-    def save(self, payload: DataFrame):
+    def save(self, payload: DataFrame, mode: str = "append"):
         """
         Save payload to database given data is valid.
 
+        Dataframes returned by the dao's parser are already validated and marked as
+        such, only unmarked dataframes are validated again.
+
         Arguments:
             payload {DataFrame} -- payload to be saved to table
 
+        Keyword Arguments:
+            mode {str} -- "append" records, or "upsert" them replacing the stored
+                records with the same primary key (default: {"append"})
+
         Raises:
             SchemaError: dataframe does not conform to table schema.
         """
         # pylint: disable=no-member
-        errors = self._parser.validate(payload)
-        if errors:
-            raise SchemaError
-        self._repository.save(payload)
+        if not self._parser.is_validated(payload):
+            errors = self._parser.validate(payload)
+            if errors:
+                raise SchemaError(errors)
+        self._repository.save(payload, mode)
 
     @property
     def tablename(self):
@@ -114,6 +181,133 @@ class CtdDao(BaseDao):
     __slots__ = ["_repository"]
 
     _parser: CtdParser = CtdParser()
+    DELTA_COLUMN = "pmids"
+    """Column compared, along with the digest, by delta downloads."""
+    FOLD_CHUNKS = 64
+    """Number of chunk fingerprints combined at once by delta downloads."""
+
+    # pylint: disable=bad-continuation, arguments-differ
+    def download(
+        self, chunksize: int, pipeline: Pipeline = None, delta: bool = False
+    ) -> DeltaSummary:
+        """
+        Download new data from online sources if available.
+
+        Keyword Arguments:
+            chunksize {int} -- number of records parsed and saved at a time
+            pipeline {Pipeline} -- Overlap scraping, parsing and saving of chunks
+                through pipeline (default: {None})
+            delta {bool} -- Only write the records that changed since the stored
+                release, see download_delta (default: {False})
+
+        Returns:
+            DeltaSummary -- The changed digests if delta, otherwise None
+        """
+        if delta:
+            chunks = self._parser.fetch(chunksize, pipeline)
+            summary = self.download_delta(chunks, chunksize)
+            # Release only recorded once its delta is written
+            self._parser.scraper.commit()
+            return summary
+        return super().download(chunksize, pipeline)
+
+    def download_file(
+        self, csv_file_path: str, chunksize: int, delta: bool = False
+    ) -> DeltaSummary:
+        """
+        Load records from a raw CTD csv file instead of online sources.
+
+        Arguments:
+            csv_file_path {str} -- path to the (optionally gzipped) CTD csv file
+            chunksize {int} -- number of records parsed and saved at a time
+
+        Keyword Arguments:
+            delta {bool} -- Only write the records that changed since the stored
+                release, see download_delta (default: {False})
+
+        Returns:
+            DeltaSummary -- The changed digests if delta, otherwise None
+        """
+        chunks = self._parser.fetch_file(csv_file_path, chunksize)
+        if delta:
+            return self.download_delta(chunks, chunksize)
+        with self._repository.bulk_load():
+            for chunk_df in chunks:
+                self.save(chunk_df)
+        return None
+
+    def fingerprint_stored(self, chunksize: int) -> DataFrame:
+        """Fingerprint the digests of the stored release."""
+        query = f"SELECT {CTD_PKEY}, {self.DELTA_COLUMN} FROM {self.tablename};"
+        return self._fold(
+            dd.fingerprint(chunk_df, CTD_PKEY, self.DELTA_COLUMN)
+            for chunk_df in self.query(query, chunksize)
+        )
+
+    def _spool(self, chunks: Iterable[DataFrame], spool_dir: str, spooled: [str]):
+        """Pickle chunks to spool directory, generating their fingerprints."""
+        for chunk_df in chunks:
+            path = os.path.join(spool_dir, f"{len(spooled)}.pkl")
+            chunk_df.to_pickle(path)
+            spooled.append(path)
+            yield dd.fingerprint(chunk_df, CTD_PKEY, self.DELTA_COLUMN)
+
+    def _fold(self, fingerprints) -> DataFrame:
+        """Combine chunk fingerprints, FOLD_CHUNKS at a time to bound memory."""
+        folded = []
+        for chunk_fingerprint in fingerprints:
+            folded.append(chunk_fingerprint)
+            if len(folded) == self.FOLD_CHUNKS:
+                folded = [dd.accumulate(folded)]
+        return dd.accumulate(folded)
+
+    # pylint: disable=bad-continuation
+    def download_delta(
+        self, chunks: Iterable[DataFrame], chunksize: int
+    ) -> DeltaSummary:
+        """
+        Only write the records of the digests that changed since the stored release.
+
+        A digest changed if its number of records or their pmids differ between the
+        stored and the new release. The records of updated and deleted digests are
+        deleted, then the new records of inserted and updated digests are saved.
+        Parsed chunks are spooled to a temporary directory while the new release is
+        fingerprinted, since a digest is only known to be unchanged once the whole
+        release was read. Scraped releases are only committed once their delta is
+        written, an interrupted delta download scrapes the release again and
+        completes the delta, since it is computed against the stored records.
+
+        Arguments:
+            chunks {Iterable[DataFrame]} -- Parsed chunks of the new release
+            chunksize {int} -- number of stored records read at a time
+
+        Returns:
+            DeltaSummary -- The inserted, updated and deleted digests
+        """
+        with tempfile.TemporaryDirectory(prefix="geniepy_delta_") as spool_dir:
+            spooled = []
+            current = self._fold(self._spool(chunks, spool_dir, spooled))
+            if not spooled:
+                # Nothing scraped, i.e. unchanged release, keep stored records
+                return DeltaSummary()
+            summary = dd.compare(self.fingerprint_stored(chunksize), current)
+            changed = summary.changed
+            with self._repository.bulk_load():
+                self._repository.delete_pkeys(summary.removed)
+                for path in spooled:
+                    chunk_df = pd.read_pickle(path)
+                    chunk_df = chunk_df[chunk_df[CTD_PKEY].isin(changed)]
+                    if not chunk_df.empty:
+                        self.save(chunk_df.reset_index(drop=True))
+        return summary
+
+
+class CompactCtdDao(CtdDao):
+    """Implementation of CTD Data Access Object with compact digests."""
+
+    __slots__ = ["_repository"]
+
+    _parser: CompactCtdParser = CompactCtdParser()
 
 
 class PubMedDao(BaseDao):
@@ -122,6 +316,31 @@ class PubMedDao(BaseDao):
     __slots__ = ["_repository"]
 
     _parser: PubMedParser = PubMedParser()
+    DOWNLOAD_MODE = "upsert"
+    """Update files revise articles, downloaded articles replace stored ones."""
+
+    # pylint: disable=bad-continuation
+    def download_pmids(
+        self, pmids: Iterable, chunksize: int, scraper: EfetchScraper
+    ) -> int:
+        """
+        Fetch and save the articles of given PMIDs, i.e. missing from the table.
+
+        Arguments:
+            pmids {Iterable} -- PMIDs of the articles to be fetched
+            chunksize {int} -- number of articles parsed and saved at a time
+            scraper {EfetchScraper} -- The scraper fetching articles by PMID
+
+        Returns:
+            int -- number of articles saved
+        """
+        count = 0
+        with self._repository.bulk_load():
+            for chunk in scraper.scrape(chunksize, pmids=pmids):
+                chunk_df = self._parser.parse(chunk, self._parser.default_type)
+                self.save(chunk_df, self.DOWNLOAD_MODE)
+                count += len(chunk_df)
+        return count
 
 
 class ClassifierDao(BaseDao):
@@ -131,6 +350,14 @@ class ClassifierDao(BaseDao):
 
     _parser: ClassifierParser = ClassifierParser()
 
-    def download(self, chunksize):
+    def download(self, chunksize, pipeline=None):
         """Classifiers don't need scrapers, so method not implemented."""
         raise NotImplementedError
+
+
+class CompactClassifierDao(ClassifierDao):
+    """Implementation of classifier outputs DAO keyed by compact digests."""
+
+    __slots__ = ["_repository"]
+
+    _parser: CompactClassifierParser = CompactClassifierParser()
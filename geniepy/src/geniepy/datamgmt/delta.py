@@ -0,0 +1,147 @@
+"""
+Key level delta of table releases.
+
+A release can hold several rows with the same primary key (i.e. the CTD gene-disease
+associations inferred through different chemicals), so releases are compared key by
+key: each key is fingerprinted with its number of rows and the sum of the 64 bit
+hashes of a compared column (i.e. the pmids), which doesn't depend on the order of
+the rows and can be accumulated chunk by chunk. Keys whose fingerprint differs are
+rewritten as a whole, all other keys are left untouched.
+
+Fingerprints take about 24 bytes per distinct key on top of the keys themselves,
+tables keyed by compact integer digests keep the whole comparison in memory even
+for full CTD releases.
+"""
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+FINGERPRINT_COLUMNS = ["rows", "hash"]
+"""Columns of fingerprint dataframes, indexed by key."""
+
+
+class DeltaSummary:
+    """Keys inserted, updated and deleted by a delta load."""
+
+    __slots__ = ["inserted", "updated", "deleted", "unchanged"]
+
+    # pylint: disable=bad-continuation
+    def __init__(
+        self,
+        inserted: pd.Index = None,
+        updated: pd.Index = None,
+        deleted: pd.Index = None,
+        unchanged: int = 0,
+    ):
+        """Initialize summary state."""
+        self.inserted = pd.Index([]) if inserted is None else inserted
+        """Keys only in the new release."""
+        self.updated = pd.Index([]) if updated is None else updated
+        """Keys whose rows changed between releases."""
+        self.deleted = pd.Index([]) if deleted is None else deleted
+        """Keys only in the previous release."""
+        self.unchanged = unchanged
+        """Number of keys whose rows didn't change."""
+
+    @property
+    def changed(self) -> pd.Index:
+        """Keys whose rows must be written, i.e. targets of new predictions."""
+        return self.inserted.append(self.updated)
+
+    @property
+    def removed(self) -> pd.Index:
+        """Keys whose previous rows must be deleted."""
+        return self.updated.append(self.deleted)
+
+    def __bool__(self) -> bool:
+        """Return true if any key changed."""
+        return bool(len(self.inserted) or len(self.updated) or len(self.deleted))
+
+    def __repr__(self) -> str:
+        """Return summary representation."""
+        return (
+            f"DeltaSummary(inserted={len(self.inserted)}, "
+            f"updated={len(self.updated)}, deleted={len(self.deleted)}, "
+            f"unchanged={self.unchanged})"
+        )
+
+
+def _reduce(keys, rows: np.ndarray, hashes: np.ndarray) -> DataFrame:
+    """Sum rows and hashes by key, uint64 hashes sums wrap around."""
+    codes, uniques = pd.factorize(keys)
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    return DataFrame(
+        {
+            "rows": np.add.reduceat(rows[order], starts),
+            "hash": np.add.reduceat(hashes[order], starts),
+        },
+        index=uniques,
+    )
+
+
+def fingerprint(chunk: DataFrame, pkey: str, column: str) -> DataFrame:
+    """
+    Fingerprint the rows of each key of a chunk.
+
+    Arguments:
+        chunk {DataFrame} -- The rows to be fingerprinted
+        pkey {str} -- Name of the key column
+        column {str} -- Name of the compared column
+
+    Returns:
+        DataFrame -- Number of rows and sum of column hashes, indexed by key
+    """
+    if chunk.empty:
+        return accumulate([])
+    hashes = pd.util.hash_pandas_object(chunk[column], index=False).values
+    rows = np.ones(len(chunk), dtype=np.int64)
+    return _reduce(chunk[pkey].values, rows, hashes)
+
+
+def accumulate(fingerprints: [DataFrame]) -> DataFrame:
+    """
+    Combine fingerprints of several chunks of the same release.
+
+    Arguments:
+        fingerprints {[DataFrame]} -- Fingerprints of each chunk
+
+    Returns:
+        DataFrame -- Fingerprint of each key across chunks
+    """
+    if not fingerprints:
+        return DataFrame(
+            {
+                "rows": np.array([], dtype=np.int64),
+                "hash": np.array([], dtype=np.uint64),
+            }
+        )
+    if len(fingerprints) == 1:
+        return fingerprints[0]
+    combined = pd.concat(fingerprints)
+    return _reduce(
+        combined.index.values, combined["rows"].values, combined["hash"].values
+    )
+
+
+def compare(previous: DataFrame, current: DataFrame) -> DeltaSummary:
+    """
+    Compare fingerprints of two releases.
+
+    Arguments:
+        previous {DataFrame} -- Fingerprints of the stored release
+        current {DataFrame} -- Fingerprints of the new release
+
+    Returns:
+        DeltaSummary -- The inserted, updated and deleted keys
+    """
+    inserted = current.index.difference(previous.index, sort=False)
+    deleted = previous.index.difference(current.index, sort=False)
+    common = current.index.intersection(previous.index, sort=False)
+    old = previous.loc[common, FINGERPRINT_COLUMNS].values
+    new = current.loc[common, FINGERPRINT_COLUMNS].values
+    differs = (old != new).any(axis=1)
+    return DeltaSummary(
+        inserted, common[differs], deleted, unchanged=int((~differs).sum())
+    )
@@ -0,0 +1,67 @@
+"""
+Repository migrations.
+
+Migrate ctd and classifier tables keyed by sha256 hex digests to the compact
+digest tables, keyed by the 63 bit integer of the first 8 bytes of the digests.
+"""
+from sqlalchemy import Table
+from geniepy.datamgmt.parsers import compact_digest
+from geniepy.datamgmt.repositories import BaseRepository
+
+COMPACT_DIGEST_SQL = (
+    "CAST(CONCAT('0x', "
+    "FORMAT('%x', CAST(CONCAT('0x', SUBSTR(digest, 1, 1)) AS INT64) & 7), "
+    "SUBSTR(digest, 2, 15)) AS INT64)"
+)
+"""
+GBQ expression of the compact digest of the hex digest column.
+
+The sign bit is cleared on the first hex character before casting, since casting
+hex strings above the INT64 range fails.
+"""
+
+
+def compact_gbq_query(dataset: str, source: Table, target: Table) -> str:
+    """
+    Generate GBQ query creating compact digest table from hex digest table.
+
+    Arguments:
+        dataset {str} -- The GBQ dataset of both tables
+        source {Table} -- The hex digest table definition
+        target {Table} -- The compact digest table definition
+
+    Returns:
+        str -- The GBQ query string
+    """
+    columns = [
+        f"{COMPACT_DIGEST_SQL} AS digest" if col.name == "digest" else col.name
+        for col in target.columns
+    ]
+    return (
+        f"CREATE OR REPLACE TABLE {dataset}.{target.name} AS "
+        f"SELECT {', '.join(columns)} FROM {dataset}.{source.name};"
+    )
+
+
+# pylint: disable=bad-continuation
+def migrate_to_compact(
+    source: BaseRepository, target: BaseRepository, chunksize: int
+) -> int:
+    """
+    Copy records from hex digest repository to compact digest repository.
+
+    Arguments:
+        source {BaseRepository} -- The hex digest repository
+        target {BaseRepository} -- The compact digest repository
+        chunksize {int} -- Number of records copied at a time
+
+    Returns:
+        int -- Number of records copied
+    """
+    count = 0
+    with target.bulk_load():
+        for chunk_df in source.query(source.query_all, chunksize):
+            chunk_df["digest"] = [compact_digest(digest) for digest in chunk_df.digest]
+            target.save(chunk_df)
+            count += len(chunk_df)
+    return count
@@ -1,25 +1,82 @@
 """Data sources parsers."""
 from typing import Generator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+import gzip
 import hashlib
+import os
 from abc import ABC, abstractstaticmethod
 from enum import Enum, auto
 from io import StringIO
 import numpy as np
 import pandas as pd
 from pandas import DataFrame
-from pandas_schema import Column, Schema
-from pandas_schema.validation import IsDtypeValidation, MatchesPatternValidation
+from geniepy.datamgmt.tables import (  # pylint: disable=bad-continuation
+    CTD_DAO_TABLE,
+    CTD_COMPACT_DAO_TABLE,
+    PUBMED_DAO_TABLE,
+    CLSFR_DAO_TABLE,
+    CLSFR_COMPACT_DAO_TABLE,
+)
+from geniepy.datamgmt.validation import Schema, ValidationSummary
+from geniepy.datamgmt.pipeline import Pipeline
 from geniepy.datamgmt.scrapers import BaseScraper, CtdScraper, PubMedScraper
 from geniepy.errors import ParserError
-from geniepy.pubmed import PubMedArticle
+from geniepy.pubmed import ArticleExtractor, PubMedRecord, PUBMED_FIELDS
 from geniepy.classmgmt.classifiers import PCPCLSFR_NAME, CTCLSFR_NAME
 
 
+COMPACT_DIGEST_MASK = 0x7FFFFFFFFFFFFFFF
+"""Mask keeping compact digests positive 64 bit integers."""
+
+
+def hash_messages(messages: [str], compact: bool = False) -> list:
+    """
+    Compute the sha256 digests of a batch of messages.
+
+    Arguments:
+        messages {[str]} -- The messages to be hashed
+
+    Keyword Arguments:
+        compact {bool} -- Return compact integer digests (default: {False})
+
+    Returns:
+        list -- the hex strings or compact integers of the computed digests
+    """
+    sha256 = hashlib.sha256
+    if compact:
+        from_bytes = int.from_bytes
+        return [
+            from_bytes(sha256(message.encode()).digest()[:8], "big")
+            & COMPACT_DIGEST_MASK
+            for message in messages
+        ]
+    return [sha256(message.encode()).hexdigest() for message in messages]
+
+
+def compact_digest(hexdigest: str) -> int:
+    """
+    Map a sha256 hex digest to its compact digest.
+
+    The compact digest is the integer of the first 8 bytes of the digest with the
+    sign bit cleared, so it fits signed 64 bit SQL and GBQ integer columns.
+
+    Arguments:
+        hexdigest {str} -- The hex string of the digest
+
+    Returns:
+        int -- the compact digest
+    """
+    return int(hexdigest[:16], 16) & COMPACT_DIGEST_MASK
+
+
 class DataType(Enum):
     """Possible parsable datatypes."""
 
     CSV_STR = auto()
     XML = auto()
+    DATAFRAME = auto()
 
 
 class BaseParser(ABC):
@@ -30,7 +87,7 @@ class BaseParser(ABC):
     default_type: DataType = None
 
     @classmethod
-    def validate(cls, payload: DataFrame) -> [str]:
+    def validate(cls, payload: DataFrame) -> ValidationSummary:
         """
         Check if payload is valid schema.
 
@@ -38,12 +95,26 @@ class BaseParser(ABC):
             payload {DataFrame} -- The data to be checked against parser schema.
 
         Returns:
-            bool -- true if payload conforms to schema, false otherwise.
+            ValidationSummary -- failed rules summary, falsy if payload conforms to
+            schema.
         """
         if payload is None:
-            return ["Cannot validate None object"]
+            return ValidationSummary(["Cannot validate None object"])
         return cls.schema.validate(payload)
 
+    @classmethod
+    def is_validated(cls, payload: DataFrame) -> bool:
+        """
+        Check if payload was already validated against parser schema.
+
+        Arguments:
+            payload {DataFrame} -- The data to be checked.
+
+        Returns:
+            bool -- true if payload is marked as valid for parser schema.
+        """
+        return payload is not None and cls.schema.is_validated(payload)
+
     @abstractstaticmethod
     def parse(data, dtype: DataType = None) -> DataFrame:
         """
@@ -59,17 +130,29 @@ class BaseParser(ABC):
             DataFrame -- The parsed dataframe.
         """
 
-    def fetch(self, chunksize: int) -> Generator[DataFrame, None, None]:
+    # pylint: disable=bad-continuation
+    def fetch(
+        self, chunksize: int, pipeline: Pipeline = None
+    ) -> Generator[DataFrame, None, None]:
         """
         Fetch new data, if available from online sources.
 
         Keyword Arguments:
             chunksize {int} -- the returned generator chunk size
+            pipeline {Pipeline} -- Scrape and parse chunks concurrently through
+                pipeline, otherwise one after another (default: {None})
 
         Returns:
             Generator[DataFrame, None, None] -- Generator yielding fetched data
         """
         raw_gen = self.scraper.scrape(chunksize)
+        if pipeline is not None:
+            parse = partial(self.parse, dtype=self.default_type)
+            for parsed_df in pipeline.run(raw_gen, parse):
+                # Validated by parser workers, mark lost in transfer
+                self.schema.adopt(parsed_df)
+                yield parsed_df
+            return
         for data_chunk in raw_gen:
             parsed_df = self.parse(data_chunk, self.default_type)
             yield parsed_df
@@ -85,18 +168,33 @@ class CtdParser(BaseParser):
 
     default_type: DataType = DataType.CSV_STR
     scraper: CtdScraper = CtdScraper()
-    schema: Schema = Schema(
-        [
-            Column("digest"),
-            Column("genesymbol"),
-            Column("geneid", [IsDtypeValidation(np.int64)]),
-            Column("diseasename"),
-            Column(
-                "diseaseid", [MatchesPatternValidation("^D[0-9]+$")]
-            ),  # i.e. D000014
-            Column("pmids"),
-        ]
+    schema: Schema = Schema.from_table(
+        CTD_DAO_TABLE,
+        dtypes={"geneid": np.int64},
+        patterns={"diseaseid": "^D[0-9]+$"},  # i.e. D000014
     )
+    compact: bool = False
+    """Whether digests are compact integers instead of hex strings."""
+    PARALLEL_HASH_ROWS: int = 1000000
+    """Minimum number of records for digests to be computed across processes."""
+    CSV_COLUMNS: [str] = CtdScraper.CSV_COLUMNS
+    """Columns of the raw CTD gene-disease associations csv file."""
+    CSV_DTYPES: dict = {
+        "GeneSymbol": "category",
+        "GeneID": np.int64,
+        "DiseaseName": "category",
+        "DiseaseID": str,
+        "PubMedIDs": str,
+    }
+    """Types of the raw csv columns used by the schema, all other are not loaded."""
+    CSV_RENAMES: dict = {
+        "GeneSymbol": "genesymbol",
+        "GeneID": "geneid",
+        "DiseaseName": "diseasename",
+        "DiseaseID": "diseaseid",
+        "PubMedIDs": "pmids",
+    }
+    """Raw csv columns names mapping to schema column names."""
 
     @staticmethod
     def hash_record(record: pd.Series) -> str:
@@ -113,6 +211,40 @@ class CtdParser(BaseParser):
         hexdigest = hashlib.sha256(message).hexdigest()
         return str(hexdigest)
 
+    @staticmethod
+    def hash_records(
+        geneids: pd.Series,
+        diseaseids: pd.Series,
+        max_workers: int = None,
+        compact: bool = False,
+    ) -> list:
+        """
+        Hash a batch of ctd records to generate digest column.
+
+        The digests are identical to hashing each record with hash_record. Batches
+        with at least PARALLEL_HASH_ROWS records are hashed across processes.
+
+        Arguments:
+            geneids {pd.Series} -- The records gene ids
+            diseaseids {pd.Series} -- The records disease ids, without MESH: prefix
+
+        Keyword Arguments:
+            max_workers {int} -- Max number of processes (default: {cpu count})
+            compact {bool} -- Compute compact integer digests (default: {False})
+
+        Returns:
+            list -- the hex strings or compact integers of the computed digests
+        """
+        messages = (geneids.astype(str) + diseaseids).tolist()
+        max_workers = max_workers or os.cpu_count() or 1
+        if len(messages) < CtdParser.PARALLEL_HASH_ROWS or max_workers == 1:
+            return hash_messages(messages, compact)
+        size = -(-len(messages) // max_workers)
+        batches = [messages[i : i + size] for i in range(0, len(messages), size)]
+        hasher = partial(hash_messages, compact=compact)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(chain.from_iterable(executor.map(hasher, batches)))
+
     @staticmethod
     def parse(data, dtype=DataType.CSV_STR) -> DataFrame:
         """
@@ -127,44 +259,159 @@ class CtdParser(BaseParser):
         Returns:
             DataFrame -- The parsed dataframe.
 
+        Raises:
+            ParserError -- If unable to parse data
+        """
+        return CtdParser.parse_as(data, dtype)
+
+    @classmethod
+    def parse_as(cls, data, dtype: DataType) -> DataFrame:
+        """
+        Parse data according to schema and digest format of the ctd parser class.
+
+        Arguments:
+            data {Implementation dependent} -- Data to be parsed
+            dtype {DataType} -- Type of data to be parsed
+
+        Returns:
+            DataFrame -- The parsed dataframe.
+
         Raises:
             ParserError -- If unable to parse data
         """
         try:
-            parsed_df = pd.read_csv(StringIO(data))
-            # Remove unused columns
-            parsed_df = parsed_df.drop(
-                columns=[
-                    "DirectEvidence",
-                    "InferenceChemicalName",
-                    "InferenceScore",
-                    "OmimIDs",
-                ]
-            )
+            if dtype == DataType.DATAFRAME:
+                parsed_df = data
+            else:
+                parsed_df = pd.read_csv(
+                    StringIO(data),
+                    usecols=list(CtdParser.CSV_DTYPES),
+                    dtype=CtdParser.CSV_DTYPES,
+                )
+                parsed_df.rename(columns=CtdParser.CSV_RENAMES, inplace=True)
             # Remove prefix 'MESH:' from DiseaseIDs
-            parsed_df["DiseaseID"] = parsed_df.apply(
-                lambda x: x.DiseaseID.replace("MESH:", ""), axis=1
-            )
-            # Rename columns based on schema
-            parsed_df.rename(
-                columns={
-                    "GeneSymbol": "genesymbol",
-                    "GeneID": "geneid",
-                    "DiseaseName": "diseasename",
-                    "DiseaseID": "diseaseid",
-                    "PubMedIDs": "pmids",
-                },
-                inplace=True,
+            parsed_df["diseaseid"] = parsed_df["diseaseid"].str.replace(
+                "MESH:", "", regex=False
             )
             # Compute and add the digest
-            parsed_df["digest"] = parsed_df.apply(CtdParser.hash_record, axis=1)
-            errors = CtdParser.validate(parsed_df)
+            parsed_df["digest"] = CtdParser.hash_records(
+                parsed_df.geneid, parsed_df.diseaseid, compact=cls.compact
+            )
+            errors = cls.validate(parsed_df)
             if errors:
                 raise ParserError(errors)
             return parsed_df
         except Exception as parse_exp:
             raise ParserError(parse_exp)
 
+    @staticmethod
+    def count_header_lines(csv_file_path: str) -> int:
+        """
+        Count the comment and header lines preceding the records of a CTD csv file.
+
+        The files downloaded from CTD start with '#' comment lines, including the
+        commented out column names, while local extracts may start with a plain
+        header line.
+
+        Arguments:
+            csv_file_path {str} -- path to the (optionally gzipped) CTD csv file
+
+        Returns:
+            int -- number of lines to skip before the first record
+        """
+        opener = gzip.open if csv_file_path.endswith(".gz") else open
+        count = 0
+        with opener(csv_file_path, "rt") as csv_file:
+            for line in csv_file:
+                columns = line.rstrip("\r\n").split(",")
+                if not line.startswith("#") and columns != CtdParser.CSV_COLUMNS:
+                    break
+                count += 1
+        return count
+
+    @staticmethod
+    def read_csv(
+        csv_file_path: str, chunksize: int
+    ) -> Generator[DataFrame, None, None]:
+        """
+        Stream typed dataframes from a raw CTD gene-disease associations csv file.
+
+        Only the columns in the parser schema are loaded, with explicit types and
+        categorical gene symbols and disease names, and already renamed to the
+        schema names. The yielded dataframes are ready to be parsed with
+        DataType.DATAFRAME.
+
+        Arguments:
+            csv_file_path {str} -- path to the (optionally gzipped) CTD csv file
+            chunksize {int} -- number of records of each dataframe
+
+        Returns:
+            Generator[DataFrame, None, None] -- Generator yielding typed dataframes
+
+        Raises:
+            ParserError -- If unable to read csv file
+        """
+        try:
+            reader = pd.read_csv(
+                csv_file_path,
+                header=None,
+                names=CtdParser.CSV_COLUMNS,
+                skiprows=CtdParser.count_header_lines(csv_file_path),
+                usecols=list(CtdParser.CSV_DTYPES),
+                dtype=CtdParser.CSV_DTYPES,
+                chunksize=chunksize,
+            )
+            for chunk_df in reader:
+                yield chunk_df.rename(columns=CtdParser.CSV_RENAMES)
+        except Exception as read_exp:
+            raise ParserError(read_exp)
+
+    def fetch_file(
+        self, csv_file_path: str, chunksize: int
+    ) -> Generator[DataFrame, None, None]:
+        """
+        Parse a raw CTD csv file in chunks, without scraping online sources.
+
+        Arguments:
+            csv_file_path {str} -- path to the (optionally gzipped) CTD csv file
+            chunksize {int} -- number of records of each dataframe
+
+        Returns:
+            Generator[DataFrame, None, None] -- Generator yielding parsed data
+        """
+        for chunk_df in self.read_csv(csv_file_path, chunksize):
+            yield self.parse(chunk_df, DataType.DATAFRAME)
+
+
+class CompactCtdParser(CtdParser):
+    """CTD Database Parser generating compact integer digests."""
+
+    compact: bool = True
+    schema: Schema = Schema.from_table(
+        CTD_COMPACT_DAO_TABLE,
+        dtypes={"digest": np.int64, "geneid": np.int64},
+        patterns={"diseaseid": "^D[0-9]+$"},  # i.e. D000014
+    )
+
+    @staticmethod
+    def parse(data, dtype=DataType.CSV_STR) -> DataFrame:
+        """
+        Parse data and convert according to parser schema.
+
+        Arguments:
+            data {Implementation dependent} -- Data to be parsed
+
+        Keyword Arguments:
+            dtype {DataType} -- Type of data to be parsed (default: {DataType.CSV})
+
+        Returns:
+            DataFrame -- The parsed dataframe.
+
+        Raises:
+            ParserError -- If unable to parse data
+        """
+        return CompactCtdParser.parse_as(data, dtype)
+
 
 class PubMedParser(BaseParser):
     """
@@ -175,22 +422,26 @@ class PubMedParser(BaseParser):
     """
 
     default_type: DataType = DataType.XML
-    scraper: PubMedScraper()
-    schema: Schema = Schema(
-        [
-            Column("pmid", [IsDtypeValidation(np.int64)]),
-            Column("date_completed"),
-            Column("pub_model"),
-            Column("title"),
-            Column("iso_abbreviation"),
-            Column("article_title"),
-            Column("abstract"),
-            Column("authors"),
-            Column("language"),
-            Column("chemicals"),
-            Column("mesh_list"),
-        ]
+    scraper: PubMedScraper = PubMedScraper()
+    schema: Schema = Schema.from_table(
+        PUBMED_DAO_TABLE,
+        dtypes={
+            "pmid": np.int64,
+            "num_authors": np.int64,
+            "num_chemicals": np.int64,
+            "abstract_length": np.int64,
+        },
+    )
+    extractor: ArticleExtractor = ArticleExtractor(
+        [column.name for column in schema.columns if column.name in PUBMED_FIELDS]
     )
+    """Single pass extraction engine of the schema fields."""
+    COUNT_COLUMNS: dict = {
+        "num_authors": "authors",
+        "num_chemicals": "chemicals",
+        "abstract_length": "abstract",
+    }
+    """Schema columns holding the length of another column."""
 
     @staticmethod
     def parse(data, dtype: DataType = None) -> DataFrame:
@@ -206,71 +457,24 @@ class PubMedParser(BaseParser):
         Returns:
             DataFrame -- The parsed dataframe.
         """
-        # Data passed in should be a list of xml element trees
+        # Data passed in should be a list of xml element trees or records extracted
+        # by one of the pubmed xml engines
         xml_list = data
-
-        # The keys of the dataframe
-        keys = [
-            "pmid",
-            "date_completed",
-            "pub_model",
-            "title",
-            "iso_abbreviation",
-            "article_title",
-            "abstract",
-            "authors",
-            "language",
-            "chemicals",
-            "mesh_list",
-        ]
-
-        # Temp array variables to store from each xml element tree
-        pmid_list = []
-        date_completed_list = []
-        pub_model_list = []
-        title_list = []
-        iso_abbreviation_list = []
-        article_title_list = []
-        abstract_list = []
-        authors_list = []
-        language_list = []
-        chemicals_list = []
-        mesh_list_list = []
-
         try:
-            # General XML Tags
-            for xml_article in xml_list:
-                article = PubMedArticle(xml_article)
-                pmid_list.append(np.int64(article.pmid))
-                date_completed_list.append(article.date_completed)
-                pub_model_list.append(article.pub_model)
-                title_list.append(article.title)
-                iso_abbreviation_list.append(article.iso_abbreviation)
-                article_title_list.append(article.article_title)
-                abstract_list.append(article.abstract)
-                authors_list.append(str(article.authors).strip("[]"))
-                language_list.append(article.language)
-                chemicals_list.append(str(article.chemicals).strip("[]"))
-                mesh_list_list.append(str(article.mesh_list).strip("[]"))
-
-            # Create the array of arrays of values in dataframe
-            values = [
-                pmid_list,
-                date_completed_list,
-                pub_model_list,
-                title_list,
-                iso_abbreviation_list,
-                article_title_list,
-                abstract_list,
-                authors_list,
-                language_list,
-                chemicals_list,
-                mesh_list_list,
+            # Single pass extraction of the schema fields of every article
+            records = [
+                xml
+                if isinstance(xml, PubMedRecord)
+                else PubMedParser.extractor.extract(xml)
+                for xml in xml_list
             ]
-
-            # Zip df keys and values and create dataframe
-            zipped = list(zip(keys, values))
-            parsed_df = pd.DataFrame(dict(zipped))
+            parsed_df = pd.DataFrame.from_records(records, columns=PUBMED_FIELDS)
+            parsed_df = parsed_df[PubMedParser.extractor.fields]
+            parsed_df["pmid"] = parsed_df["pmid"].astype(np.int64)
+            # Precomputed counts, so consumers don't have to load the lists
+            for col, source in PubMedParser.COUNT_COLUMNS.items():
+                counts = parsed_df[source].str.len().fillna(0)
+                parsed_df[col] = counts.astype(np.int64)
 
             errors = PubMedParser.validate(parsed_df)
             if errors:
@@ -291,15 +495,14 @@ class ClassifierParser(BaseParser):
     default_type: DataType = None
     scraper: None
     """No online sources for classifiers output."""
-    schema: Schema = Schema(
-        [
-            Column("digest"),
-            Column(PCPCLSFR_NAME, [IsDtypeValidation(np.float64)]),
-            Column(CTCLSFR_NAME, [IsDtypeValidation(np.float64)]),
-        ]
+    schema: Schema = Schema.from_table(
+        CLSFR_DAO_TABLE, dtypes={PCPCLSFR_NAME: np.float64, CTCLSFR_NAME: np.float64}
     )
 
-    def fetch(self, chunksize: int) -> Generator[DataFrame, None, None]:
+    # pylint: disable=bad-continuation
+    def fetch(
+        self, chunksize: int, pipeline: Pipeline = None
+    ) -> Generator[DataFrame, None, None]:
         """No online sources to fetch from for classifiers outputs."""
         raise NotImplementedError("Classifier Output Parser has no Scrapers")
 
@@ -313,3 +516,16 @@ class ClassifierParser(BaseParser):
                 dataframes that only need to be validated.
         """
         raise NotImplementedError("Classifier Output Parser has no Scrapers")
+
+
+class CompactClassifierParser(ClassifierParser):
+    """Classifier dao Parser of outputs keyed by compact integer digests."""
+
+    schema: Schema = Schema.from_table(
+        CLSFR_COMPACT_DAO_TABLE,
+        dtypes={
+            "digest": np.int64,
+            PCPCLSFR_NAME: np.float64,
+            CTCLSFR_NAME: np.float64,
+        },
+    )
@@ -0,0 +1,164 @@
+"""
+Staged scrape/parse pipeline.
+
+Overlaps scraping, parsing and saving of data chunks: a scraper thread reads raw
+chunks and submits them to a pool of parser processes, while the caller consumes
+the parsed chunks, i.e. saving them to the repositories. Saving stays in the
+caller's thread since repository connections may be bound to it (i.e. in memory
+sqlite databases). Number of chunks in flight is bounded to apply backpressure on
+the scraper.
+"""
+from typing import Callable, Generator, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+import queue
+import threading
+
+
+class _ScrapeEnd:
+    """Marker of the end of the scraped chunks."""
+
+    __slots__ = ["chunks"]
+
+    def __init__(self, chunks: int):
+        """Mark end of given number of submitted chunks."""
+        self.chunks = chunks
+
+
+class _ScrapeFailure:
+    """Wrapper of exception raised while scraping chunks."""
+
+    __slots__ = ["exception"]
+
+    def __init__(self, exception: BaseException):
+        """Wrap scraper exception."""
+        self.exception = exception
+
+
+class _Run:
+    """State shared by the scraper thread and the consumer of a pipeline run."""
+
+    __slots__ = ["results", "slots", "stop"]
+
+    def __init__(self, max_chunks: int):
+        """Initialize run bounding chunks being parsed or waiting to be consumed."""
+        self.results = queue.Queue()
+        """Parsed chunk futures, scraper failure and end marker."""
+        self.slots = threading.Semaphore(max_chunks)
+        """Bounds chunks being parsed or waiting to be consumed."""
+        self.stop = threading.Event()
+        """Set once the consumer stopped consuming chunks."""
+
+
+class Pipeline:
+    """Staged scrape/parse pipeline configuration and runner."""
+
+    __slots__ = ["parse_workers", "queue_size", "ordered"]
+
+    POLL_INTERVAL = 0.1
+    """Seconds between checks of pipeline cancellation while waiting."""
+
+    def __init__(self, parse_workers: int = 2, queue_size: int = 4, ordered=True):
+        """
+        Initialize pipeline configuration.
+
+        Keyword Arguments:
+            parse_workers {int} -- Number of parser processes, chunks are parsed in
+                the scraper thread if 0 (default: {2})
+            queue_size {int} -- Max number of parsed chunks waiting to be consumed
+                on top of those being parsed (default: {4})
+            ordered {bool} -- Yield chunks in scraped order, otherwise as soon as
+                they are parsed (default: {True})
+        """
+        self.parse_workers = parse_workers
+        """Number of parser processes."""
+        self.queue_size = queue_size
+        """Max number of parsed chunks waiting to be consumed."""
+        self.ordered = ordered
+        """Whether parsed chunks are yielded in scraped order."""
+
+    @staticmethod
+    def _parse_inline(parse: Callable, chunk) -> Future:
+        """Parse chunk in current thread, returning a completed future."""
+        future = Future()
+        try:
+            future.set_result(parse(chunk))
+        except Exception as parse_exp:  # pylint: disable=broad-except
+            future.set_exception(parse_exp)
+        return future
+
+    def _scrape(self, chunks: Iterable, parse: Callable, executor, run: _Run):
+        """
+        Submit scraped chunks to be parsed, body of the scraper thread.
+
+        Futures are queued in scraped order if ordered, otherwise by their done
+        callback once parsed. Futures are never kept here, the end marker holds the
+        number of submitted chunks the consumer has to wait for instead.
+        """
+        submitted = 0
+        try:
+            for chunk in chunks:
+                while not run.slots.acquire(timeout=self.POLL_INTERVAL):
+                    if run.stop.is_set():
+                        return
+                if run.stop.is_set():
+                    return
+                if executor is None:
+                    future = self._parse_inline(parse, chunk)
+                else:
+                    future = executor.submit(parse, chunk)
+                submitted += 1
+                if self.ordered:
+                    run.results.put(future)
+                else:
+                    future.add_done_callback(run.results.put)
+        except Exception as scrape_exp:  # pylint: disable=broad-except
+            run.results.put(_ScrapeFailure(scrape_exp))
+        finally:
+            run.results.put(_ScrapeEnd(submitted))
+
+    # pylint: disable=bad-continuation
+    def run(self, chunks: Iterable, parse: Callable) -> Generator:
+        """
+        Parse scraped chunks concurrently.
+
+        Arguments:
+            chunks {Iterable} -- Raw chunks, iterated in the scraper thread
+            parse {Callable} -- Picklable function parsing a raw chunk
+
+        Returns:
+            Generator -- Generator yielding parsed chunks
+
+        Raises:
+            Exception -- First exception raised while scraping or parsing
+        """
+        run = _Run(self.parse_workers + self.queue_size)
+        executor = None
+        if self.parse_workers > 0:
+            executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+            # Start worker processes before the scraper thread, never fork threads
+            executor.submit(int).result()
+        scraper = threading.Thread(
+            target=self._scrape,
+            args=(chunks, parse, executor, run),
+            name="scraper",
+            daemon=True,
+        )
+        scraper.start()
+        try:
+            consumed, submitted = 0, None
+            while submitted is None or consumed < submitted:
+                item = run.results.get()
+                if isinstance(item, _ScrapeEnd):
+                    submitted = item.chunks
+                    continue
+                if isinstance(item, _ScrapeFailure):
+                    raise item.exception
+                parsed = item.result()
+                consumed += 1
+                run.slots.release()
+                yield parsed
+        finally:
+            run.stop.set()
+            scraper.join()
+            if executor is not None:
+                executor.shutdown(wait=True)
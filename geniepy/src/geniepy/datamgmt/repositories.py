@@ -1,19 +1,34 @@
 """Data Access Repositories to abstract interation with databases."""
-from typing import Generator
+from typing import Generator, Iterable
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import json
+import os
+import re
+import shutil
+import uuid
 import pandas as pd
 from pandas import DataFrame
-from google.oauth2 import service_account
+from google.cloud import bigquery
 import pandas_gbq
-from sqlalchemy import create_engine, Table
-from geniepy.errors import DaoError, ConnectionError
-from geniepy.datamgmt.tables import RepoProperties
+from sqlalchemy import Table, BigInteger, Float, Integer, bindparam, text
+from geniepy.errors import DaoError
+from geniepy.datamgmt.connections import REGISTRY, ConnectionRegistry
+from geniepy.datamgmt.tables import RepoProperties, StringList, list_columns
+
+GBQ_TYPES = {BigInteger: "INTEGER"}
+"""GBQ field types of sqlalchemy types not named after them."""
+SAVE_MODES = ("append", "upsert")
+"""Modes of saving records to repositories."""
 
 
 class BaseRepository(ABC):
     """Base Abstract Class for Data Access Object Repositories."""
 
-    __slots__ = ["_table", "_tablename", "_pkey"]
+    __slots__ = ["_table", "_tablename", "_pkey", "_list_columns"]
+
+    DEFERRED_UPSERTS = False
+    """Whether upserts within bulk loads are only written once the bulk load ends."""
 
     @property
     def tablename(self) -> str:
@@ -23,7 +38,7 @@ class BaseRepository(ABC):
 
     @property
     def query_all(self) -> str:
-        """Generate query string to query entire table."""
+        """Generate query string to query entire table, in no particular order."""
         return f"SELECT * FROM {self.tablename};"
 
     def query_pkey(self, val) -> str:
@@ -36,14 +51,34 @@ class BaseRepository(ABC):
             # pylint: disable=no-member
             return f"SELECT * FROM {self.tablename} WHERE {self._pkey}={val};"
 
+    @contextmanager
+    def bulk_load(self):
+        """
+        Context in which large numbers of records are saved, i.e. full downloads.
+
+        Repositories tune their connections for throughput within the context, by
+        default saves are left as they are.
+        """
+        yield self
+
+    @staticmethod
+    def check_mode(mode: str):
+        """Raise DaoError if save mode is unknown."""
+        if mode not in SAVE_MODES:
+            raise DaoError(f"Unknown save mode {mode}, expected one of {SAVE_MODES}")
+
     @abstractmethod
-    def save(self, payload: DataFrame):
+    def save(self, payload: DataFrame, mode: str = "append"):
         """
         Save payload to database table.
 
         Arguments:
             payload {DataFrame} -- the payload to be stored in db
 
+        Keyword Arguments:
+            mode {str} -- "append" records, or "upsert" them replacing the stored
+                records with the same primary key (default: {"append"})
+
         Raises:
             DaoError: if cannot save payload to db
         """
@@ -52,6 +87,35 @@ class BaseRepository(ABC):
     def delete_all(self):
         """Delete all records in repository."""
 
+    @abstractmethod
+    def delete_pkeys(self, values: list):
+        """
+        Delete all records with the given primary key values.
+
+        Arguments:
+            values {list} -- The primary key values of the records to be deleted
+
+        Raises:
+            DaoError: if cannot delete records from db
+        """
+
+    @abstractmethod
+    # pylint: disable=bad-continuation
+    def query_pkeys(
+        self, values: Iterable, chunksize: int
+    ) -> Generator[DataFrame, None, None]:
+        """
+        Query records by many primary key values in a few round trips.
+
+        Arguments:
+            values {Iterable} -- The primary key values of the records
+            chunksize {int} -- Number of rows of dataframe per chunk
+
+        Returns:
+            Generator[DataFrame] -- Generator of the matching records, in no
+                particular order. Values without records are left out.
+        """
+
     @abstractmethod
     # pylint: disable=bad-continuation
     def query(self, query: str, chunksize: int) -> Generator[DataFrame, None, None]:
@@ -70,55 +134,360 @@ class BaseRepository(ABC):
 class SqlRepository(BaseRepository):
     """Implementation of Sqlite Data Access Object Repository."""
 
-    __slots__ = ["_engine"]
+    __slots__ = [
+        "_engine",
+        "_bulk_connection",
+        "_indexes",
+        "_unique",
+        "_pkey_dropped",
+    ]
+
+    DELETE_BATCH = 500
+    """Max number of primary key values per delete statement."""
+    LOOKUP_BATCH = 500
+    """Max number of primary key values per lookup query."""
+    INSERT_BATCH = 10000
+    """Max number of records per executemany insert."""
+    BULK_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+    }
+    """SQLite connection settings applied during bulk loads (256MB page cache)."""
+
+    @property
+    def query_all(self) -> str:
+        """Generate query string to query entire table, ordered by primary key."""
+        return f"SELECT * FROM {self.tablename} ORDER BY {self._pkey};"
 
-    def __init__(self, db_loc: str, propty: RepoProperties):
+    # pylint: disable=bad-continuation
+    def __init__(
+        self, db_loc: str, propty: RepoProperties, registry: ConnectionRegistry = None
+    ):
         """
-        Initialize DAO repository and create table.
+        Initialize DAO repository and create table if missing.
 
         Arguments:
             db_loc {str} -- location of underlying database
             propty {RepoProperties} -- Repository properties structure
+
+        Keyword Arguments:
+            registry {ConnectionRegistry} -- Registry of the engine shared with
+                other repositories of the database (default: {REGISTRY})
         """
         self._tablename = propty.tablename
         self._table = propty.table
         self._pkey = propty.pkey
-        # Create sql engine
-        self._engine = create_engine(db_loc)
+        self._list_columns = list_columns(propty.table)
+        # Get sql engine shared by the database repositories
+        self._engine = (registry or REGISTRY).engine(db_loc)
+        self._bulk_connection = None
+        self._indexes = self.index_statements(propty)
+        self._pkey_dropped = False
+        self._unique = propty.unique
         # Create Table
-        self._table.create(self._engine)
+        self._table.create(self._engine, checkfirst=True)
+        self.create_indexes()
+
+    @staticmethod
+    def index_statements(propty: RepoProperties) -> [(str, str)]:
+        """
+        Generate create and drop statements of the repository indexes.
+
+        The primary key index comes first, followed by the extra indexed columns.
+
+        Arguments:
+            propty {RepoProperties} -- Repository properties structure
 
-    def save(self, payload: DataFrame):
+        Returns:
+            [(str, str)] -- Create and drop statement of each index
+        """
+        columns = [(propty.pkey, propty.unique)]
+        columns += [(col, False) for col in propty.indexes if col != propty.pkey]
+        statements = []
+        for col, unique in columns:
+            name = f"ix_{propty.tablename}_{col}"
+            create = (
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+                f"ON {propty.tablename} ({col})"
+            )
+            statements.append((create, f"DROP INDEX IF EXISTS {name}"))
+        return statements
+
+    def create_indexes(self):
+        """Create missing indexes of the primary key and extra indexed columns."""
+        bind = self._bulk_connection or self._engine
+        for create, _ in self._indexes:
+            bind.execute(create)
+        self._pkey_dropped = False
+
+    def _drop_indexes(self):
+        """Drop indexes, i.e. before loading an empty table."""
+        bind = self._bulk_connection or self._engine
+        for _, drop in self._indexes:
+            bind.execute(drop)
+        self._pkey_dropped = True
+
+    def _restore_pkey_index(self, connection):
+        """
+        Create primary key index dropped by bulk load before replacing records.
+
+        Upserts and deletes look records up by primary key, without index each of
+        them would scan the table, and replacing records relies on unique indexes.
+        """
+        if self._pkey_dropped:
+            create, _ = self._indexes[0]
+            connection.execute(create)
+            self._pkey_dropped = False
+
+    def _is_empty(self) -> bool:
+        """Check whether the table holds no records."""
+        bind = self._bulk_connection or self._engine
+        return bind.execute(self._table.select().limit(1)).first() is None
+
+    def save(self, payload: DataFrame, mode: str = "append"):
         """
         Save payload to database table.
 
+        Records are upserted by replacing them (INSERT OR REPLACE) if the primary
+        key index is unique on SQLite, otherwise by deleting the stored records with
+        the same primary keys before inserting the new ones, in the same transaction.
+
         Arguments:
             payload {DataFrame} -- the payload to be stored in db
 
+        Keyword Arguments:
+            mode {str} -- "append" records, or "upsert" them replacing the stored
+                records with the same primary key (default: {"append"})
+
         Raises:
             DaoError: if cannot save payload to db
         """
+        self.check_mode(mode)
+        unknown = payload.columns.difference(self._table.columns.keys())
+        if not unknown.empty:
+            raise DaoError(f"Columns not in table {self._tablename}: {list(unknown)}")
         try:
-            payload.to_sql(
-                self._tablename,
-                con=self._engine,
-                if_exists="append",
-                index=False,
-                method="multi",
-            )
+            insert = self._table.insert()
+            if mode == "upsert":
+                # Last record of each primary key wins
+                payload = payload.drop_duplicates(self._pkey, keep="last")
+            replace = self._unique and self._engine.dialect.name == "sqlite"
+            if mode == "upsert" and replace:
+                insert = insert.prefix_with("OR REPLACE")
+            # List columns are encoded by their column type on insert
+            records = self._records(payload)
+            with self._begin() as connection:
+                if mode == "upsert":
+                    self._restore_pkey_index(connection)
+                if mode == "upsert" and not replace:
+                    self._delete_batches(connection, payload[self._pkey])
+                for start in range(0, len(records), self.INSERT_BATCH):
+                    batch = records[start : start + self.INSERT_BATCH]
+                    connection.execute(insert, batch)
         except Exception as sql_exp:
             raise DaoError(sql_exp)
 
+    @staticmethod
+    def _records(payload: DataFrame) -> [dict]:
+        """Convert payload into records of plain python values, NaN into None."""
+        values = payload.astype(object).where(payload.notna(), None)
+        return values.to_dict("records")
+
+    @contextmanager
+    def _begin(self):
+        """Begin transaction on bulk load connection if any, otherwise on engine."""
+        if self._bulk_connection is None:
+            with self._engine.begin() as connection:
+                yield connection
+        else:
+            with self._bulk_connection.begin():
+                yield self._bulk_connection
+
+    @contextmanager
+    def bulk_load(self):
+        """
+        Context in which large numbers of records are saved, i.e. full downloads.
+
+        Saves, deletes and queries within the context share a single connection.
+        SQLite connections are tuned with BULK_PRAGMAS (write ahead log, relaxed
+        synchronous and large page cache), and restored to their previous settings
+        once the context exits. Each save is still committed as a whole, so an
+        interrupted bulk load keeps the records saved so far. Indexes of tables
+        empty when the bulk load starts are only created once it ends, indexing
+        the loaded records at once is faster than updating indexes on each insert.
+        The primary key index is created again by the first upsert or delete, so
+        they don't scan the table. If the bulk load fails, its error is raised once
+        indexes and settings are restored as far as possible.
+        """
+        if self._bulk_connection is not None:
+            # Nested bulk loads share the outer one
+            yield self
+            return
+        with self._engine.connect() as connection:
+            previous = self._apply_pragmas(connection, self.BULK_PRAGMAS)
+            self._bulk_connection = connection
+            try:
+                if self._is_empty():
+                    self._drop_indexes()
+                yield self
+            except BaseException:
+                self._end_bulk_load(connection, previous, failed=True)
+                raise
+            self._end_bulk_load(connection, previous)
+
+    def _end_bulk_load(self, connection, previous: dict, failed: bool = False):
+        """
+        Create indexes dropped by bulk load and restore connection settings.
+
+        Settings are restored even if indexes can't be created. Records appended
+        with the primary key of earlier records while the unique primary key index
+        was dropped are deleted, as the index would have rejected them, and reported
+        once the index is created.
+
+        Arguments:
+            connection {Connection} -- the bulk load connection
+            previous {dict} -- the connection settings to be restored
+
+        Keyword Arguments:
+            failed {bool} -- whether the bulk load failed, cleanup errors are not
+                raised over the bulk load error (default: {False})
+
+        Raises:
+            DaoError -- If indexes or settings can't be restored, or duplicate
+                records were deleted
+        """
+        duplicates = 0
+        try:
+            try:
+                if self._unique and self._pkey_dropped:
+                    duplicates = self._delete_duplicates()
+                self.create_indexes()
+            finally:
+                self._bulk_connection = None
+                self._apply_pragmas(connection, previous)
+        except Exception as sql_exp:
+            if not failed:
+                raise DaoError(sql_exp)
+        if duplicates and not failed:
+            raise DaoError(
+                f"Deleted {duplicates} records appended with duplicate {self._pkey}"
+            )
+
+    def _delete_duplicates(self) -> int:
+        """Delete SQLite records with the primary key of earlier ones, return count."""
+        bind = self._bulk_connection or self._engine
+        if bind.dialect.name != "sqlite":
+            return 0
+        result = bind.execute(
+            f"DELETE FROM {self._tablename} WHERE rowid NOT IN "
+            f"(SELECT MIN(rowid) FROM {self._tablename} GROUP BY {self._pkey})"
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _apply_pragmas(connection, pragmas: dict) -> dict:
+        """Apply SQLite pragmas to connection, returning their previous values."""
+        if connection.dialect.name != "sqlite":
+            return {}
+        previous = {}
+        for name, value in pragmas.items():
+            previous[name] = connection.execute(f"PRAGMA {name}").scalar()
+            connection.execute(f"PRAGMA {name}={value}")
+        return previous
+
+    def _decode_lists(
+        self, generator: Generator[DataFrame, None, None]
+    ) -> Generator[DataFrame, None, None]:
+        """Decode JSON array strings of list columns back into lists."""
+        for chunk_df in generator:
+            for col in self._list_columns:
+                if col in chunk_df:
+                    col_type = self._table.columns[col].type
+                    chunk_df[col] = [
+                        col_type.process_result_value(val, None)
+                        for val in chunk_df[col]
+                    ]
+            yield chunk_df
+
     def delete_all(self):
         """Delete all records in repository."""
-        self._table.drop(self._engine)
-        self._table.create(self._engine)
+        bind = self._bulk_connection or self._engine
+        self._table.drop(bind)
+        self._table.create(bind)
+        if self._bulk_connection is None:
+            self.create_indexes()
+        else:
+            # Bulk loads create indexes once the table is loaded
+            self._pkey_dropped = True
+
+    def delete_pkeys(self, values: list):
+        """
+        Delete all records with the given primary key values.
+
+        Values are deleted in batches within a single transaction.
+
+        Arguments:
+            values {list} -- The primary key values of the records to be deleted
+
+        Raises:
+            DaoError: if cannot delete records from db
+        """
+        try:
+            with self._begin() as connection:
+                self._restore_pkey_index(connection)
+                self._delete_batches(connection, values)
+        except Exception as sql_exp:
+            raise DaoError(sql_exp)
+
+    def _delete_batches(self, connection, values: list):
+        """Delete records with primary key values, DELETE_BATCH values at a time."""
+        # Numpy scalars are not supported by database drivers
+        values = pd.Index(values).unique().tolist()
+        column = self._table.columns[self._pkey]
+        for start in range(0, len(values), self.DELETE_BATCH):
+            batch = values[start : start + self.DELETE_BATCH]
+            connection.execute(self._table.delete().where(column.in_(batch)))
+
+    # pylint: disable=bad-continuation
+    def query_pkeys(
+        self, values: Iterable, chunksize: int
+    ) -> Generator[DataFrame, None, None]:
+        """
+        Query records by many primary key values in a few round trips.
+
+        Values are looked up in batches of LOOKUP_BATCH, one IN query each.
+
+        Arguments:
+            values {Iterable} -- The primary key values of the records
+            chunksize {int} -- Number of rows of dataframe per chunk
+
+        Returns:
+            Generator[DataFrame] -- Generator of the matching records, in no
+                particular order. Values without records are left out.
+        """
+        values = pd.Index(list(values)).unique().tolist()
+        # Plain text query, list columns are decoded by query
+        query = text(
+            f"SELECT * FROM {self.tablename} WHERE {self._pkey} IN :keys"
+        ).bindparams(bindparam("keys", expanding=True))
+        con = self._bulk_connection or self._engine
+        for start in range(0, len(values), self.LOOKUP_BATCH):
+            batch = values[start : start + self.LOOKUP_BATCH]
+            generator = pd.read_sql_query(
+                query, con, params={"keys": batch}, chunksize=chunksize
+            )
+            yield from self._decode_lists(generator)
 
     # pylint: disable=bad-continuation
     def query(self, query: str, chunksize: int) -> Generator[DataFrame, None, None]:
         """
         Query DAO repo and returns a generator of DataFrames with query results.
 
+        Results are streamed from a single cursor. The query runs as given, query_all
+        orders the whole table by primary key, which is a single pass over its index.
+
         Keyword Arguments:
             query {str} -- Query string
             chunksize {int} -- Number of rows of dataframe per chunk
@@ -129,18 +498,41 @@ class SqlRepository(BaseRepository):
         if query is None:
             raise DaoError
         # If query string provided
-        generator = pd.read_sql_query(query, self._engine, chunksize=chunksize)
+        con = self._bulk_connection or self._engine
+        # Stream rows instead of buffering them on drivers supporting it
+        con = con.execution_options(stream_results=True)
+        generator = pd.read_sql_query(query, con, chunksize=chunksize)
+        if self._list_columns:
+            return self._decode_lists(generator)
         return generator
 
 
 class GbqRepository(BaseRepository):  # pragma: no cover
-    """Implementation of Sqlite Data Access Object Repository."""
+    """
+    Implementation of Google BigQuery Data Access Object Repository.
+
+    BigQuery has no indexes, the unique and indexes repository properties are
+    ignored.
+    """
 
-    __slots__ = ["_proj", "_credentials_path"]
+    __slots__ = ["_proj", "_credentials_path", "_credentials", "_registry", "_upserts"]
+
+    DEFERRED_UPSERTS = True
+    LOOKUP_BATCH = 10000
+    """Max number of primary key values per lookup or delete query job."""
+    PAGE_SIZE = 10000
+    """Number of rows per result page fetched from query jobs."""
+    MERGE_BATCH = 100000
+    """Min number of buffered records merged at once within bulk loads."""
 
     # pylint: disable=bad-continuation
     def __init__(
-        self, db_loc: str, propty: RepoProperties, dataset: str, credentials: str
+        self,
+        db_loc: str,
+        propty: RepoProperties,
+        dataset: str,
+        credentials: str,
+        registry: ConnectionRegistry = None,
     ):
         """
         Initialize DAO repository and create table.
@@ -150,24 +542,33 @@ class GbqRepository(BaseRepository):  # pragma: no cover
             propty {RepoProperties} -- Repository properties structure
             dataset {str} -- The GBQ dataset the table belongs to
             credentials_path {str} -- path to gcp credentials json
+
+        Keyword Arguments:
+            registry {ConnectionRegistry} -- Registry of the client shared with
+                other repositories of the project (default: {REGISTRY})
         """
         self._proj = db_loc
         self._tablename = dataset + "." + propty.tablename
         self._pkey = propty.pkey
         self._table = self.get_dict_schema(propty.table)
+        self._list_columns = list_columns(propty.table)
         self._credentials_path = credentials
+        self._credentials = None
+        self._registry = registry or REGISTRY
+        self._upserts = None
         self.connect()
 
     def connect(self):
-        """Connect to Google BigQuery."""
-        try:
-            bgq_credentials = service_account.Credentials.from_service_account_file(
-                self._credentials_path,
-            )
-            pandas_gbq.context.credentials = bgq_credentials
-            pandas_gbq.context.project = self._proj
-        except Exception as exp:
-            raise ConnectionError(exp)
+        """
+        Connect to Google BigQuery.
+
+        Credentials are passed to each pandas_gbq call instead of being set on its
+        global context, so repositories of different projects can coexist.
+
+        Raises:
+            ConnectionError: if credentials cannot be loaded
+        """
+        self._credentials = self._registry.credentials(self._credentials_path)
 
     @staticmethod
     def get_dict_schema(table_schema: Table) -> [dict]:
@@ -175,42 +576,234 @@ class GbqRepository(BaseRepository):  # pragma: no cover
         # flake8: noqa
         coldict = lambda col: {
             "name": col.key,
-            "type": col.type.__class__.__name__.upper(),
+            "type": GBQ_TYPES.get(type(col.type), type(col.type).__name__.upper()),
             "mode": "NULLABLE" if col.nullable else "REQUIRED",
         }
-        return [coldict(col) for col in table_schema.get_children()]
+        # List of strings are stored as repeated string fields
+        listdict = lambda col: {"name": col.key, "type": "STRING", "mode": "REPEATED"}
+        return [
+            listdict(col) if isinstance(col.type, StringList) else coldict(col)
+            for col in table_schema.get_children()
+        ]
 
-    def save(self, payload: DataFrame):
+    def save(self, payload: DataFrame, mode: str = "append"):
         """
         Save payload to database table.
 
+        Records are upserted by loading them into a staging table, merged into the
+        table by a single MERGE job. Within bulk loads upserted records are buffered
+        and merged MERGE_BATCH records at a time.
+
         Arguments:
             payload {DataFrame} -- the payload to be stored in db
 
+        Keyword Arguments:
+            mode {str} -- "append" records, or "upsert" them replacing the stored
+                records with the same primary key (default: {"append"})
+
         Raises:
             DaoError: if cannot save payload to db
         """
+        self.check_mode(mode)
         try:
-            pandas_gbq.to_gbq(
-                payload, self._tablename, if_exists="append", table_schema=self._table,
-            )
+            if mode == "upsert" and self._upserts is not None:
+                self._upserts.append(payload)
+                if sum(len(upsert) for upsert in self._upserts) >= self.MERGE_BATCH:
+                    self._flush_upserts()
+            elif mode == "upsert":
+                self._merge(payload)
+            elif self._list_columns:
+                self._load_json(payload)
+            else:
+                pandas_gbq.to_gbq(
+                    payload,
+                    self._tablename,
+                    if_exists="append",
+                    table_schema=self._table,
+                    project_id=self._proj,
+                    credentials=self._credentials,
+                )
         except Exception as sql_exp:
             raise DaoError(sql_exp)
 
+    @contextmanager
+    def bulk_load(self):
+        """
+        Context in which large numbers of records are saved, i.e. full downloads.
+
+        Upserts within the context are buffered and merged MERGE_BATCH records at a
+        time, instead of running a staging load and a MERGE job per saved chunk.
+        Buffered records are merged once the context exits, unless it exits with an
+        error, and before deletes and queries.
+        """
+        if self._upserts is not None:
+            # Nested bulk loads share the outer one
+            yield self
+            return
+        self._upserts = []
+        try:
+            yield self
+            try:
+                self._flush_upserts()
+            except Exception as gbq_exp:
+                raise DaoError(gbq_exp)
+        finally:
+            self._upserts = None
+
+    def _flush_upserts(self):
+        """Merge records buffered by upserts within bulk load, if any."""
+        if self._upserts:
+            payload = pd.concat(self._upserts, ignore_index=True)
+            self._upserts.clear()
+            self._merge(payload)
+
+    def _client(self) -> bigquery.Client:
+        """Get BigQuery client of project, shared with its other repositories."""
+        return self._registry.client(self._proj, self._credentials_path)
+
+    def _load_json(self, payload: DataFrame, tablename: str = None):
+        """
+        Append payload to table with a newline delimited JSON load job.
+
+        pandas_gbq loads dataframes as csv, which cannot hold REPEATED fields.
+        """
+        client = self._client()
+        job_config = bigquery.LoadJobConfig(
+            schema=[
+                bigquery.SchemaField(col["name"], col["type"], mode=col["mode"])
+                for col in self._table
+            ],
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        )
+        rows = json.loads(payload.to_json(orient="records"))
+        destination = f"{self._proj}.{tablename or self._tablename}"
+        client.load_table_from_json(rows, destination, job_config=job_config).result()
+
+    def merge_query(self, staging: str) -> str:
+        """Generate query merging staging table records into table by primary key."""
+        columns = [col["name"] for col in self._table]
+        updates = ", ".join(f"{col} = S.{col}" for col in columns if col != self._pkey)
+        return (
+            f"MERGE `{self._proj}.{self._tablename}` T "
+            f"USING `{self._proj}.{staging}` S ON T.{self._pkey} = S.{self._pkey} "
+            f"WHEN MATCHED THEN UPDATE SET {updates} "
+            f"WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) "
+            f"VALUES ({', '.join('S.' + col for col in columns)});"
+        )
+
+    def _merge(self, payload: DataFrame):
+        """Upsert payload through a staging table and a MERGE job."""
+        # MERGE fails if several staged records match the same record
+        payload = payload.drop_duplicates(self._pkey, keep="last")
+        staging = f"{self._tablename}_staging_{uuid.uuid4().hex}"
+        client = self._client()
+        try:
+            self._load_json(payload, staging)
+            client.query(self.merge_query(staging)).result()
+        finally:
+            client.delete_table(f"{self._proj}.{staging}", not_found_ok=True)
+
     def delete_all(self):
         """Delete all records in repository."""
+        if self._upserts:
+            self._upserts.clear()
         pandas_gbq.to_gbq(
             pd.DataFrame(),
             self.tablename,
             if_exists="replace",
             table_schema=self._table,
+            project_id=self._proj,
+            credentials=self._credentials,
+        )
+
+    def _keys_param(self, values: list) -> bigquery.ArrayQueryParameter:
+        """Create @keys array query parameter of primary key values."""
+        field = next(col for col in self._table if col["name"] == self._pkey)
+        param_type = "INT64" if field["type"] == "INTEGER" else field["type"]
+        return bigquery.ArrayQueryParameter("keys", param_type, values)
+
+    def delete_pkeys(self, values: list):
+        """
+        Delete all records with the given primary key values.
+
+        Values are passed as array query parameters of LOOKUP_BATCH values, one DML
+        job each, keeping requests within BigQuery's query size limits.
+
+        Arguments:
+            values {list} -- The primary key values of the records to be deleted
+
+        Raises:
+            DaoError: if cannot delete records from db
+        """
+        values = pd.Index(values).unique().tolist()
+        query = (
+            f"DELETE FROM `{self._proj}.{self._tablename}` "
+            f"WHERE {self._pkey} IN UNNEST(@keys)"
         )
+        try:
+            self._flush_upserts()
+            client = self._client()
+            for start in range(0, len(values), self.LOOKUP_BATCH):
+                batch = values[start : start + self.LOOKUP_BATCH]
+                job_config = bigquery.QueryJobConfig(
+                    query_parameters=[self._keys_param(batch)]
+                )
+                client.query(query, job_config=job_config).result()
+        except Exception as gbq_exp:
+            raise DaoError(gbq_exp)
+
+    # pylint: disable=bad-continuation
+    def query_pkeys(
+        self, values: Iterable, chunksize: int
+    ) -> Generator[DataFrame, None, None]:
+        """
+        Query records by many primary key values in a few round trips.
+
+        Values are passed as array query parameters of LOOKUP_BATCH values, one
+        query job each, whose result pages are streamed as dataframes.
+
+        Arguments:
+            values {Iterable} -- The primary key values of the records
+            chunksize {int} -- Number of rows of dataframe per chunk
+
+        Returns:
+            Generator[DataFrame] -- Generator of the matching records, in no
+                particular order. Values without records are left out.
+        """
+        values = pd.Index(list(values)).unique().tolist()
+        query = (
+            f"SELECT * FROM `{self._proj}.{self._tablename}` "
+            f"WHERE {self._pkey} IN UNNEST(@keys)"
+        )
+        try:
+            self._flush_upserts()
+            client = self._client()
+            for start in range(0, len(values), self.LOOKUP_BATCH):
+                batch = values[start : start + self.LOOKUP_BATCH]
+                job_config = bigquery.QueryJobConfig(
+                    query_parameters=[self._keys_param(batch)]
+                )
+                rows = client.query(query, job_config=job_config).result(
+                    page_size=chunksize
+                )
+                for chunk_df in rows.to_dataframe_iterable():
+                    if not chunk_df.empty:
+                        yield chunk_df
+        except Exception as gbq_exp:
+            raise DaoError(gbq_exp)
 
     # pylint: disable=bad-continuation
     def query(self, query: str, chunksize: int) -> Generator[DataFrame, None, None]:
         """
         Query DAO repo and returns a generator of DataFrames with query results.
 
+        Results are read from a single query job, whose result pages of PAGE_SIZE
+        rows are streamed and split in chunks. Paging with LIMIT and OFFSET instead
+        would run a job sorting the whole table on every chunk, and keyset
+        pagination would still run a job (billed for a full scan) per chunk.
+        Results are in no particular order, ordering whole tables would sort them
+        on a single BigQuery worker, which runs out of resources on large tables.
+
         Keyword Arguments:
             query {str} -- Query string
             chunksize {int} -- Number of rows of dataframe per chunk
@@ -221,16 +814,446 @@ class GbqRepository(BaseRepository):  # pragma: no cover
         if query is None:
             raise DaoError
         try:
-            offset = 0
-            # Remove semicolon if exists in original query to add ordering to query
-            query = query.strip(";")
-            while True:
-                add_query = f" ORDER BY {self._pkey} LIMIT {chunksize} OFFSET {offset};"
-                gbq_query = query + add_query
-                response_df = pandas_gbq.read_gbq(gbq_query)
-                if response_df.empty:
-                    return
-                offset += chunksize
-                yield response_df
+            self._flush_upserts()
+            job = self._client().query(query)
+            rows = job.result(page_size=max(chunksize, self.PAGE_SIZE))
+            for page_df in rows.to_dataframe_iterable():
+                for start in range(0, len(page_df), chunksize):
+                    chunk_df = page_df.iloc[start : start + chunksize]
+                    yield chunk_df.reset_index(drop=True)
         except Exception as gbq_exp:
             raise DaoError(gbq_exp)
+
+
+SELECT_PATTERN = re.compile(
+    r"^\s*SELECT\s+(?P<columns>.+?)\s+FROM\s+(?P<table>[\w.]+)"
+    r"(?:\s+WHERE\s+(?P<where>.+?))?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+"""Pattern of the queries supported by parquet repositories."""
+CONDITION_PATTERN = re.compile(
+    r"^\s*(?P<column>\w+)\s*(?P<op><=|>=|!=|<>|=|<|>|\bIN\b)\s*(?P<value>.+?)\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+"""Pattern of the conditions of parquet repository queries."""
+PREDICATE_OPS = {
+    "=": lambda col, val: col == val,
+    "!=": lambda col, val: col != val,
+    "<>": lambda col, val: col != val,
+    "<": lambda col, val: col < val,
+    "<=": lambda col, val: col <= val,
+    ">": lambda col, val: col > val,
+    ">=": lambda col, val: col >= val,
+    "IN": lambda col, val: col.isin(val),
+}
+"""Predicates of the comparison operators of parquet repository queries."""
+
+
+def _parse_literal(literal: str):
+    """Parse SQL string or number literal."""
+    literal = literal.strip()
+    if len(literal) >= 2 and literal[0] == literal[-1] == "'":
+        return literal[1:-1].replace("''", "'")
+    try:
+        return int(literal)
+    except ValueError:
+        pass
+    try:
+        return float(literal)
+    except ValueError:
+        raise DaoError(f"Unsupported literal {literal}")
+
+
+def parse_select(query: str) -> ([str], str, [(str, str, object)]):
+    """
+    Parse simple SELECT query, i.e. SELECT a, b FROM t WHERE a = 1 AND b IN ('x').
+
+    Arguments:
+        query {str} -- Query string
+
+    Raises:
+        DaoError: if query is not a simple SELECT query
+
+    Returns:
+        ([str], str, [(str, str, object)]) -- Selected columns (None for all
+            columns), table name and (column, operator, value) conditions
+    """
+    match = SELECT_PATTERN.match(query or "")
+    if match is None:
+        raise DaoError(f"Unsupported query {query}")
+    columns = [col.strip() for col in match.group("columns").split(",")]
+    if columns == ["*"]:
+        columns = None
+    conditions = []
+    where = match.group("where")
+    for condition in (
+        re.split(r"\s+AND\s+", where, flags=re.IGNORECASE) if where else []
+    ):
+        cond_match = CONDITION_PATTERN.match(condition)
+        if cond_match is None:
+            raise DaoError(f"Unsupported condition {condition}")
+        op = cond_match.group("op").upper()
+        value = cond_match.group("value")
+        if op == "IN":
+            if not (value.startswith("(") and value.endswith(")")):
+                raise DaoError(f"Unsupported condition {condition}")
+            items = re.findall(r"'(?:[^']|'')*'|[^,\s][^,]*", value[1:-1])
+            value = [_parse_literal(item) for item in items]
+        else:
+            value = _parse_literal(value)
+        conditions.append((cond_match.group("column"), op, value))
+    return columns, match.group("table"), conditions
+
+
+class ParquetRepository(BaseRepository):
+    """
+    Implementation of local Parquet files Data Access Object Repository.
+
+    Each table is stored in its own directory, partitioned by primary key: integer
+    keys (i.e. pmids) by ranges of RANGE_SIZE values, string keys (i.e. hex
+    digests) by their first PREFIX_LENGTH characters. Each partition directory holds
+    one or more Parquet files, a save appends one file per partition it touches, and
+    partitions are rewritten as a single file by deletes and by upserts replacing
+    stored records.
+
+    Queries are limited to simple SELECT queries: column projection and conditions
+    comparing columns to literals, joined by AND. Only the selected and compared
+    columns are read, and conditions on the primary key skip the partitions that
+    cannot match. Results are ordered by primary key, partitions are read one at a
+    time. Requires the optional pyarrow dependency.
+    """
+
+    __slots__ = ["_root", "_columns", "_range_size", "_prefix_length"]
+
+    RANGE_SIZE = 1000000
+    """Default number of integer key values per partition."""
+    COMPACT_RANGE_SIZE = 1 << 57
+    """Default number of big integer key values (compact digests) per partition."""
+    PREFIX_LENGTH = 2
+    """Default number of leading characters of string keys naming partitions."""
+
+    # pylint: disable=bad-continuation
+    def __init__(
+        self,
+        root: str,
+        propty: RepoProperties,
+        range_size: int = None,
+        prefix_length: int = PREFIX_LENGTH,
+    ):
+        """
+        Initialize DAO repository in root directory.
+
+        Arguments:
+            root {str} -- Directory holding a directory per table
+            propty {RepoProperties} -- Repository properties structure
+
+        Keyword Arguments:
+            range_size {int} -- Number of integer key values per partition, defaults
+                to RANGE_SIZE or COMPACT_RANGE_SIZE for big integers
+                (default: {None})
+            prefix_length {int} -- Number of leading characters of string keys
+                naming partitions (default: {PREFIX_LENGTH})
+        """
+        self._tablename = propty.tablename
+        self._table = propty.table
+        self._pkey = propty.pkey
+        self._list_columns = list_columns(propty.table)
+        self._root = os.path.join(root, propty.tablename)
+        self._columns = [col.name for col in propty.table.columns]
+        pkey_type = propty.table.columns[propty.pkey].type
+        if isinstance(pkey_type, Integer):
+            default_size = (
+                self.COMPACT_RANGE_SIZE
+                if isinstance(pkey_type, BigInteger)
+                else self.RANGE_SIZE
+            )
+            self._range_size = range_size or default_size
+        else:
+            self._range_size = None
+        self._prefix_length = prefix_length
+
+    def arrow_schema(self):
+        """Convert table schema into pyarrow schema."""
+        # pylint: disable=import-outside-toplevel
+        import pyarrow as pa
+
+        def arrow_type(col):
+            if isinstance(col.type, StringList):
+                return pa.list_(pa.string())
+            if isinstance(col.type, Integer):
+                return pa.int64()
+            if isinstance(col.type, Float):
+                return pa.float64()
+            return pa.string()
+
+        return pa.schema(
+            [
+                pa.field(col.name, arrow_type(col), nullable=col.nullable)
+                for col in self._table.columns
+            ]
+        )
+
+    def _partition_names(self, keys: pd.Series) -> pd.Series:
+        """Name partitions of primary key values."""
+        if self._range_size:
+            labels = (keys.astype("int64") // self._range_size).astype(str)
+        else:
+            labels = keys.astype(str).str[: self._prefix_length]
+        return f"{self._pkey}=" + labels
+
+    def _partition_order(self, name: str):
+        """Sort key of partition name, partitions are sorted like their keys."""
+        label = name.split("=", 1)[1]
+        return int(label) if self._range_size else label
+
+    def _list_partitions(self) -> [str]:
+        """List partition directories, sorted like their keys."""
+        if not os.path.isdir(self._root):
+            return []
+        names = [
+            name
+            for name in os.listdir(self._root)
+            if name.startswith(f"{self._pkey}=")
+            and os.path.isdir(os.path.join(self._root, name))
+        ]
+        return sorted(names, key=self._partition_order)
+
+    def _partition_files(self, partition: str) -> [str]:
+        """List Parquet files of partition."""
+        path = os.path.join(self._root, partition)
+        if not os.path.isdir(path):
+            return []
+        return sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.endswith(".parquet")
+        )
+
+    def _write_file(self, partition: str, payload: DataFrame) -> str:
+        """Write payload into new file of partition, atomically."""
+        # pylint: disable=import-outside-toplevel
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        directory = os.path.join(self._root, partition)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+        table = pa.Table.from_pandas(
+            payload[self._columns], schema=self.arrow_schema(), preserve_index=False
+        )
+        pq.write_table(table, path + ".part")
+        os.replace(path + ".part", path)
+        return path
+
+    def _read_partition(self, partition: str, columns: [str] = None) -> DataFrame:
+        """Read records of partition, optionally only some of its columns."""
+        # pylint: disable=import-outside-toplevel
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        files = self._partition_files(partition)
+        if not files:
+            return pd.DataFrame(columns=columns or self._columns)
+        tables = [pq.read_table(path, columns=columns) for path in files]
+        chunk_df = pa.concat_tables(tables).to_pandas()
+        for col in self._list_columns:
+            if col in chunk_df:
+                chunk_df[col] = [
+                    None if val is None else list(val) for val in chunk_df[col]
+                ]
+        return chunk_df
+
+    def _rewrite_partition(self, partition: str, keep: DataFrame):
+        """Replace files of partition with a single file of kept records."""
+        old_files = self._partition_files(partition)
+        if not keep.empty:
+            self._write_file(partition, keep)
+        for path in old_files:
+            os.remove(path)
+        if keep.empty:
+            shutil.rmtree(os.path.join(self._root, partition), ignore_errors=True)
+
+    def _prepare(self, payload: DataFrame) -> DataFrame:
+        """Check payload columns against table schema, adding missing nullables."""
+        unknown = payload.columns.difference(self._columns)
+        if not unknown.empty:
+            raise DaoError(f"Columns not in table {self._tablename}: {list(unknown)}")
+        for col in self._table.columns:
+            if col.name not in payload:
+                if not col.nullable:
+                    raise DaoError(f"Missing required column {col.name}")
+                payload = payload.assign(**{col.name: None})
+            elif not col.nullable and payload[col.name].isna().any():
+                raise DaoError(f"Null values in required column {col.name}")
+        return payload
+
+    def save(self, payload: DataFrame, mode: str = "append"):
+        """
+        Save payload to database table.
+
+        Records are appended as a new file in each partition they belong to.
+        Upserts first read the primary keys stored in the partitions they touch,
+        records with new keys are appended like other saves. Only partitions holding
+        records to be replaced are rewritten, without them, so upserting a download
+        of mostly new keys (i.e. PubMed baseline files) doesn't rewrite partitions
+        on every chunk.
+
+        Arguments:
+            payload {DataFrame} -- the payload to be stored in db
+
+        Keyword Arguments:
+            mode {str} -- "append" records, or "upsert" them replacing the stored
+                records with the same primary key (default: {"append"})
+
+        Raises:
+            DaoError: if cannot save payload to db
+        """
+        self.check_mode(mode)
+        payload = self._prepare(payload)
+        if mode == "upsert":
+            # Last record of each primary key wins
+            payload = payload.drop_duplicates(self._pkey, keep="last")
+        try:
+            partitions = self._partition_names(payload[self._pkey])
+            for partition, part_df in payload.groupby(partitions.values, sort=False):
+                if mode == "upsert" and self._replaces(partition, part_df):
+                    stored = self._read_partition(partition)
+                    stored = stored[~stored[self._pkey].isin(part_df[self._pkey])]
+                    merged = pd.concat([stored, part_df[self._columns]])
+                    self._rewrite_partition(partition, merged)
+                else:
+                    self._write_file(partition, part_df)
+        except Exception as parquet_exp:
+            raise DaoError(parquet_exp)
+
+    def _replaces(self, partition: str, payload: DataFrame) -> bool:
+        """Check whether partition holds records with payload primary keys."""
+        stored = self._read_partition(partition, [self._pkey])
+        return stored[self._pkey].isin(payload[self._pkey]).any()
+
+    def delete_all(self):
+        """Delete all records in repository."""
+        shutil.rmtree(self._root, ignore_errors=True)
+
+    def delete_pkeys(self, values: list):
+        """
+        Delete all records with the given primary key values.
+
+        Only the partitions of the values are rewritten.
+
+        Arguments:
+            values {list} -- The primary key values of the records to be deleted
+
+        Raises:
+            DaoError: if cannot delete records from db
+        """
+        keys = pd.Series(pd.Index(values).unique())
+        if keys.empty:
+            return
+        try:
+            for partition in self._partition_names(keys).unique():
+                stored = self._read_partition(partition)
+                deleted = stored[self._pkey].isin(keys)
+                if deleted.any():
+                    self._rewrite_partition(partition, stored[~deleted])
+        except Exception as parquet_exp:
+            raise DaoError(parquet_exp)
+
+    def _scan(
+        self, partitions: [str], columns: [str], conditions: list, chunksize: int
+    ) -> Generator[DataFrame, None, None]:
+        """
+        Read partitions in order, yielding matching records in chunks.
+
+        Chunks are sliced from each sorted partition, only the records left over at
+        the end of a partition (fewer than chunksize) are combined with the next.
+        """
+        selected = columns or self._columns
+        compared = [col for col, _, _ in conditions if col not in selected]
+        read_columns = list(dict.fromkeys(selected + compared + [self._pkey]))
+        leftover = None
+        for partition in partitions:
+            part_df = self._read_partition(partition, read_columns)
+            for col, op, value in conditions:
+                part_df = part_df[PREDICATE_OPS[op](part_df[col], value)]
+            if part_df.empty:
+                continue
+            part_df = part_df.sort_values(self._pkey, kind="mergesort")
+            part_df = part_df[selected].reset_index(drop=True)
+            offset = 0
+            if leftover is not None:
+                offset = chunksize - len(leftover)
+                leftover = pd.concat(
+                    [leftover, part_df.iloc[:offset]], ignore_index=True
+                )
+                if len(leftover) < chunksize:
+                    continue
+                yield leftover
+                leftover = None
+            while len(part_df) - offset >= chunksize:
+                yield part_df.iloc[offset : offset + chunksize].reset_index(drop=True)
+                offset += chunksize
+            if offset < len(part_df):
+                leftover = part_df.iloc[offset:].reset_index(drop=True)
+        if leftover is not None:
+            yield leftover
+
+    def _prune(self, conditions: list) -> [str]:
+        """List partitions that can hold records matching primary key conditions."""
+        partitions = self._list_partitions()
+        for col, op, value in conditions:
+            if col != self._pkey or op not in ("=", "IN"):
+                continue
+            keys = pd.Series(value if op == "IN" else [value])
+            try:
+                candidates = set(self._partition_names(keys))
+            except (TypeError, ValueError):
+                # Values of another type than the key never match
+                return []
+            partitions = [part for part in partitions if part in candidates]
+        return partitions
+
+    # pylint: disable=bad-continuation
+    def query_pkeys(
+        self, values: Iterable, chunksize: int
+    ) -> Generator[DataFrame, None, None]:
+        """
+        Query records by many primary key values in a few round trips.
+
+        Only the partitions of the values are read.
+
+        Arguments:
+            values {Iterable} -- The primary key values of the records
+            chunksize {int} -- Number of rows of dataframe per chunk
+
+        Returns:
+            Generator[DataFrame] -- Generator of the matching records, in no
+                particular order. Values without records are left out.
+        """
+        values = pd.Index(list(values)).unique().tolist()
+        if not values:
+            return
+        conditions = [(self._pkey, "IN", values)]
+        yield from self._scan(self._prune(conditions), None, conditions, chunksize)
+
+    # pylint: disable=bad-continuation
+    def query(self, query: str, chunksize: int) -> Generator[DataFrame, None, None]:
+        """
+        Query DAO repo and returns a generator of DataFrames with query results.
+
+        Keyword Arguments:
+            query {str} -- Simple SELECT query string, see parse_select
+            chunksize {int} -- Number of rows of dataframe per chunk
+
+        Returns:
+            Generator[DataFrame] -- Generator to iterate over DataFrame results.
+        """
+        if query is None:
+            raise DaoError
+        columns, table, conditions = parse_select(query)
+        if table != self._tablename:
+            raise DaoError(f"Unknown table {table}")
+        for col in (columns or []) + [col for col, _, _ in conditions]:
+            if col not in self._columns:
+                raise DaoError(f"Unknown column {col}")
+        return self._scan(self._prune(conditions), columns, conditions, chunksize)
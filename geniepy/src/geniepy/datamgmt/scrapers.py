@@ -1,6 +1,21 @@
 """Scraping module to fetch data from online sources."""
-from typing import Generator
+from typing import Generator, Iterable
 from abc import ABC, abstractmethod
+from itertools import islice
+from pathlib import Path
+from http.client import HTTPException
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import xml.etree.ElementTree as ET
+from geniepy.datamgmt.cache import RawCache
+from geniepy.errors import ScraperError
+from geniepy.pubmed import PubMedRecord, get_xml_engine
 
 
 class BaseScraper(ABC):
@@ -27,25 +42,234 @@ class BaseScraper(ABC):
             Generator -- The generator yielding the data in given chunksizes.
         """
 
+    def commit(self, chunks: int = None):
+        """
+        Record scraped data as done once saved, so it isn't scraped again.
+
+        Scrapers keeping track of scraped data only record it once their consumer,
+        i.e. the dao, commits the saved chunks, so data of failed saves is scraped
+        again by the next scrape.
+
+        Keyword Arguments:
+            chunks {int} -- Number of chunks saved, in scraped order, all chunks of
+                finished scrapes if None (default: {None})
+        """
+
 
 class CtdScraper(BaseScraper):
     """
     Implementation of CTD Gene-Disease Relationship Scraper.
 
     http://ctdbase.org/
+
+    Streams the gene-disease associations csv file from the CTD website or a local
+    path, without storing it. The release of the last fully scraped and committed
+    file is kept in a state file, identified by its ETag (or Last-Modified date) when downloaded,
+    or by its sha256 checksum when read from a local path, so unchanged releases
+    are skipped. Downloads can be kept in a raw cache, so a scrape retried after a
+    failure reads the release from the cache once the server confirms it didn't
+    change.
     """
 
+    __slots__ = ["source", "state_path", "cache", "_scraped", "_pending"]
+
+    DEFAULT_SOURCE = "https://ctdbase.org/reports/CTD_genes_diseases.csv.gz"
+    """CTD gene-disease associations monthly release."""
+    CSV_COLUMNS: [str] = [
+        "GeneSymbol",
+        "GeneID",
+        "DiseaseName",
+        "DiseaseID",
+        "DirectEvidence",
+        "InferenceChemicalName",
+        "InferenceScore",
+        "OmimIDs",
+        "PubMedIDs",
+    ]
+    """Columns of the raw CTD gene-disease associations csv file."""
+    HEADER = ",".join(CSV_COLUMNS) + "\n"
+    """Header line of every yielded csv chunk."""
+    BLOCK_SIZE = 1 << 20
+    """Size of blocks read when computing checksums."""
+    TIMEOUT = 60
+    """Seconds to wait for the CTD website to respond."""
+
+    # pylint: disable=bad-continuation
+    def __init__(
+        self,
+        source: str = DEFAULT_SOURCE,
+        state_path: str = None,
+        cache: RawCache = None,
+    ):
+        """
+        Initialize scraper.
+
+        Keyword Arguments:
+            source {str} -- URL or local path of the (optionally gzipped) csv file
+                (default: {DEFAULT_SOURCE})
+            state_path {str} -- Path to file keeping the last scraped release,
+                every scrape reads the whole file if None (default: {None})
+            cache {RawCache} -- Cache of downloaded releases (default: {None})
+        """
+        self.source = source
+        """URL or local path of the CTD csv file."""
+        self.state_path = state_path
+        """Path to file keeping the last fully scraped release."""
+        self.cache = cache
+        """Cache of downloaded releases, retried scrapes don't download again."""
+        self._scraped = 0
+        self._pending = None
+
+    @property
+    def is_remote(self) -> bool:
+        """Whether source is an URL."""
+        return "://" in self.source
+
+    def read_state(self) -> dict:
+        """Read last fully scraped release."""
+        if self.state_path is None:
+            return {}
+        try:
+            with open(self.state_path) as state_file:
+                return json.load(state_file)
+        except FileNotFoundError:
+            return {}
+
+    def write_state(self, state: dict):
+        """Atomically replace last fully scraped release."""
+        if self.state_path is None:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        partial_path = self.state_path + ".part"
+        with open(partial_path, "w") as state_file:
+            json.dump(state, state_file, indent=1, sort_keys=True)
+        os.replace(partial_path, self.state_path)
+
+    def checksum(self) -> str:
+        """Compute sha256 checksum of local source file."""
+        sha = hashlib.sha256()
+        with open(self.source, "rb") as source_file:
+            for block in iter(lambda: source_file.read(self.BLOCK_SIZE), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def open_source(self, state: dict) -> (io.IOBase, dict):
+        """
+        Open source as a binary stream, unless its release was already scraped.
+
+        Arguments:
+            state {dict} -- The last fully scraped release
+
+        Raises:
+            ScraperError -- If source cannot be opened
+
+        Returns:
+            (io.IOBase, dict) -- The raw stream, None if release is unchanged, and
+            the release state
+        """
+        if not self.is_remote:
+            if not os.path.isfile(self.source):
+                raise ScraperError(f"CTD file not found: {self.source}")
+            release = {"source": self.source, "sha256": self.checksum()}
+            if release == state:
+                return None, release
+            return open(self.source, "rb"), release
+        # Release downloaded by a previous, possibly failed, scrape
+        known, cached_path = state, None
+        if self.cache is not None:
+            ref = self.cache.lookup(self.source)
+            cached_path = self.cache.get(self.source) if ref is not None else None
+            if cached_path is not None:
+                known = ref["meta"]
+        request = Request(self.source)
+        if known.get("source") == self.source:
+            # Server replies 304 Not Modified if release is unchanged
+            if known.get("etag"):
+                request.add_header("If-None-Match", known["etag"])
+            if known.get("last_modified"):
+                request.add_header("If-Modified-Since", known["last_modified"])
+        try:
+            response = urlopen(request, timeout=self.TIMEOUT)
+        except HTTPError as http_err:
+            if http_err.code != 304:
+                raise ScraperError(f"Unable to download {self.source}: {http_err}")
+            if known == state:
+                return None, state
+            return open(cached_path, "rb"), known
+        except URLError as url_err:
+            raise ScraperError(f"Unable to download {self.source}: {url_err}")
+        release = {
+            "source": self.source,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if release == state and (release["etag"] or release["last_modified"]):
+            # Server ignored conditional request, release is unchanged
+            response.close()
+            return None, state
+        if self.cache is None:
+            return response, release
+        with response:
+            try:
+                path = self.cache.put_stream(self.source, response, meta=release)
+            except (OSError, HTTPException) as read_err:
+                raise ScraperError(f"Unable to download {self.source}: {read_err}")
+        return open(path, "rb"), release
+
     def scrape(self, chunksize: int, **kwargs) -> Generator:
         """
         Implement base scrape method to download records from CTD database.
 
+        The '#' comment lines (and plain header line) of the file are skipped, each
+        chunk is a csv string with a header line followed by up to chunksize
+        records. The release is recorded once all its chunks are committed.
+
         Keyword Arguments:
             chunksize {int} -- the size of each chunk the data should be returned
 
         Returns:
-            Generator -- The generator yielding the data in given chunksizes.
+            Generator -- The generator yielding csv strings of chunksize records.
+
+        Raises:
+            ScraperError -- If source cannot be opened
         """
-        raise NotImplementedError
+        state = self.read_state()
+        self._scraped, self._pending = 0, None
+        raw, release = self.open_source(state)
+        if raw is None:
+            return
+        with raw:
+            stream = raw
+            if self.source.endswith(".gz"):
+                stream = gzip.GzipFile(fileobj=raw)
+            lines = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+            for line in lines:
+                columns = line.rstrip("\r\n").split(",")
+                if not line.startswith("#") and columns != self.CSV_COLUMNS:
+                    break
+            else:
+                line = None
+            while line is not None:
+                chunk = [line] + list(islice(lines, chunksize - 1))
+                line = next(lines, None)
+                self._scraped += 1
+                yield self.HEADER + "".join(chunk)
+        self._pending = (self._scraped, release)
+
+    def commit(self, chunks: int = None):
+        """
+        Record the scraped release once all its chunks are saved.
+
+        Keyword Arguments:
+            chunks {int} -- Number of chunks saved, in scraped order, all chunks of
+                finished scrapes if None (default: {None})
+        """
+        if self._pending is None:
+            return
+        total, release = self._pending
+        if chunks is None or chunks >= total:
+            self.write_state(release)
+            self._pending = None
 
 
 class PubMedScraper(BaseScraper):
@@ -55,16 +279,387 @@ class PubMedScraper(BaseScraper):
     https://www.ncbi.nlm.nih.gov/pubmed/
     https://www.nlm.nih.gov/bsd/licensee/elements_descriptions.html
 
+    Reads the article sets of a local mirror of the NLM FTP layout, the baseline
+    files first and then the daily update files, i.e.
+        <mirror>/baseline/pubmed20n0001.xml.gz
+        <mirror>/updatefiles/pubmed20n1016.xml.gz
+    A manifest keeps the size and modification time of the fully scraped and
+    committed files, so subsequent scrapes only read new update files and files
+    replaced in the mirror since.
     """
 
+    __slots__ = ["mirror_path", "manifest_path", "engine", "_scraped", "_pending"]
+
+    MIRROR_DIRS = ["baseline", "updatefiles"]
+    """Mirror directories, in scraping order."""
+    ARTICLE_SET_PATTERN = "*.xml.gz"
+    """Glob pattern of article set files."""
+    MANIFEST_NAME = "manifest.json"
+    """Default manifest file name, in mirror directory."""
+
+    # pylint: disable=bad-continuation
+    def __init__(
+        self, mirror_path: str = None, manifest_path: str = None, engine: str = None
+    ):
+        """
+        Initialize scraper.
+
+        Keyword Arguments:
+            mirror_path {str} -- Path to local mirror (default: {None})
+            manifest_path {str} -- Path to manifest of scraped files
+                (default: {manifest.json in mirror})
+            engine {str} -- Name of xml parsing engine (default: {DEFAULT_XML_ENGINE})
+        """
+        self.mirror_path = mirror_path
+        """Path to local mirror of NLM FTP baseline and update files."""
+        if manifest_path is None and mirror_path is not None:
+            manifest_path = os.path.join(mirror_path, self.MANIFEST_NAME)
+        self.manifest_path = manifest_path
+        """Path to manifest of fully scraped files."""
+        self.engine = engine
+        """Name of xml parsing engine."""
+        self._scraped = 0
+        self._pending = []
+
+    def read_manifest(self) -> dict:
+        """Read manifest of fully scraped files, by path relative to mirror."""
+        try:
+            with open(self.manifest_path) as manifest_file:
+                return json.load(manifest_file)
+        except FileNotFoundError:
+            return {}
+
+    def write_manifest(self, manifest: dict):
+        """Atomically replace manifest of fully scraped files."""
+        partial_path = self.manifest_path + ".part"
+        with open(partial_path, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+        os.replace(partial_path, self.manifest_path)
+
+    def list_files(self) -> [str]:
+        """
+        List mirror article sets, in scraping order.
+
+        Raises:
+            ScraperError -- If mirror directory doesn't exist
+
+        Returns:
+            [str] -- Paths of article sets relative to mirror
+        """
+        if self.mirror_path is None or not os.path.isdir(self.mirror_path):
+            raise ScraperError(f"PubMed mirror not found: {self.mirror_path}")
+        mirror = Path(self.mirror_path)
+        return [
+            str(path.relative_to(mirror))
+            for mirror_dir in self.MIRROR_DIRS
+            for path in sorted(
+                mirror.joinpath(mirror_dir).glob(self.ARTICLE_SET_PATTERN)
+            )
+        ]
+
     def scrape(self, chunksize: int, **kwargs) -> Generator:
         """
-        Implement base scrape method to download records from PubMed database.
+        Implement base scrape method to read records from PubMed mirror.
+
+        Chunks don't span files, the last chunk of each file may be smaller. A file
+        is added to the manifest once all its chunks are committed, files of failed
+        downloads are scraped again.
 
         Keyword Arguments:
             chunksize {int} -- the size of each chunk the data should be returned
 
         Returns:
-            Generator -- The generator yielding the data in given chunksizes.
+            Generator -- The generator yielding lists of PubMedRecord.
+
+        Raises:
+            ScraperError -- If mirror directory doesn't exist
+        """
+        manifest = self.read_manifest()
+        engine = get_xml_engine(self.engine)
+        self._scraped, self._pending = 0, []
+        for name in self.list_files():
+            stat = os.stat(os.path.join(self.mirror_path, name))
+            version = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+            entry = manifest.get(name, {})
+            if all(entry.get(key) == value for key, value in version.items()):
+                continue
+            count = 0
+            chunk: [PubMedRecord] = []
+            for record in engine.iter_records(os.path.join(self.mirror_path, name)):
+                chunk.append(record)
+                count += 1
+                if len(chunk) == chunksize:
+                    self._scraped += 1
+                    yield chunk
+                    chunk = []
+            if chunk:
+                self._scraped += 1
+                yield chunk
+            self._pending.append((self._scraped, name, {**version, "articles": count}))
+
+    def commit(self, chunks: int = None):
+        """
+        Add the files whose chunks are all saved to the manifest.
+
+        Keyword Arguments:
+            chunks {int} -- Number of chunks saved, in scraped order, all chunks of
+                finished files if None (default: {None})
+        """
+        done = [
+            pending
+            for pending in list(self._pending)
+            if chunks is None or pending[0] <= chunks
+        ]
+        if not done:
+            return
+        manifest = self.read_manifest()
+        for pending in done:
+            _, name, entry = pending
+            manifest[name] = entry
+            self._pending.remove(pending)
+        self.write_manifest(manifest)
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket rate limiter.
+
+    Holds up to capacity tokens, refilled at rate tokens per second, each request
+    takes a token and waits for one if the bucket is empty. Must only be used by
+    coroutines of a single event loop.
+    """
+
+    __slots__ = ["rate", "capacity", "_tokens", "_updated"]
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Initialize full bucket.
+
+        Arguments:
+            rate {float} -- Number of tokens refilled per second
+
+        Keyword Arguments:
+            capacity {float} -- Max number of tokens, i.e. size of bursts
+                (default: {1})
+        """
+        self.rate = rate
+        """Number of tokens refilled per second."""
+        self.capacity = capacity
+        """Max number of tokens."""
+        self._tokens = capacity
+        self._updated = None
+
+    async def acquire(self):
+        """Take a token, waiting for the bucket to be refilled if empty."""
+        loop = asyncio.get_event_loop()
+        while True:
+            now = loop.time()
+            if self._updated is not None:
+                elapsed = now - self._updated
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class EfetchScraper(BaseScraper):
+    """
+    PubMed articles scraper through the NCBI E-utilities efetch service.
+
+    https://www.ncbi.nlm.nih.gov/books/NBK25499/#chapter4.EFetch
+
+    Fetches given PMIDs, i.e. the ones referenced by other sources but missing from
+    the pubmed table, in batches of up to BATCH_SIZE articles per request. Requests
+    are sent concurrently through a pooled aiohttp session, rate limited by a token
+    bucket per api key, since E-utilities quotas are enforced per key.
+
+    Requires the optional aiohttp dependency.
+    """
+
+    __slots__ = [
+        "url",
+        "api_keys",
+        "rate",
+        "batch_size",
+        "max_retries",
+        "backoff",
+        "cache",
+    ]
+
+    EFETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+    """E-utilities efetch endpoint."""
+    BATCH_SIZE = 200
+    """Max number of PMIDs per efetch request."""
+    KEY_RATE = 10
+    """Requests per second allowed for each api key."""
+    ANONYMOUS_RATE = 3
+    """Requests per second allowed without api key."""
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    """Response statuses of requests worth retrying."""
+    TIMEOUT = 60
+    """Seconds to wait for each request."""
+
+    # pylint: disable=bad-continuation
+    def __init__(
+        self,
+        api_keys: [str] = None,
+        url: str = EFETCH_URL,
+        rate: float = None,
+        batch_size: int = BATCH_SIZE,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        cache: RawCache = None,
+    ):
+        """
+        Initialize scraper.
+
+        Keyword Arguments:
+            api_keys {[str]} -- NCBI api keys, requests are anonymous if None
+                (default: {None})
+            url {str} -- efetch endpoint (default: {EFETCH_URL})
+            rate {float} -- Requests per second of each key (default: {KEY_RATE}
+                with api keys, otherwise {ANONYMOUS_RATE})
+            batch_size {int} -- Max number of PMIDs per request (default: {200})
+            max_retries {int} -- Number of retries of failed requests (default: {3})
+            backoff {float} -- Seconds before first retry, doubled on each retry
+                (default: {1.0})
+            cache {RawCache} -- Cache of efetch responses (default: {None})
+        """
+        self.url = url
+        """efetch endpoint."""
+        self.api_keys = list(api_keys or [])
+        """NCBI api keys, requests are spread across them."""
+        if rate is None:
+            rate = self.KEY_RATE if self.api_keys else self.ANONYMOUS_RATE
+        self.rate = rate
+        """Requests per second of each key."""
+        self.batch_size = min(batch_size, self.BATCH_SIZE)
+        """Max number of PMIDs per request."""
+        self.max_retries = max_retries
+        """Number of retries of failed requests."""
+        self.backoff = backoff
+        """Seconds before first retry of a failed request."""
+        self.cache = cache
+        """Cache of efetch responses, by requested PMIDs."""
+
+    @property
+    def concurrency(self) -> int:
+        """Number of requests sent at a time, a second worth of requests."""
+        return max(1, int(self.rate)) * max(1, len(self.api_keys))
+
+    def batches(self, pmids: Iterable) -> [[str]]:
+        """Split unique valid PMIDs into efetch requests batches."""
+        unique = sorted({int(pmid) for pmid in pmids if int(pmid) > 0})
+        return [
+            [str(pmid) for pmid in unique[start : start + self.batch_size]]
+            for start in range(0, len(unique), self.batch_size)
+        ]
+
+    # pylint: disable=bad-continuation
+    async def _fetch(
+        self, session, bucket: TokenBucket, api_key: str, batch: [str]
+    ) -> bytes:
+        """Fetch article set of batch, retrying failed requests."""
+        # pylint: disable=import-outside-toplevel
+        import aiohttp
+
+        data = {"db": "pubmed", "retmode": "xml", "id": ",".join(batch)}
+        key = f"{self.url}|{data['id']}"
+        if self.cache is not None:
+            cached = self.cache.get_bytes(key)
+            if cached is not None:
+                return cached
+        if api_key is not None:
+            data["api_key"] = api_key
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            await bucket.acquire()
+            try:
+                async with session.post(self.url, data=data) as response:
+                    if response.status == 200:
+                        body = await response.read()
+                        if self.cache is not None:
+                            self.cache.put_bytes(key, body)
+                        return body
+                    error = f"status {response.status}"
+                    if response.status not in self.RETRY_STATUSES:
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as client_err:
+                error = repr(client_err)
+        raise ScraperError(f"efetch of {len(batch)} PMIDs failed: {error}")
+
+    @staticmethod
+    async def _gather(requests: list) -> list:
+        """Run requests concurrently, letting all complete before raising."""
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    async def _open_session(self):
+        """Open pooled http session, sized to the number of concurrent requests."""
+        # pylint: disable=import-outside-toplevel
+        import aiohttp
+
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.TIMEOUT),
+        )
+
+    # pylint: disable=arguments-differ
+    def scrape(self, chunksize: int, pmids: Iterable = (), **kwargs) -> Generator:
+        """
+        Fetch the articles of the given PMIDs.
+
+        Requests are sent a second worth at a time, the articles are yielded once all
+        requests of the window completed. PMIDs not found by efetch are skipped.
+
+        Keyword Arguments:
+            chunksize {int} -- the size of each chunk the data should be returned
+            pmids {Iterable} -- PMIDs of the articles to be fetched (default: {()})
+
+        Returns:
+            Generator -- The generator yielding lists of PubmedArticle elements.
+
+        Raises:
+            ScraperError -- If a request keeps failing
         """
-        raise NotImplementedError
+        batches = self.batches(pmids)
+        if not batches:
+            return
+        keys = self.api_keys or [None]
+        loop = asyncio.new_event_loop()
+        try:
+            session = loop.run_until_complete(self._open_session())
+            buckets = [TokenBucket(self.rate) for _ in keys]
+            try:
+                chunk = []
+                for start in range(0, len(batches), self.concurrency):
+                    requests = [
+                        self._fetch(
+                            session,
+                            buckets[idx % len(keys)],
+                            keys[idx % len(keys)],
+                            batch,
+                        )
+                        for idx, batch in enumerate(
+                            batches[start : start + self.concurrency], start
+                        )
+                    ]
+                    responses = loop.run_until_complete(self._gather(requests))
+                    for response in responses:
+                        if isinstance(response, Exception):
+                            raise response
+                        articles = ET.fromstring(response).iter("PubmedArticle")
+                        for article in articles:
+                            chunk.append(article)
+                            if len(chunk) == chunksize:
+                                yield chunk
+                                chunk = []
+                if chunk:
+                    yield chunk
+            finally:
+                loop.run_until_complete(session.close())
+        finally:
+            loop.close()
@@ -1,9 +1,48 @@
 """Module containing definitions of tables repository tables."""
+import json
 from collections import namedtuple
-from sqlalchemy import MetaData, Table, Column, Integer, Float, String
+from sqlalchemy import MetaData, Table, Column, BigInteger, Integer, Float, String
+from sqlalchemy.types import TypeDecorator
+
+
+class StringList(TypeDecorator):  # pylint: disable=abstract-method
+    """
+    List of strings column type.
+
+    Stored as a JSON array string in SQL databases and as a REPEATED STRING field in
+    Google BigQuery.
+    """
+
+    impl = String
+
+    def process_bind_param(self, value, dialect):
+        """Encode list as JSON array string."""
+        if value is None:
+            return None
+        return json.dumps(list(value))
+
+    def process_result_value(self, value, dialect):
+        """Decode JSON array string into list."""
+        if value is None:
+            return None
+        return json.loads(value)
+
+
+RepoProperties = namedtuple(
+    "RepoProperties", "tablename pkey table unique indexes", defaults=(False, ())
+)
+"""
+General properties of a given repository.
+
+The primary key is indexed, uniquely if unique (tables allow duplicate records by
+default). Indexes lists extra indexed columns.
+"""
+
+
+def list_columns(table: Table) -> [str]:
+    """Return names of the table list of strings columns."""
+    return [col.name for col in table.columns if isinstance(col.type, StringList)]
 
-RepoProperties = namedtuple("RepoProperties", "tablename pkey table")
-"""General properties of a given repository."""
 
 CTD_PKEY = "digest"
 """CTD table primary key."""
@@ -25,6 +64,24 @@ CTD_PROPTY = RepoProperties(
     tablename=CTD_TABLE_NAME, pkey=CTD_PKEY, table=CTD_DAO_TABLE
 )
 
+CTD_COMPACT_TABLE_NAME = "ctd_compact"
+"""Name of ctd source table with compact digests."""
+CTD_COMPACT_DAO_TABLE = Table(
+    CTD_COMPACT_TABLE_NAME,
+    MetaData(),
+    # Compact digest, 63 bit integer from the first 8 bytes of the sha256 digest
+    Column("digest", BigInteger, primary_key=False, nullable=False),
+    Column("genesymbol", String),
+    Column("geneid", Integer, nullable=False),
+    Column("diseasename", String),
+    Column("diseaseid", String, nullable=False),
+    Column("pmids", String, nullable=False),
+)
+"""CTD DAO Repository Schema with compact digests."""
+CTD_COMPACT_PROPTY = RepoProperties(
+    tablename=CTD_COMPACT_TABLE_NAME, pkey=CTD_PKEY, table=CTD_COMPACT_DAO_TABLE
+)
+
 
 PUBMED_TABLE_NAME = "pubmed"
 """PUBMED table primary key."""
@@ -41,10 +98,13 @@ PUBMED_DAO_TABLE = Table(
     Column("iso_abbreviation", String),
     Column("article_title", String),
     Column("abstract", String),
-    Column("authors", String),
+    Column("authors", StringList),
     Column("language", String),
-    Column("chemicals", String),
-    Column("mesh_list", String),
+    Column("chemicals", StringList),
+    Column("mesh_list", StringList),
+    Column("num_authors", Integer, nullable=False),
+    Column("num_chemicals", Integer, nullable=False),
+    Column("abstract_length", Integer, nullable=False),
 )
 """PUBMED DAO Repository Schema."""
 PUBMED_PROPTY = RepoProperties(
@@ -69,3 +129,18 @@ CLSFR_DAO_TABLE = Table(
 CLSFR_PROPTY = RepoProperties(
     tablename=CLSFR_TABLE_NAME, pkey=CLSFR_PKEY, table=CLSFR_DAO_TABLE
 )
+
+CLSFR_COMPACT_TABLE_NAME = "classifier_compact"
+"""Name of geniepy classifier output table with compact digests."""
+CLSFR_COMPACT_DAO_TABLE = Table(
+    CLSFR_COMPACT_TABLE_NAME,
+    MetaData(),
+    # Compact digest, 63 bit integer from the first 8 bytes of the sha256 digest
+    Column("digest", BigInteger, primary_key=False, nullable=False),
+    Column("pub_score", Float, nullable=False),
+    Column("ct_score", Float, nullable=False),
+)
+"""Classifier Output DAO Repository Schema with compact digests."""
+CLSFR_COMPACT_PROPTY = RepoProperties(
+    tablename=CLSFR_COMPACT_TABLE_NAME, pkey=CLSFR_PKEY, table=CLSFR_COMPACT_DAO_TABLE
+)
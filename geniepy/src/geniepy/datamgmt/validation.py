@@ -0,0 +1,264 @@
+"""
+Vectorized dataframe schema validation.
+
+Every rule is evaluated with whole column operations. Pattern rules only run the
+regular expression once per distinct value, which keeps the cost of validating
+large chunks with few distinct ids (i.e. CTD disease ids) close to a hash lookup.
+
+Valid dataframes are marked, so they are not validated again further down the
+pipeline. The mark is the identity of the validated dataframe object, registered
+by weak reference, along with a fingerprint of the schema and of the dataframe
+columns, dtypes and length kept in its attrs. Pandas carries attrs over to copies
+and derived dataframes, but those are other objects and are validated again.
+Checking the mark doesn't read any values, so it doesn't track in place edits of
+values, dataframes modified after being validated should be unmarked.
+"""
+from collections import namedtuple
+import hashlib
+import weakref
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from sqlalchemy import Table
+from geniepy.datamgmt.tables import list_columns
+
+MAX_INVALID_ROWS = 10
+"""Default number of invalid rows kept in validation summaries."""
+VALIDATED_ATTR = "geniepy_validated"
+"""Dataframe attrs key of the fingerprint of the schema it was validated against."""
+_VALIDATED = weakref.WeakValueDictionary()
+"""Dataframes validated in this process, by object id."""
+
+Column = namedtuple("Column", "name dtype pattern nullable")
+"""Schema column rules: numpy dtype (or list), regular expression and nullability."""
+Column.__new__.__defaults__ = (None, None, True)
+
+
+class ValidationSummary:
+    """
+    Compact summary of a dataframe validation.
+
+    A summary is falsy when the dataframe is valid, so it can be used as the list of
+    errors returned by the previous validation engine.
+    """
+
+    __slots__ = ["errors", "counts", "num_invalid_rows", "invalid_rows"]
+
+    def __init__(
+        self,
+        errors: [str] = None,
+        counts: dict = None,
+        num_invalid_rows: int = 0,
+        invalid_rows: DataFrame = None,
+    ):
+        """Initialize summary state."""
+        self.errors = errors or []
+        """Description of each failed rule."""
+        self.counts = counts or {}
+        """Number of invalid values by (column, rule)."""
+        self.num_invalid_rows = num_invalid_rows
+        """Number of rows failing at least one rule."""
+        self.invalid_rows = invalid_rows
+        """First invalid rows of the dataframe."""
+
+    def __bool__(self) -> bool:
+        """Return true if any rule failed."""
+        return bool(self.errors)
+
+    def __len__(self) -> int:
+        """Return number of failed rules."""
+        return len(self.errors)
+
+    def __iter__(self):
+        """Iterate over failed rules descriptions."""
+        return iter(self.errors)
+
+    def __str__(self) -> str:
+        """Describe failed rules and number of invalid rows."""
+        if not self.errors:
+            return "Valid dataframe"
+        description = "; ".join(self.errors)
+        if self.num_invalid_rows:
+            description += f" ({self.num_invalid_rows} invalid rows)"
+        return description
+
+    def __repr__(self) -> str:
+        """Return summary representation."""
+        return f"ValidationSummary({self.errors!r})"
+
+
+class Schema:
+    """Dataframe schema, columns are matched by name and must all be present."""
+
+    __slots__ = ["columns", "fingerprint"]
+
+    def __init__(self, columns: [Column]):
+        """Initialize schema with its column rules."""
+        self.columns = list(columns)
+        """Schema column rules."""
+        self.fingerprint = hashlib.sha1(repr(self.columns).encode()).hexdigest()
+        """Digest of the schema column rules."""
+
+    def _frame_fingerprint(self, payload: DataFrame) -> str:
+        """Digest of the schema and the dataframe columns, dtypes and length."""
+        layout = repr((self.fingerprint, list(payload.dtypes.items()), len(payload)))
+        return hashlib.sha1(layout.encode()).hexdigest()
+
+    def mark_validated(self, payload: DataFrame):
+        """Mark dataframe as validated against schema."""
+        payload.attrs[VALIDATED_ATTR] = self._frame_fingerprint(payload)
+        _VALIDATED[id(payload)] = payload
+
+    def adopt(self, payload: DataFrame) -> bool:
+        """
+        Mark dataframe validated by another process, i.e. a parser worker.
+
+        Only dataframes received straight from the validating process should be
+        adopted, their attrs mark is trusted.
+
+        Arguments:
+            payload {DataFrame} -- The unpickled dataframe
+
+        Returns:
+            bool -- true if dataframe carried the schema validation mark
+        """
+        if payload.attrs.get(VALIDATED_ATTR) != self._frame_fingerprint(payload):
+            return False
+        _VALIDATED[id(payload)] = payload
+        return True
+
+    @staticmethod
+    def unmark(payload: DataFrame):
+        """Remove validated mark from dataframe, i.e. after modifying its values."""
+        payload.attrs.pop(VALIDATED_ATTR, None)
+        if _VALIDATED.get(id(payload)) is payload:
+            del _VALIDATED[id(payload)]
+
+    def is_validated(self, payload: DataFrame) -> bool:
+        """
+        Check if dataframe object was validated against schema and not reshaped since.
+
+        Arguments:
+            payload {DataFrame} -- The dataframe to be checked
+
+        Returns:
+            bool -- true if dataframe carries the schema validation mark
+        """
+        if _VALIDATED.get(id(payload)) is not payload:
+            return False
+        return payload.attrs.get(VALIDATED_ATTR) == self._frame_fingerprint(payload)
+
+    @classmethod
+    def from_table(cls, table: Table, dtypes: dict = None, patterns: dict = None):
+        """
+        Create schema from repository table, with nullability taken from the table.
+
+        List of strings columns are required to hold lists.
+
+        Arguments:
+            table {Table} -- The repository table definition
+
+        Keyword Arguments:
+            dtypes {dict} -- numpy dtype of columns by name (default: {None})
+            patterns {dict} -- regular expression of columns by name (default: {None})
+
+        Returns:
+            Schema -- The table schema
+        """
+        dtypes = {**dict.fromkeys(list_columns(table), list), **(dtypes or {})}
+        patterns = patterns or {}
+        return cls(
+            [
+                Column(
+                    column.name,
+                    dtypes.get(column.name),
+                    patterns.get(column.name),
+                    column.nullable,
+                )
+                for column in table.columns
+            ]
+        )
+
+    @staticmethod
+    def _is_dtype(series: pd.Series, dtype) -> bool:
+        """Check if series dtype is a subtype of required dtype."""
+        if dtype is list:
+            return all(isinstance(value, list) for value in series.dropna())
+        try:
+            return np.issubdtype(series.dtype, dtype)
+        except TypeError:
+            # Extension dtypes (i.e. category) are not numpy dtypes
+            return False
+
+    @staticmethod
+    def _mismatches(series: pd.Series, pattern: str) -> pd.Series:
+        """Flag non null values not matching pattern, matching each value once."""
+        values = pd.Series(pd.unique(series.dropna()))
+        if values.empty:
+            return pd.Series(False, index=series.index)
+        matches = values.astype(str).str.contains(pattern)
+        return series.isin(values[~matches.values])
+
+    def validate(
+        self, payload: DataFrame, max_rows: int = MAX_INVALID_ROWS
+    ) -> ValidationSummary:
+        """
+        Check dataframe against schema.
+
+        Arguments:
+            payload {DataFrame} -- The dataframe to be validated
+
+        Keyword Arguments:
+            max_rows {int} -- Number of invalid rows kept in summary
+                (default: {MAX_INVALID_ROWS})
+
+        Returns:
+            ValidationSummary -- Summary of failed rules, falsy if payload is valid,
+            in which case payload is marked as validated.
+        """
+        if len(payload.columns) != len(self.columns):
+            self.unmark(payload)
+            return ValidationSummary(
+                [
+                    f"Invalid number of columns. The schema specifies "
+                    f"{len(self.columns)}, but the data frame has "
+                    f"{len(payload.columns)}"
+                ]
+            )
+        missing = [col.name for col in self.columns if col.name not in payload]
+        if missing:
+            self.unmark(payload)
+            return ValidationSummary([f"Columns {missing} missing from data frame"])
+
+        errors = []
+        counts = {}
+        invalid = np.zeros(len(payload), dtype=bool)
+        for column in self.columns:
+            series = payload[column.name]
+            if column.dtype is not None and not self._is_dtype(series, column.dtype):
+                errors.append(
+                    f"The column {column.name} has a dtype of {series.dtype} which "
+                    f"is not a subclass of the required type {column.dtype}"
+                )
+                counts[(column.name, "dtype")] = len(series)
+            rules = []
+            if not column.nullable:
+                rules.append(("nullable", "null values", series.isna()))
+            if column.pattern is not None:
+                mismatches = self._mismatches(series, column.pattern)
+                description = f'values not matching the pattern "{column.pattern}"'
+                rules.append(("pattern", description, mismatches))
+            for rule, description, flags in rules:
+                count = int(flags.sum())
+                if count:
+                    errors.append(f"The column {column.name} has {count} {description}")
+                    counts[(column.name, rule)] = count
+                    invalid |= flags.values
+
+        if not errors:
+            self.mark_validated(payload)
+            return ValidationSummary()
+        self.unmark(payload)
+        num_invalid_rows = int(invalid.sum())
+        invalid_rows = payload[invalid].head(max_rows) if num_invalid_rows else None
+        return ValidationSummary(errors, counts, num_invalid_rows, invalid_rows)
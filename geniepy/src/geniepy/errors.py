@@ -21,6 +21,10 @@ class ParserError(GeniePyError):
     """Unable to parse data."""
 
 
+class ScraperError(GeniePyError):
+    """Unable to scrape data from sources."""
+
+
 class ClassifierError(GeniePyError):
     """Classifier unable to execute command."""
 
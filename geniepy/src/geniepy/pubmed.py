@@ -1,9 +1,42 @@
 """PubMed related functionality."""
+from typing import Generator, Iterable
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from importlib.util import find_spec
+from itertools import repeat
 import xml.etree.ElementTree as ET
+from xml.parsers import expat
+import logging
+import heapq
+import io
+import mmap
+import os
+import gzip
 import json
 import csv
 import jsonlines
 
+PUBMED_FIELDS = [
+    "pmid",
+    "date_completed",
+    "pub_model",
+    "title",
+    "iso_abbreviation",
+    "article_title",
+    "abstract",
+    "authors",
+    "language",
+    "chemicals",
+    "mesh_list",
+    "issn",
+    "issn_type",
+]
+"""Fields extracted from each PubMed article."""
+PubMedRecord = namedtuple("PubMedRecord", PUBMED_FIELDS)
+"""Compact record of the fields extracted from a PubMed article."""
+
 
 class PubMedArticle:
     """
@@ -154,24 +187,206 @@ class PubMedArticle:
         issn_type = self._get_xml_element([self.JOURNAL_TAG, "ISSN"], tag_attrib="IssnType")
         return issn_type        
 
+    @property
+    def to_record(self) -> PubMedRecord:
+        """Extract all article fields in a single pass."""
+        return ARTICLE_EXTRACTOR.extract(self._pubmed_article)
+
     @property
     def to_dict(self):
         """Generate article model dictionary."""
-        _dict = {}
-        _dict["pmid"] = self.pmid
-        _dict["date_completed"] = self.date_completed
-        _dict["pub_model"] = self.pub_model
-        _dict["title"] = self.title
-        _dict["iso_abbreviation"] = self.iso_abbreviation
-        _dict["article_title"] = self.article_title
-        _dict["abstract"] = self.abstract
-        _dict["authors"] = self.authors
-        _dict["language"] = self.language
-        _dict["chemicals"] = self.chemicals
-        _dict["mesh_list"] = self.mesh_list
-        _dict["issn"] = self.issn
-        _dict["issn_type"] = self.issn_type
-        return _dict
+        return dict(zip(PUBMED_FIELDS, self.to_record))
+
+
+_MISSING = object()
+"""Marker of list items without a value, which are left out of the list."""
+
+
+def _text(element: ET.Element):
+    """Return element text."""
+    return element.text
+
+
+def _child_text(element: ET.Element, tag: str, default=""):
+    """Return text of first child with given tag, default if no such child."""
+    for child in element:
+        if child.tag == tag:
+            return child.text
+    return default
+
+
+def _date(element: ET.Element) -> str:
+    """Format date element as YYYY-MM-DD."""
+    year = _child_text(element, "Year") or ""
+    month = _child_text(element, "Month") or ""
+    day = _child_text(element, "Day") or ""
+    return year + "-" + month + "-" + day
+
+
+def _author(element: ET.Element) -> str:
+    """Format author element as 'LastName, ForeName'."""
+    lastname = _child_text(element, "LastName") or ""
+    forename = _child_text(element, "ForeName") or ""
+    return lastname + ", " + forename
+
+
+def _first_child(tag: str):
+    """Create getter of first child text, skipping elements without such child."""
+
+    def getter(element: ET.Element):
+        return _child_text(element, tag, _MISSING)
+
+    return getter
+
+
+def _attrib(name: str):
+    """Create getter of element attribute."""
+
+    def getter(element: ET.Element) -> str:
+        return element.get(name, "")
+
+    return getter
+
+
+class ArticleExtractor:
+    """
+    Single pass PubMed article field extraction engine.
+
+    The xml paths of the requested fields are compiled into a tag tree, which is
+    used to walk the article subtree once, only descending into the branches that
+    lead to requested fields, and filling every field during that single visit.
+    """
+
+    SCALAR_FIELDS = {
+        "pmid": ("MedlineCitation/PMID", _text),
+        "date_completed": ("MedlineCitation/DateCompleted", _date),
+        "pub_model": ("MedlineCitation/Article", _attrib("PubModel")),
+        "title": ("MedlineCitation/Article/Journal/Title", _text),
+        "iso_abbreviation": ("MedlineCitation/Article/Journal/ISOAbbreviation", _text),
+        "article_title": ("MedlineCitation/Article/ArticleTitle", _text),
+        "abstract": ("MedlineCitation/Article/Abstract/AbstractText", _text),
+        "language": ("MedlineCitation/Article/Language", _text),
+        "issn": ("MedlineCitation/Article/Journal/ISSN", _text),
+        "issn_type": ("MedlineCitation/Article/Journal/ISSN", _attrib("IssnType")),
+    }
+    """Fields holding the value of the first matching element."""
+
+    LIST_FIELDS = {
+        "authors": ("MedlineCitation/Article/AuthorList/Author", _author),
+        "chemicals": (
+            "MedlineCitation/ChemicalList/Chemical",
+            _first_child("NameOfSubstance"),
+        ),
+        "mesh_list": (
+            "MedlineCitation/MeshHeadingList/MeshHeading",
+            _first_child("DescriptorName"),
+        ),
+    }
+    """Fields holding the values of all matching elements."""
+
+    DEFAULTS = {"date_completed": "--"}
+    """Default values of missing scalar fields (empty string otherwise)."""
+
+    __slots__ = ["_fields", "_tag_tree"]
+
+    def __init__(self, fields: [str] = None):
+        """
+        Compile tag tree for the requested fields.
+
+        Keyword Arguments:
+            fields {[str]} -- The fields to extract (default: {all PUBMED_FIELDS})
+        """
+        self._fields = list(PUBMED_FIELDS if fields is None else fields)
+        self._tag_tree = {}
+        for field in self._fields:
+            if field in self.SCALAR_FIELDS:
+                path, getter = self.SCALAR_FIELDS[field]
+                self._add_path(path, (field, getter, False))
+            elif field in self.LIST_FIELDS:
+                path, getter = self.LIST_FIELDS[field]
+                self._add_path(path, (field, getter, True))
+            else:
+                raise ValueError(f"Unknown PubMed field: {field}")
+
+    def _add_path(self, path: str, handler: tuple):
+        """Add field handler to tag tree node corresponding to xml path."""
+        node = None
+        children = self._tag_tree
+        for tag in path.split("/"):
+            node = children.setdefault(tag, ([], {}))
+            children = node[1]
+        node[0].append(handler)
+
+    @property
+    def fields(self) -> [str]:
+        """Fields extracted by the engine."""
+        return self._fields
+
+    @property
+    def tag_tree(self) -> dict:
+        """
+        Compiled tag tree of the requested fields.
+
+        Each node maps a child tag to a tuple (handlers, children). Handlers of nodes
+        with children only rely on the element attributes.
+        """
+        return self._tag_tree
+
+    def extract(self, article: ET.Element) -> PubMedRecord:
+        """
+        Extract requested fields from article in a single subtree visit.
+
+        Arguments:
+            article {ET.Element} -- The <PubmedArticle> element tree
+
+        Returns:
+            PubMedRecord -- The extracted record, fields not requested are None.
+        """
+        values = self.new_values()
+        self._walk(article, self._tag_tree, values)
+        return self.to_record(values)
+
+    def new_values(self) -> dict:
+        """Create container of field values being extracted from an article."""
+        values = {}
+        for field in self._fields:
+            if field in self.LIST_FIELDS:
+                values[field] = []
+        return values
+
+    def to_record(self, values: dict) -> PubMedRecord:
+        """Create record from extracted values, filling in missing fields."""
+        for field in self._fields:
+            if field not in values:
+                values[field] = self.DEFAULTS.get(field, "")
+        return PubMedRecord(*[values.get(field) for field in PUBMED_FIELDS])
+
+    @staticmethod
+    def apply(handlers: list, element: ET.Element, values: dict):
+        """Apply tag tree node handlers to matching element."""
+        for field, getter, is_list in handlers:
+            if is_list:
+                value = getter(element)
+                if value is not _MISSING:
+                    values[field].append(value)
+            elif field not in values:
+                values[field] = getter(element)
+
+    @staticmethod
+    def _walk(element: ET.Element, tag_tree: dict, values: dict):
+        """Visit element children descending only into tag tree branches."""
+        for child in element:
+            node = tag_tree.get(child.tag)
+            if node is None:
+                continue
+            handlers, children = node
+            ArticleExtractor.apply(handlers, child, values)
+            if children:
+                ArticleExtractor._walk(child, children, values)
+
+
+ARTICLE_EXTRACTOR = ArticleExtractor()
+"""Default extraction engine of all PubMed fields."""
 
 
 class ArticleSetParser:
@@ -181,6 +396,14 @@ class ArticleSetParser:
     An article set is an xml file with an array of <PubMedArticles>.
     """
 
+    ARTICLE_TAG = "PubmedArticle"
+    ARTICLE_START = b"<PubmedArticle>"
+    """Opening tag of each article in a raw article set."""
+    ARTICLE_SET_START = b"<PubmedArticleSet>"
+    ARTICLE_SET_END = b"</PubmedArticleSet>"
+    RANGES_PER_WORKER = 4
+    """Byte ranges per parallel worker, more ranges even out the workers load."""
+
     @staticmethod
     def extract_articles(xml_file_path: str) -> [PubMedArticle]:
         """
@@ -193,12 +416,189 @@ class ArticleSetParser:
             [PubMedArticle] -- List of pubmed article objects
         """
         xml_root: ET.Element = ET.parse(xml_file_path).getroot()
-        articles_xml_list = xml_root.findall("PubmedArticle")
+        articles_xml_list = xml_root.findall(ArticleSetParser.ARTICLE_TAG)
         pubmed_articles: [PubMedArticle] = []
         for article_xml in articles_xml_list:
             pubmed_articles.append(PubMedArticle(article_xml))
         return pubmed_articles
 
+    @staticmethod
+    def open_article_set(xml_file_path: str):
+        """
+        Open article set file for reading in binary mode.
+
+        Arguments:
+            xml_file_path {str} -- absolute path to xml or compressed xml.gz file,
+                or binary file object, left open once read
+
+        Returns:
+            File object, transparently decompressing .gz article sets.
+        """
+        if not isinstance(xml_file_path, str):
+            return nullcontext(xml_file_path)
+        if xml_file_path.endswith(".gz"):
+            return gzip.open(xml_file_path, "rb")
+        return open(xml_file_path, "rb")
+
+    @staticmethod
+    def iter_articles(xml_file_path: str) -> Generator[PubMedArticle, None, None]:
+        """
+        Incrementally extract articles from xml file.
+
+        The article set is parsed incrementally, compressed (.xml.gz) sets are read
+        directly. Every top level element is detached from the document root once it
+        has been processed, so only the articles still referenced by the caller are
+        kept in memory, regardless of the article set size.
+
+        Arguments:
+            xml_file_path {str} -- absolute path to xml or compressed xml.gz file
+
+        Returns:
+            Generator[PubMedArticle, None, None] -- Generator yielding pubmed articles
+        """
+        with ArticleSetParser.open_article_set(xml_file_path) as xml_file:
+            context = ET.iterparse(xml_file, events=("start", "end"))
+            _, xml_root = next(context)
+            depth = 0
+            for event, element in context:
+                if event == "start":
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth != 0:
+                    continue
+                # Top level element complete (PubmedArticle, DeleteCitation, ...)
+                if element.tag == ArticleSetParser.ARTICLE_TAG:
+                    yield PubMedArticle(element)
+                # Release processed elements from document tree
+                xml_root.clear()
+
+    @staticmethod
+    # pylint: disable=bad-continuation
+    def iter_records(
+        xml_file_path: str, engine: str = None, fields: [str] = None
+    ) -> Generator[PubMedRecord, None, None]:
+        """
+        Incrementally extract article records from xml file using parsing engine.
+
+        Arguments:
+            xml_file_path {str} -- absolute path to xml or compressed xml.gz file
+
+        Keyword Arguments:
+            engine {str} -- Name of parsing engine (default: {DEFAULT_XML_ENGINE})
+            fields {[str]} -- The fields to extract (default: {all PUBMED_FIELDS})
+
+        Returns:
+            Generator[PubMedRecord, None, None] -- Generator yielding article records
+        """
+        return get_xml_engine(engine, fields).iter_records(xml_file_path)
+
+    @staticmethod
+    def split_article_set(xml_file_path: str, num_ranges: int) -> [(int, int)]:
+        """
+        Split decompressed article set into byte ranges of whole articles.
+
+        The article set is divided into ranges of about the same size, each range
+        starting at a <PubmedArticle> opening tag, so every range only contains
+        complete top level elements.
+
+        Arguments:
+            xml_file_path {str} -- absolute path to decompressed xml file
+            num_ranges {int} -- Desired number of ranges
+
+        Returns:
+            [(int, int)] -- List of (start, end) byte offsets, at most num_ranges
+        """
+        if os.path.getsize(xml_file_path) == 0:
+            return []
+        with open(xml_file_path, "rb") as xml_file:
+            with mmap.mmap(xml_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                first = data.find(ArticleSetParser.ARTICLE_START)
+                end = data.rfind(ArticleSetParser.ARTICLE_SET_END)
+                if first < 0 or end < first:
+                    return []
+                boundaries = [first]
+                for i in range(1, num_ranges):
+                    target = first + i * (end - first) // num_ranges
+                    start = max(target, boundaries[-1] + 1)
+                    boundary = data.find(ArticleSetParser.ARTICLE_START, start, end)
+                    if boundary < 0:
+                        break
+                    boundaries.append(boundary)
+                boundaries.append(end)
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    @staticmethod
+    # pylint: disable=bad-continuation
+    def parse_range(
+        xml_file_path: str, byte_range: (int, int), engine: str = None
+    ) -> [dict]:
+        """
+        Parse byte range of article set generated by split_article_set.
+
+        Arguments:
+            xml_file_path {str} -- absolute path to decompressed xml file
+            byte_range {(int, int)} -- (start, end) byte offsets of the range
+
+        Keyword Arguments:
+            engine {str} -- Name of parsing engine (default: {DEFAULT_XML_ENGINE})
+
+        Returns:
+            [dict] -- Articles dictionaries sorted by PMID
+        """
+        start, end = byte_range
+        with open(xml_file_path, "rb") as xml_file:
+            xml_file.seek(start)
+            data = xml_file.read(end - start)
+        range_file = io.BytesIO(
+            ArticleSetParser.ARTICLE_SET_START + data + ArticleSetParser.ARTICLE_SET_END
+        )
+        records = get_xml_engine(engine).iter_records(range_file)
+        articles = [dict(zip(record._fields, record)) for record in records]
+        # Stable sort keeps multiple versions of a PMID in file order
+        return sorted(articles, key=ArticleSetParser.pmid_key)
+
+    @staticmethod
+    def pmid_key(article: dict) -> int:
+        """Sort key of article dictionaries, articles without PMID sort first."""
+        pmid = article["pmid"]
+        return int(pmid) if pmid else -1
+
+    @staticmethod
+    # pylint: disable=bad-continuation
+    def parallel_extract(
+        xml_file_path: str, max_workers: int, engine: str = None
+    ) -> [dict]:
+        """
+        Extract articles from large xml file using a pool of processes.
+
+        The decompressed article set is split at <PubmedArticle> byte boundaries and
+        the ranges are parsed in parallel, so a single article set scales with the
+        number of cores. Results of all ranges are merged in PMID order.
+
+        Arguments:
+            xml_file_path {str} -- absolute path to decompressed xml file
+            max_workers {int} -- max number of parallel processes
+
+        Keyword Arguments:
+            engine {str} -- Name of parsing engine (default: {DEFAULT_XML_ENGINE})
+
+        Returns:
+            [dict] -- Articles dictionaries sorted by PMID
+        """
+        num_ranges = max_workers * ArticleSetParser.RANGES_PER_WORKER
+        byte_ranges = ArticleSetParser.split_article_set(xml_file_path, num_ranges)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            ranges_articles = list(
+                executor.map(
+                    ArticleSetParser.parse_range,
+                    repeat(xml_file_path),
+                    byte_ranges,
+                    repeat(engine),
+                )
+            )
+        return list(heapq.merge(*ranges_articles, key=ArticleSetParser.pmid_key))
+
     @staticmethod
     def articles_to_dict(articles: [PubMedArticle]) -> [dict]:
         """Generate list of dictionaries from articles."""
@@ -223,6 +623,137 @@ class ArticleSetParser:
             # pylint: disable=E1101
             writer.write_all(dict_list)
 
+    @staticmethod
+    def stream_to_jsonl(
+        articles: Iterable[PubMedArticle], target_file_path: str
+    ) -> int:
+        """
+        Stream pubmedarticle objects to jsonl file, one article at a time.
+
+        Arguments:
+            articles {Iterable[PubMedArticle]} -- The articles, i.e. iter_articles
+            target_file_path {str} -- absolute path to .jsonl or .jsonl.gz file
+
+        Returns:
+            int -- Number of articles written
+        """
+        dicts = (article.to_dict for article in articles)
+        return ArticleSetParser.dicts_to_jsonl(dicts, target_file_path)
+
+    @staticmethod
+    def dicts_to_jsonl(dicts: Iterable[dict], target_file_path: str) -> int:
+        """
+        Stream article dictionaries to jsonl file, one article at a time.
+
+        Articles are serialized as they are consumed from the iterable, so memory is
+        bounded by the writer buffers. Target files ending in .gz are compressed on the
+        fly. The file is written under a temporary name and only moved to the target
+        path once complete, so a failed run never leaves a truncated target file.
+
+        Arguments:
+            dicts {Iterable[dict]} -- The article dictionaries
+            target_file_path {str} -- absolute path to .jsonl or .jsonl.gz file
+
+        Returns:
+            int -- Number of articles written
+        """
+        opener = gzip.open if target_file_path.endswith(".gz") else open
+        partial_file_path = target_file_path + ".part"
+        count = 0
+        try:
+            with opener(partial_file_path, "wt", encoding="utf-8") as target_file:
+                writer = jsonlines.Writer(target_file)
+                for article_dict in dicts:
+                    # pylint: disable=E1101
+                    writer.write(article_dict)
+                    count += 1
+            os.replace(partial_file_path, target_file_path)
+        finally:
+            if os.path.exists(partial_file_path):
+                os.remove(partial_file_path)
+        return count
+
+    PARQUET_DICTIONARY_COLUMNS = [
+        "pub_model",
+        "title",
+        "iso_abbreviation",
+        "language",
+        "issn",
+        "issn_type",
+    ]
+    """Low cardinality columns dictionary encoded in parquet files."""
+
+    PARQUET_LIST_COLUMNS = ["authors", "chemicals", "mesh_list"]
+    """Columns stored as lists of strings in parquet files."""
+
+    @staticmethod
+    # pylint: disable=bad-continuation
+    def articles_to_parquet(
+        articles: Iterable[PubMedArticle], target_file_path: str, row_group_size=10000
+    ) -> int:
+        """
+        Serialize pubmedarticle objects to columnar parquet file.
+
+        Articles are consumed from the iterable and written one row group at a time.
+        Low cardinality columns are dictionary encoded and the authors, chemicals and
+        mesh_list columns are stored as lists, so readers can load only the columns
+        they need. PMIDs of articles without one are stored as nulls. Requires the
+        optional pyarrow dependency.
+
+        Arguments:
+            articles {Iterable[PubMedArticle]} -- The articles, i.e. iter_articles
+            target_file_path {str} -- absolute path to target parquet file
+
+        Keyword Arguments:
+            row_group_size {int} -- Number of articles per row group (default: {10000})
+
+        Returns:
+            int -- Number of articles written
+        """
+        # pylint: disable=import-outside-toplevel
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        list_cols = ArticleSetParser.PARQUET_LIST_COLUMNS
+        schema = pa.schema(
+            [pa.field("pmid", pa.int64())]
+            + [
+                pa.field(
+                    col, pa.list_(pa.string()) if col in list_cols else pa.string()
+                )
+                for col in PUBMED_FIELDS[1:]
+            ]
+        )
+
+        def write_row_group(writer, columns: dict):
+            columns["pmid"] = [int(pmid) if pmid else None for pmid in columns["pmid"]]
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+
+        partial_file_path = target_file_path + ".part"
+        count = 0
+        try:
+            with pq.ParquetWriter(
+                partial_file_path,
+                schema,
+                use_dictionary=ArticleSetParser.PARQUET_DICTIONARY_COLUMNS,
+                compression="snappy",
+            ) as writer:
+                columns = {field: [] for field in PUBMED_FIELDS}
+                for article in articles:
+                    for field, value in zip(PUBMED_FIELDS, article.to_record):
+                        columns[field].append(value)
+                    count += 1
+                    if count % row_group_size == 0:
+                        write_row_group(writer, columns)
+                        columns = {field: [] for field in PUBMED_FIELDS}
+                if columns["pmid"] or count == 0:
+                    write_row_group(writer, columns)
+            os.replace(partial_file_path, target_file_path)
+        finally:
+            if os.path.exists(partial_file_path):
+                os.remove(partial_file_path)
+        return count
+
     @staticmethod
     def articles_to_pipe(articles: [PubMedArticle], target_file_path: str):
         """Serialize pubmedarticle objects to csv file."""
@@ -239,6 +770,8 @@ class ArticleSetParser:
             "language",
             "chemicals",
             "mesh_list",
+            "issn",
+            "issn_type",
         ]
 
         try:
@@ -249,3 +782,300 @@ class ArticleSetParser:
                     writer.writerow(article)
         except IOError:  # pragma: no cover
             print("Unable to write csv file")
+
+
+class BaseXmlEngine(ABC):
+    """
+    PubMed article set parsing backend.
+
+    Every engine produces the same PubMedRecord records from an article set.
+    """
+
+    name: str = None
+    """Name used to select the engine at runtime."""
+
+    __slots__ = ["_extractor"]
+
+    def __init__(self, fields: [str] = None):
+        """
+        Initialize engine for the requested fields.
+
+        Keyword Arguments:
+            fields {[str]} -- The fields to extract (default: {all PUBMED_FIELDS})
+        """
+        self._extractor = ArticleExtractor(fields)
+
+    @property
+    def fields(self) -> [str]:
+        """Fields extracted by the engine."""
+        return self._extractor.fields
+
+    @abstractmethod
+    def iter_records(self, xml_file_path: str) -> Generator[PubMedRecord, None, None]:
+        """
+        Incrementally extract article records from xml file.
+
+        Arguments:
+            xml_file_path {str} -- absolute path to xml or compressed xml.gz file,
+                or binary file object
+
+        Returns:
+            Generator[PubMedRecord, None, None] -- Generator yielding article records
+        """
+
+
+class EtreeEngine(BaseXmlEngine):
+    """ElementTree iterparse engine, see ArticleSetParser.iter_articles."""
+
+    name: str = "etree"
+
+    def iter_records(self, xml_file_path: str) -> Generator[PubMedRecord, None, None]:
+        """Incrementally extract article records from xml file."""
+        for article in ArticleSetParser.iter_articles(xml_file_path):
+            # pylint: disable=protected-access
+            yield self._extractor.extract(article._pubmed_article)
+
+
+class LxmlEngine(BaseXmlEngine):
+    """
+    lxml iterparse engine with precompiled XPath expressions.
+
+    Requires the optional lxml dependency.
+    """
+
+    name: str = "lxml"
+
+    __slots__ = ["_etree", "_xpaths"]
+
+    def __init__(self, fields: [str] = None):
+        """Compile XPath expressions of the requested fields."""
+        # pylint: disable=import-outside-toplevel
+        from lxml import etree
+
+        super().__init__(fields)
+        self._etree = etree
+        self._xpaths = []
+        for field in self.fields:
+            if field in ArticleExtractor.SCALAR_FIELDS:
+                path, getter = ArticleExtractor.SCALAR_FIELDS[field]
+                xpath = etree.XPath(f"({path})[1]")
+                self._xpaths.append((field, xpath, getter, False))
+            else:
+                path, getter = ArticleExtractor.LIST_FIELDS[field]
+                self._xpaths.append((field, etree.XPath(path), getter, True))
+
+    def iter_records(self, xml_file_path: str) -> Generator[PubMedRecord, None, None]:
+        """Incrementally extract article records from xml file."""
+        with ArticleSetParser.open_article_set(xml_file_path) as xml_file:
+            context = self._etree.iterparse(
+                xml_file, events=("end",), tag=ArticleSetParser.ARTICLE_TAG
+            )
+            for _, article in context:
+                if article.getparent() is None:
+                    continue  # Not an article set
+                values = self._extractor.new_values()
+                for field, xpath, getter, is_list in self._xpaths:
+                    handlers = [(field, getter, is_list)]
+                    for element in xpath(article):
+                        ArticleExtractor.apply(handlers, element, values)
+                yield self._extractor.to_record(values)
+                # Release processed articles from document tree
+                article.clear()
+                while article.getprevious() is not None:
+                    del article.getparent()[0]
+
+
+class _SaxElement:
+    """Minimal element built by the SAX engine for the extraction handlers."""
+
+    __slots__ = ["tag", "attrib", "text", "children"]
+
+    def __init__(self, tag: str, attrib: dict):
+        """Create childless element without text."""
+        self.tag = tag
+        self.attrib = attrib
+        self.text = None
+        self.children = []
+
+    def __iter__(self):
+        """Iterate over element children."""
+        return iter(self.children)
+
+    def get(self, key, default=None):
+        """Return element attribute."""
+        return self.attrib.get(key, default)
+
+
+class _SaxHandler:
+    """
+    Expat event handlers state machine extracting records of an article set.
+
+    The state machine switches the parser handlers between three modes: navigating
+    the extractor tag tree, skipping subtrees without requested fields and building
+    the element subtrees matched by extraction handlers. Only the last mode handles
+    character data, and only until the first child of an element ends, since the
+    extraction handlers don't use text after child elements.
+    """
+
+    __slots__ = [
+        "_extractor",
+        "_parser",
+        "records",
+        "_values",
+        "_nodes",
+        "_skipped",
+        "_elements",
+        "_handlers",
+    ]
+
+    def __init__(self, extractor: ArticleExtractor, parser):
+        """Initialize state machine and attach it to expat parser."""
+        self._extractor = extractor
+        self._parser = parser
+        self.records = []
+        """Records of articles parsed so far."""
+        self._values = None
+        self._nodes = []
+        self._skipped = 0
+        self._elements = []
+        self._handlers = None
+        self._navigate()
+
+    def _navigate(self):
+        """Switch to tag tree navigation mode."""
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = None
+
+    def _start(self, tag: str, attrib: dict):
+        """Handle element start event while navigating tag tree."""
+        if not self._nodes:
+            # Article set root element
+            article_node = ([], self._extractor.tag_tree)
+            self._nodes.append({ArticleSetParser.ARTICLE_TAG: article_node})
+            return
+        node = self._nodes[-1].get(tag)
+        if node is None:
+            self._skipped = 1
+            self._parser.StartElementHandler = self._skip_start
+            self._parser.EndElementHandler = self._skip_end
+            return
+        handlers, children = node
+        if len(self._nodes) == 1:
+            self._values = self._extractor.new_values()
+        if children:
+            if handlers:
+                # Handlers of intermediate nodes only rely on the attributes
+                element = _SaxElement(tag, attrib)
+                ArticleExtractor.apply(handlers, element, self._values)
+            self._nodes.append(children)
+        else:
+            self._elements.append(_SaxElement(tag, attrib))
+            self._handlers = handlers
+            self._parser.StartElementHandler = self._build_start
+            self._parser.EndElementHandler = self._build_end
+            self._parser.CharacterDataHandler = self._chars
+
+    def _end(self, _tag: str):
+        """Handle element end event while navigating tag tree."""
+        self._nodes.pop()
+        if len(self._nodes) == 1:
+            self.records.append(self._extractor.to_record(self._values))
+            self._values = None
+
+    def _skip_start(self, _tag: str, _attrib: dict):
+        """Handle element start event while skipping subtree."""
+        self._skipped += 1
+
+    def _skip_end(self, _tag: str):
+        """Handle element end event while skipping subtree."""
+        self._skipped -= 1
+        if not self._skipped:
+            self._navigate()
+
+    def _build_start(self, tag: str, attrib: dict):
+        """Handle element start event while building matched subtree."""
+        element = _SaxElement(tag, attrib)
+        self._elements[-1].children.append(element)
+        self._elements.append(element)
+        self._parser.CharacterDataHandler = self._chars
+
+    def _build_end(self, _tag: str):
+        """Handle element end event while building matched subtree."""
+        element = self._elements.pop()
+        if self._elements:
+            # Parent text after its first child isn't kept
+            self._parser.CharacterDataHandler = None
+            return
+        ArticleExtractor.apply(self._handlers, element, self._values)
+        self._handlers = None
+        self._navigate()
+
+    def _chars(self, data: str):
+        """Handle character data event of element without children so far."""
+        element = self._elements[-1]
+        text = element.text
+        element.text = data if text is None else text + data
+
+
+class SaxEngine(BaseXmlEngine):
+    """
+    Expat SAX state machine engine.
+
+    The parser follows the extractor tag tree and only builds the small element
+    subtrees matched by the extraction handlers, everything else is skipped as it
+    streams by without creating any objects.
+    """
+
+    name: str = "sax"
+
+    BLOCK_SIZE = 1 << 16
+    """Size of blocks read from article set and fed to the parser."""
+
+    def iter_records(self, xml_file_path: str) -> Generator[PubMedRecord, None, None]:
+        """Incrementally extract article records from xml file."""
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        handler = _SaxHandler(self._extractor, parser)
+        with ArticleSetParser.open_article_set(xml_file_path) as xml_file:
+            while True:
+                block = xml_file.read(self.BLOCK_SIZE)
+                parser.Parse(block, not block)
+                yield from handler.records
+                handler.records.clear()
+                if not block:
+                    return
+
+
+XML_ENGINES = {engine.name: engine for engine in [EtreeEngine, LxmlEngine, SaxEngine]}
+"""Available article set parsing engines."""
+
+DEFAULT_XML_ENGINE = LxmlEngine.name if find_spec("lxml") else SaxEngine.name
+"""Engine used when none is requested, lxml if installed else the streaming sax."""
+
+
+def get_xml_engine(name: str = None, fields: [str] = None) -> BaseXmlEngine:
+    """
+    Create article set parsing engine.
+
+    Falls back to the ElementTree engine if the lxml engine is requested but lxml is
+    not installed.
+
+    Keyword Arguments:
+        name {str} -- Name of the engine (default: {DEFAULT_XML_ENGINE})
+        fields {[str]} -- The fields to extract (default: {all PUBMED_FIELDS})
+
+    Raises:
+        ValueError -- If unknown engine name
+
+    Returns:
+        BaseXmlEngine -- The engine
+    """
+    name = DEFAULT_XML_ENGINE if name is None else name
+    if name not in XML_ENGINES:
+        raise ValueError(f"Unknown xml engine: {name}")
+    try:
+        return XML_ENGINES[name](fields)
+    except ImportError:
+        logging.warning("Xml engine %s unavailable, falling back to etree", name)
+        return EtreeEngine(fields)
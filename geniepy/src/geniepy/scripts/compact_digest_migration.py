@@ -0,0 +1,45 @@
+"""
+Migrate GBQ ctd and classifier tables to compact digest keys.
+
+Creates (or replaces) the compact digest tables of the configured GBQ dataset from
+the hex digest tables. Optionally expects "--dry-run" to only print the queries.
+"""
+# pylint: disable=wrong-import-order, unused-import
+import geniebootsrap  # noqa: F401
+import sys
+from pathlib import Path
+from google.cloud import bigquery
+from google.oauth2 import service_account
+import geniepy.config as config
+from geniepy.datamgmt.migrations import compact_gbq_query
+from geniepy.datamgmt.tables import (  # pylint: disable=bad-continuation
+    CTD_DAO_TABLE,
+    CTD_COMPACT_DAO_TABLE,
+    CLSFR_DAO_TABLE,
+    CLSFR_COMPACT_DAO_TABLE,
+)
+
+MIGRATIONS = [
+    (CTD_DAO_TABLE, CTD_COMPACT_DAO_TABLE),
+    (CLSFR_DAO_TABLE, CLSFR_COMPACT_DAO_TABLE),
+]
+
+
+if __name__ == "__main__":
+
+    DRY_RUN = "--dry-run" in sys.argv[1:]
+    GBQ_CONFIG = config.read_yaml()["gbq"]
+    DATASET = GBQ_CONFIG["dataset"]
+    QUERIES = [compact_gbq_query(DATASET, src, dst) for src, dst in MIGRATIONS]
+
+    if DRY_RUN:
+        print("\n".join(QUERIES))
+        sys.exit(0)
+
+    CREDENTIALS = service_account.Credentials.from_service_account_file(
+        str(Path(GBQ_CONFIG["credentials"]).expanduser())
+    )
+    CLIENT = bigquery.Client(project=GBQ_CONFIG["proj"], credentials=CREDENTIALS)
+    for query in QUERIES:
+        print(query)
+        CLIENT.query(query).result()
@@ -1,24 +1,35 @@
 """
 Handle pubmed historical data.
 
-Parse the pubmed baseline article sets and generate jsonl PubMedArticles to be
-used by classifier.
+Parse the pubmed baseline article sets and generate compressed jsonl PubMedArticles
+to be used by classifier. Article sets are streamed from the compressed archives
+straight into the compressed output files, no intermediate files are written.
 
 The script expects path to folder containing pubmed baseline .xml.gz files,
 the path to output directory where generated files should be stored, and
-number of concurrent processes to be used [1, 16].
+number of concurrent processes to be used [1, 16]. Article sets are parsed whole
+by the processes, largest first, in rounds of one set per process. The sets left
+over for the last, partial round (all of them when there are fewer sets than
+processes) are each split and parsed by all processes instead, so no process is
+left idle waiting for the last sets.
+Optionally, the name of the xml parsing engine can be passed (etree, lxml, sax).
+Decompressed article sets are kept in the raw cache, when configured, so re-runs
+don't decompress them again.
 """
 # pylint: disable=wrong-import-order, unused-import
 import geniebootsrap  # noqa: F401
+import gzip
 import logging
 import sys
 import os
-import gzip
+import tempfile
 from datetime import datetime
 from itertools import repeat
 from concurrent.futures import ProcessPoolExecutor
 from geniepy.scripts.genieutils import decompress_gz
-from geniepy.pubmed import PubMedArticle, ArticleSetParser
+from geniepy.config import get_raw_cache
+from geniepy.datamgmt.cache import RawCache
+from geniepy.pubmed import ArticleSetParser, DEFAULT_XML_ENGINE, XML_ENGINES
 
 
 def is_xml_article_set(filename: str) -> bool:
@@ -36,66 +47,126 @@ def is_xml_article_set(filename: str) -> bool:
     return False
 
 
-def parse_pubmed_article_set(in_path: str, out_path: str):
+# pylint: disable=bad-continuation
+def parse_pubmed_article_set(
+    in_path: str, out_path: str, engine: str = DEFAULT_XML_ENGINE
+):
     """
     Convert xml to json articles.
 
-    Crawls through all files in a directory and create equivalent parsed jsonl file
+    Stream compressed article set into equivalent parsed and compressed jsonl file
     in output_path
 
     Arguments:
         in_path {str} -- absolute path to directory containing compressed article sets
         out_path {str} -- absolute path to desired directory to save output jsonl files
+
+    Keyword Arguments:
+        engine {str} -- name of xml parsing engine (default: {DEFAULT_XML_ENGINE})
     """
     filename = os.path.basename(in_path)
     if not is_xml_article_set(filename):
         return
-    xml_file = in_path.replace(".gz", "")
-    if not os.path.exists(xml_file):
-        logging.info("Extracting %s to %s", in_path, xml_file)
-        decompress_gz(in_path, xml_file)
+    output_file = os.path.join(out_path, filename.replace(".xml.gz", ".jsonl.gz"))
 
-    logging.info("Parsing %s", xml_file)
-    article_list: PubMedArticle = ArticleSetParser.extract_articles(xml_file)
+    logging.info("Parsing %s into %s with %s engine", in_path, output_file, engine)
+    records = ArticleSetParser.iter_records(in_path, engine)
+    articles = (dict(zip(record._fields, record)) for record in records)
+    articles_count = ArticleSetParser.dicts_to_jsonl(articles, output_file)
 
-    # Done with xml - delete to free up space
-    os.remove(xml_file)
+    logging.info(
+        "PID: %s. File Processed: %s. Articles Processed %s",
+        os.getpid(),
+        output_file,
+        articles_count,
+    )
+    return
+
+
+# pylint: disable=bad-continuation
+def parse_pubmed_article_set_parallel(
+    in_path: str,
+    out_path: str,
+    max_workers: int,
+    cache: RawCache = None,
+    engine: str = DEFAULT_XML_ENGINE,
+):
+    """
+    Convert xml to json articles splitting a single article set across processes.
 
-    output_file = os.path.join(out_path, filename.replace(".xml.gz", ".jsonl"))
-    logging.info("Generating %s", output_file)
-    ArticleSetParser.articles_to_jsonl(article_list, output_file)
+    The article set is decompressed to a temporary file in out_path, or into the raw
+    cache if any, which is needed to split the article set into byte ranges parsed
+    in parallel.
 
-    logging.info("Compressing file: %s", output_file)
-    with open(output_file, "rb") as jsonl_data:
-        data_jsonl = jsonl_data.read()
-    compressed_data = gzip.compress(data_jsonl)
-    output_file_compressed = output_file + ".gz"
-    with open(output_file_compressed, "wb") as out_compressed:
-        out_compressed.write(compressed_data)
+    Arguments:
+        in_path {str} -- absolute path to compressed article set
+        out_path {str} -- absolute path to desired directory to save output jsonl files
+        max_workers {int} -- max number of parallel processes to be created
 
-    # Done with parsed file - delete to free up space
-    os.remove(output_file)
+    Keyword Arguments:
+        cache {RawCache} -- cache of decompressed article sets (default: {None})
+        engine {str} -- name of xml parsing engine (default: {DEFAULT_XML_ENGINE})
+    """
+    filename = os.path.basename(in_path)
+    if not is_xml_article_set(filename):
+        return
+    output_file = os.path.join(out_path, filename.replace(".xml.gz", ".jsonl.gz"))
+
+    if cache is not None:
+        stat = os.stat(in_path)
+        key = f"decompressed|{os.path.abspath(in_path)}|{stat.st_size}|{stat.st_mtime}"
+        xml_file = cache.get(key)
+        if xml_file is None:
+            logging.info("Extracting %s to cache", in_path)
+            with gzip.open(in_path, "rb") as gz_file:
+                xml_file = cache.put_stream(key, gz_file, meta={"source": in_path})
+        logging.info("Parsing %s into %s with %s engine", in_path, output_file, engine)
+        articles = ArticleSetParser.parallel_extract(xml_file, max_workers, engine)
+    else:
+        xml_fd, xml_file = tempfile.mkstemp(suffix=".xml", dir=out_path)
+        os.close(xml_fd)
+        try:
+            logging.info("Extracting %s to %s", in_path, xml_file)
+            decompress_gz(in_path, xml_file)
+            logging.info(
+                "Parsing %s into %s with %s engine", in_path, output_file, engine
+            )
+            articles = ArticleSetParser.parallel_extract(xml_file, max_workers, engine)
+        finally:
+            # Done with xml - delete to free up space
+            os.remove(xml_file)
+    articles_count = ArticleSetParser.dicts_to_jsonl(articles, output_file)
 
     logging.info(
-        "PID: %s. File Processed: %s. Articles Processed %s",
-        os.getpid(),
+        "Workers: %s. File Processed: %s. Articles Processed %s",
+        max_workers,
         output_file,
-        len(article_list),
+        articles_count,
     )
-    return
 
 
-def spawn_processes(data_in_dir: str, data_out_dir: str, max_workers: int):
+# pylint: disable=bad-continuation
+def spawn_processes(
+    data_in_dir: str,
+    data_out_dir: str,
+    max_workers: int,
+    engine: str = DEFAULT_XML_ENGINE,
+    cache: RawCache = None,
+):
     """
     Spawns processes to processes article sets in parallel.
 
-    Creates process pool executor to parse article sets and generate output files.:w
-
+    Creates process pool executor to parse article sets and generate output files.
+    Article sets left over for a last partial round are split across all processes.
 
     Arguments:
         data_in_dir {str} -- absolute path to input directory containing all articles
         data_out_dir {str} -- absolute path to output directory
         max_workers {int} -- max number of parallel processes to be created
+
+    Keyword Arguments:
+        engine {str} -- name of xml parsing engine (default: {DEFAULT_XML_ENGINE})
+        cache {RawCache} -- cache of decompressed article sets (default: {None})
     """
     start_time = datetime.now()
     xml_files: [str] = []
@@ -105,8 +176,22 @@ def spawn_processes(data_in_dir: str, data_out_dir: str, max_workers: int):
 
     logging.info("Found %s PubMed article sets", len(xml_files))
 
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        executor.map(parse_pubmed_article_set, xml_files, repeat(data_out_dir))
+    # Largest sets first, smallest ones left over for the split round
+    xml_files.sort(key=os.path.getsize, reverse=True)
+    whole_count = len(xml_files) - len(xml_files) % max_workers
+    if whole_count:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            executor.map(
+                parse_pubmed_article_set,
+                xml_files[:whole_count],
+                repeat(data_out_dir),
+                repeat(engine),
+            )
+    # Not enough article sets left to keep all processes busy, split each set instead
+    for xml_file in xml_files[whole_count:]:
+        parse_pubmed_article_set_parallel(
+            xml_file, data_out_dir, max_workers, cache, engine
+        )
 
     end_time = datetime.now()
     total_time = end_time - start_time
@@ -123,7 +208,8 @@ if __name__ == "__main__":
     logging.getLogger().setLevel(logging.INFO)
 
     ERROR_MSG = "Command line arguments expected: <path to data dir>, \
-        <path to output dir>, <number of parallel processes (2-16)>"
+        <path to output dir>, <number of parallel processes (2-16)>, \
+        [xml engine (etree, lxml, sax)]"
 
     if not sys.argv or len(sys.argv) < 4:
         raise ValueError(ERROR_MSG)
@@ -140,6 +226,11 @@ if __name__ == "__main__":
     else:
         raise ValueError("Output data directory is not valid. " + ERROR_MSG)
 
+    # check optional argument for xml engine
+    ENGINE = sys.argv[4] if len(sys.argv) > 4 else DEFAULT_XML_ENGINE
+    if ENGINE not in XML_ENGINES:
+        raise ValueError("Xml engine is not valid. " + ERROR_MSG)
+
     # check argument for number of parallel processes
     try:
         MAX_WORKERS = int(sys.argv[3])
@@ -151,7 +242,7 @@ if __name__ == "__main__":
             MAX_WORKERS = 1
 
         logging.info("Initializing parallel processing . . .")
-        spawn_processes(DATA_IN_DIR, DATA_OUT_DIR, MAX_WORKERS)
+        spawn_processes(DATA_IN_DIR, DATA_OUT_DIR, MAX_WORKERS, ENGINE, get_raw_cache())
     except ValueError:
         logging.error(
             "Max number of processes should be a valid integer. %s", ERROR_MSG
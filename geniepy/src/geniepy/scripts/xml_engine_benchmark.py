@@ -0,0 +1,103 @@
+"""
+Benchmark pubmed xml parsing engines.
+
+Builds a scaled up article set by repeating the articles of the sample article sets
+and times how long each xml engine takes to extract all records from it, keeping
+the best of a few runs. Speedups are relative to the ElementTree engine, the engine
+used by default is flagged.
+
+The script optionally expects the scale factor (default 2000) and the paths to the
+article sets to be scaled (default test resources sample_articleset*.xml).
+"""
+# pylint: disable=wrong-import-order, unused-import
+import geniebootsrap  # noqa: F401
+import glob
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from geniepy.pubmed import (
+    ArticleSetParser,
+    DEFAULT_XML_ENGINE,
+    XML_ENGINES,
+    get_xml_engine,
+)
+
+RESOURCES_PATH = Path(__file__).resolve().parents[3].joinpath("tests", "resources")
+DEFAULT_SCALE = 2000
+REPEAT = 3
+HEADER = b'<?xml version="1.0" encoding="utf-8"?>\n<PubmedArticleSet>\n'
+
+
+def build_article_set(article_sets: [str], scale: int, target_file_path: str) -> int:
+    """
+    Generate article set repeating the articles of the given article sets.
+
+    Arguments:
+        article_sets {[str]} -- paths to the decompressed article sets to be scaled
+        scale {int} -- number of times the articles are repeated
+        target_file_path {str} -- path to generated article set
+
+    Returns:
+        int -- number of articles in generated article set
+    """
+    articles = []
+    for article_set in article_sets:
+        with open(article_set, "rb") as xml_file:
+            data = xml_file.read()
+        for start, end in ArticleSetParser.split_article_set(article_set, len(data)):
+            articles.append(data[start:end])
+    with open(target_file_path, "wb") as target_file:
+        target_file.write(HEADER)
+        for _ in range(scale):
+            target_file.writelines(articles)
+        target_file.write(ArticleSetParser.ARTICLE_SET_END)
+    return len(articles) * scale
+
+
+def benchmark(xml_file_path: str, articles_count: int):
+    """Time record extraction of each engine."""
+    baseline = None
+    for name in XML_ENGINES:
+        engine = get_xml_engine(name)
+        if engine.name != name:
+            logging.warning("Skipping unavailable engine %s", name)
+            continue
+        elapsed = None
+        for _ in range(REPEAT):
+            start_time = time.perf_counter()
+            count = sum(1 for _ in engine.iter_records(xml_file_path))
+            run_time = time.perf_counter() - start_time
+            elapsed = run_time if elapsed is None else min(elapsed, run_time)
+            assert count == articles_count
+        baseline = elapsed if baseline is None else baseline
+        logging.info(
+            "%6s: %8.0f articles/s, %6.2fs, %.2fx%s",
+            name,
+            count / elapsed,
+            elapsed,
+            baseline / elapsed,
+            " (default)" if name == DEFAULT_XML_ENGINE else "",
+        )
+
+
+if __name__ == "__main__":
+
+    logging.getLogger().setLevel(logging.INFO)
+
+    SCALE = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SCALE
+    ARTICLE_SETS = sys.argv[2:] or sorted(
+        glob.glob(str(RESOURCES_PATH.joinpath("sample_articleset*.xml")))
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        XML_FILE = os.path.join(tmp_dir, "articleset.xml")
+        ARTICLES_COUNT = build_article_set(ARTICLE_SETS, SCALE, XML_FILE)
+        logging.info(
+            "Benchmarking %s articles, %.1f MB",
+            ARTICLES_COUNT,
+            os.path.getsize(XML_FILE) / 1e6,
+        )
+        benchmark(XML_FILE, ARTICLES_COUNT)
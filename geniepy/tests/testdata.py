@@ -18,10 +18,13 @@ PUBMED_INVALID_SCHEMA = [
             "abstract": [
                 "D-lactic acidosis is an uncommon cause of high anion gap acidosis."
             ],
-            "authors": ["Weemaes, Matthias, Hiele, Martin, Vermeersch, Pieter"],
+            "authors": [["Weemaes, Matthias", "Hiele, Martin", "Vermeersch, Pieter"]],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [3],
+            "num_chemicals": [0],
+            "abstract_length": [66],
         }
     ),
     pd.DataFrame(
@@ -38,11 +41,18 @@ PUBMED_INVALID_SCHEMA = [
                 "Rejection of the sample with repeated blood withdrawal is always an unwanted consequence of sample nonconformity and preanalytical errors, especially in the most vulnerable population - children. Here is presented a case with unexpected abnormal coagulation test results in a 2-year-old child with no previously documented coagulation disorder. Child is planned for tympanostomy tubes removal under the anaesthesia driven procedure, and preoperative coagulation tests revealed prolonged prothrombin time, activated partial thromboplastin time and thrombin time, with fibrinogen and antithrombin within reference intervals. From the anamnestic and clinical data, congenital coagulation disorder was excluded, and with further investigation, sample mismatch, clot presence and accidental ingestion of oral anticoagulant, heparin contamination or vitamin K deficiency were excluded too. Due to suspected EDTA carryover during blood sampling another sample was taken the same day and all tests were performed again. The results for all tests were within reference intervals confirming EDTA effect on falsely prolongation of the coagulation times in the first sample. This case can serve as alert to avoid unnecessary loss in terms of blood withdrawal repetitions and discomfort of the patients and their relatives, tests repeating, prolonging medical procedures, and probably delaying diagnosis or proper medical treatment. It is the responsibility of the laboratory specialists to continuously educate laboratory staff and other phlebotomists on the correct blood collection as well as on its importance for the patient's safety."
             ],
             "authors": [
-                "Banković Radovanović, Patricija, Živković Mikulčić, Tanja, Simović Medica, Jasmina"
+                [
+                    "Banković Radovanović, Patricija",
+                    "Živković Mikulčić, Tanja",
+                    "Simović Medica, Jasmina",
+                ]
             ],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [3],
+            "num_chemicals": [0],
+            "abstract_length": [1626],
         }
     ),
 ]
@@ -62,10 +72,13 @@ PUBMED_INVALID_DF = [
             "abstract": [
                 "D-lactic acidosis is an uncommon cause of high anion gap acidosis."
             ],
-            "authors": ["Weemaes, Matthias, Hiele, Martin, Vermeersch, Pieter"],
+            "authors": [["Weemaes, Matthias", "Hiele, Martin", "Vermeersch, Pieter"]],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [3],
+            "num_chemicals": [0],
+            "abstract_length": [66],
         }
     ),
     pd.DataFrame(
@@ -82,11 +95,18 @@ PUBMED_INVALID_DF = [
                 "Rejection of the sample with repeated blood withdrawal is always an unwanted consequence of sample nonconformity and preanalytical errors, especially in the most vulnerable population - children. Here is presented a case with unexpected abnormal coagulation test results in a 2-year-old child with no previously documented coagulation disorder. Child is planned for tympanostomy tubes removal under the anaesthesia driven procedure, and preoperative coagulation tests revealed prolonged prothrombin time, activated partial thromboplastin time and thrombin time, with fibrinogen and antithrombin within reference intervals. From the anamnestic and clinical data, congenital coagulation disorder was excluded, and with further investigation, sample mismatch, clot presence and accidental ingestion of oral anticoagulant, heparin contamination or vitamin K deficiency were excluded too. Due to suspected EDTA carryover during blood sampling another sample was taken the same day and all tests were performed again. The results for all tests were within reference intervals confirming EDTA effect on falsely prolongation of the coagulation times in the first sample. This case can serve as alert to avoid unnecessary loss in terms of blood withdrawal repetitions and discomfort of the patients and their relatives, tests repeating, prolonging medical procedures, and probably delaying diagnosis or proper medical treatment. It is the responsibility of the laboratory specialists to continuously educate laboratory staff and other phlebotomists on the correct blood collection as well as on its importance for the patient's safety."
             ],
             "authors": [
-                "Banković Radovanović, Patricija, Živković Mikulčić, Tanja, Simović Medica, Jasmina"
+                [
+                    "Banković Radovanović, Patricija",
+                    "Živković Mikulčić, Tanja",
+                    "Simović Medica, Jasmina",
+                ]
             ],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [3],
+            "num_chemicals": [0],
+            "abstract_length": [1626],
         }
     ),
     pd.DataFrame(
@@ -102,10 +122,13 @@ PUBMED_INVALID_DF = [
             "abstract": [
                 "This study used qualitative analyses to investigate similarities and differences in narrative production across two task conditions for four first grade Spanish-English emergent bilingual children. Task conditions were spontaneous story generation and retelling using the same story. Spanish stories from two children were compared on the basis of similarity in vocabulary, while English stories from two children were compared on the basis of similarity in overall discourse skills. Results show that when the total number of words used was similar across English narratives, the retell included more different words and higher quality story structure than the spontaneous story. When overall discourse scores in the Spanish examples were similar, the spontaneous story required more words than the retell, but also included more central events and greater detail. Yet, the retell included more advanced narrative components. This study contributes to our understanding of narrative skills in young Spanish-English bilinguals across task conditions."
             ],
-            "authors": ["Lucero, Audrey, Uchikoshi, Yuuko"],
+            "authors": [["Lucero, Audrey", "Uchikoshi, Yuuko"]],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [2],
+            "num_chemicals": [0],
+            "abstract_length": [1050],
             "other col": [""],  # Extra column
         }
     ),
@@ -123,11 +146,20 @@ PUBMED_INVALID_DF = [
                 "To report surgical techniques and results in the treatment of chronic Monteggia fracture-dislocation in children."
             ],
             "authors": [
-                "Soni, Jamil Faissal, Valenza, Weverley Rubele, Matsunaga, Carolina Umeta, Costa, Anna Carolina Pavelec, Faria, Fernando Ferraz"
+                [
+                    "Soni, Jamil Faissal",
+                    "Valenza, Weverley Rubele",
+                    "Matsunaga, Carolina Umeta",
+                    "Costa, Anna Carolina Pavelec",
+                    "Faria, Fernando Ferraz",
+                ]
             ],
             "language": ["eng"],
             # Missing column
-            "mesh_list": [""],
+            "mesh_list": [[]],
+            "num_authors": [5],
+            "num_chemicals": [0],
+            "abstract_length": [113],
         }
     ),
     pd.DataFrame(
@@ -142,11 +174,21 @@ PUBMED_INVALID_DF = [
                 "To evaluate the efficacy of platelet-rich plasma (PRP) and tranexamic acid (TXA) applied in total knee arthroplasty."
             ],
             "authors": [
-                "Guerreiro, João Paulo Fernandes, Lima, Diogenes Rodrigues, Bordignon, Glaucia, Danieli, Marcus Vinicius, Queiroz, Alexandre Oliveira, Cataneo, Daniele Cristina"
+                [
+                    "Guerreiro, João Paulo Fernandes",
+                    "Lima, Diogenes Rodrigues",
+                    "Bordignon, Glaucia",
+                    "Danieli, Marcus Vinicius",
+                    "Queiroz, Alexandre Oliveira",
+                    "Cataneo, Daniele Cristina",
+                ]
             ],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [6],
+            "num_chemicals": [0],
+            "abstract_length": [116],
         }
     ),
 ]
@@ -167,10 +209,13 @@ PUBMED_VALID_DF = [
             "abstract": [
                 "D-lactic acidosis is an uncommon cause of high anion gap acidosis."
             ],
-            "authors": ["Weemaes, Matthias, Hiele, Martin, Vermeersch, Pieter"],
+            "authors": [["Weemaes, Matthias", "Hiele, Martin", "Vermeersch, Pieter"]],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [3],
+            "num_chemicals": [0],
+            "abstract_length": [66],
         }
     ),
     pd.DataFrame(
@@ -187,11 +232,18 @@ PUBMED_VALID_DF = [
                 "Rejection of the sample with repeated blood withdrawal is always an unwanted consequence of sample nonconformity and preanalytical errors, especially in the most vulnerable population - children. Here is presented a case with unexpected abnormal coagulation test results in a 2-year-old child with no previously documented coagulation disorder. Child is planned for tympanostomy tubes removal under the anaesthesia driven procedure, and preoperative coagulation tests revealed prolonged prothrombin time, activated partial thromboplastin time and thrombin time, with fibrinogen and antithrombin within reference intervals. From the anamnestic and clinical data, congenital coagulation disorder was excluded, and with further investigation, sample mismatch, clot presence and accidental ingestion of oral anticoagulant, heparin contamination or vitamin K deficiency were excluded too. Due to suspected EDTA carryover during blood sampling another sample was taken the same day and all tests were performed again. The results for all tests were within reference intervals confirming EDTA effect on falsely prolongation of the coagulation times in the first sample. This case can serve as alert to avoid unnecessary loss in terms of blood withdrawal repetitions and discomfort of the patients and their relatives, tests repeating, prolonging medical procedures, and probably delaying diagnosis or proper medical treatment. It is the responsibility of the laboratory specialists to continuously educate laboratory staff and other phlebotomists on the correct blood collection as well as on its importance for the patient's safety."
             ],
             "authors": [
-                "Banković Radovanović, Patricija, Živković Mikulčić, Tanja, Simović Medica, Jasmina"
+                [
+                    "Banković Radovanović, Patricija",
+                    "Živković Mikulčić, Tanja",
+                    "Simović Medica, Jasmina",
+                ]
             ],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [3],
+            "num_chemicals": [0],
+            "abstract_length": [1626],
         }
     ),
     pd.DataFrame(
@@ -207,10 +259,13 @@ PUBMED_VALID_DF = [
             "abstract": [
                 "This study used qualitative analyses to investigate similarities and differences in narrative production across two task conditions for four first grade Spanish-English emergent bilingual children. Task conditions were spontaneous story generation and retelling using the same story. Spanish stories from two children were compared on the basis of similarity in vocabulary, while English stories from two children were compared on the basis of similarity in overall discourse skills. Results show that when the total number of words used was similar across English narratives, the retell included more different words and higher quality story structure than the spontaneous story. When overall discourse scores in the Spanish examples were similar, the spontaneous story required more words than the retell, but also included more central events and greater detail. Yet, the retell included more advanced narrative components. This study contributes to our understanding of narrative skills in young Spanish-English bilinguals across task conditions."
             ],
-            "authors": ["Lucero, Audrey, Uchikoshi, Yuuko"],
+            "authors": [["Lucero, Audrey", "Uchikoshi, Yuuko"]],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [2],
+            "num_chemicals": [0],
+            "abstract_length": [1050],
         }
     ),
     pd.DataFrame(
@@ -227,11 +282,20 @@ PUBMED_VALID_DF = [
                 "To report surgical techniques and results in the treatment of chronic Monteggia fracture-dislocation in children."
             ],
             "authors": [
-                "Soni, Jamil Faissal, Valenza, Weverley Rubele, Matsunaga, Carolina Umeta, Costa, Anna Carolina Pavelec, Faria, Fernando Ferraz"
+                [
+                    "Soni, Jamil Faissal",
+                    "Valenza, Weverley Rubele",
+                    "Matsunaga, Carolina Umeta",
+                    "Costa, Anna Carolina Pavelec",
+                    "Faria, Fernando Ferraz",
+                ]
             ],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [5],
+            "num_chemicals": [0],
+            "abstract_length": [113],
         }
     ),
     pd.DataFrame(
@@ -248,11 +312,21 @@ PUBMED_VALID_DF = [
                 "To evaluate the efficacy of platelet-rich plasma (PRP) and tranexamic acid (TXA) applied in total knee arthroplasty."
             ],
             "authors": [
-                "Guerreiro, João Paulo Fernandes, Lima, Diogenes Rodrigues, Bordignon, Glaucia, Danieli, Marcus Vinicius, Queiroz, Alexandre Oliveira, Cataneo, Daniele Cristina"
+                [
+                    "Guerreiro, João Paulo Fernandes",
+                    "Lima, Diogenes Rodrigues",
+                    "Bordignon, Glaucia",
+                    "Danieli, Marcus Vinicius",
+                    "Queiroz, Alexandre Oliveira",
+                    "Cataneo, Daniele Cristina",
+                ]
             ],
             "language": ["eng"],
-            "chemicals": [""],
-            "mesh_list": [""],
+            "chemicals": [[]],
+            "mesh_list": [[]],
+            "num_authors": [6],
+            "num_chemicals": [0],
+            "abstract_length": [116],
         }
     ),
 ]
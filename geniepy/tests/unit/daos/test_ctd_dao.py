@@ -1,4 +1,6 @@
 """Module to test Data Access Objects."""
+import os
+import pandas as pd
 import pytest
 from geniepy.datamgmt.daos import BaseDao, CtdDao
 from geniepy.errors import SchemaError
@@ -6,9 +8,12 @@ import geniepy.datamgmt.repositories as dr
 from geniepy.datamgmt.tables import CTD_PROPTY
 from geniepy.errors import DaoError
 from geniepy.datamgmt.parsers import CtdParser
+from geniepy.datamgmt.pipeline import Pipeline
+from geniepy.datamgmt.scrapers import CtdScraper
 import tests.testdata as td
 from tests.resources.mock import MockCtdScraper
 from tests.resources.mock import TEST_CHUNKSIZE
+from tests import get_resources_path
 
 
 class TestCtdDao:
@@ -126,3 +131,103 @@ class TestCtdDao:
         # Generator should return values
         result_df = next(generator)
         assert not result_df.empty
+
+    def test_download_file(self):
+        """Load all records of raw csv file."""
+        self.test_dao.purge()
+        csv_path = os.path.join(get_resources_path(), "sample_ctd_db.csv")
+        self.test_dao.download_file(csv_path, TEST_CHUNKSIZE)
+        generator = self.test_dao.query(self.test_dao.query_all, 100)
+        result_df = next(generator)
+        assert result_df.shape[0] == 21
+
+    def test_save_skips_validated(self, monkeypatch):
+        """Parsed dataframes should not be validated again when saved."""
+        parsed_df = next(self.test_dao._parser.fetch(TEST_CHUNKSIZE))
+
+        def fail_validate(payload):
+            raise AssertionError("Validated twice")
+
+        monkeypatch.setattr(CtdParser, "validate", staticmethod(fail_validate))
+        self.test_dao.save(parsed_df)
+        with pytest.raises(AssertionError):
+            self.test_dao.save(parsed_df.copy().head(1))
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_download_pipeline(self, ordered):
+        """Download through concurrent pipeline should save every record."""
+        self.test_dao.purge()
+        pipeline = Pipeline(parse_workers=2, queue_size=2, ordered=ordered)
+        self.test_dao.download(3, pipeline)
+        generator = self.test_dao.query(self.test_dao.query_all, 100)
+        result_df = next(generator)
+        assert result_df.shape[0] == 21
+
+    def test_download_delta(self, tmp_path):
+        """Delta downloads should only write the changed digests."""
+        self.test_dao.purge()
+        csv_path = os.path.join(get_resources_path(), "sample_ctd_db.csv")
+        summary = self.test_dao.download_file(csv_path, TEST_CHUNKSIZE, delta=True)
+        stored_df = next(self.test_dao.query(self.test_dao.query_all, 100))
+        assert stored_df.shape[0] == 21
+        assert len(summary.inserted) == stored_df.digest.nunique()
+        assert not summary.updated.size and not summary.deleted.size
+        # Same release again doesn't write anything
+        summary = self.test_dao.download_file(csv_path, TEST_CHUNKSIZE, delta=True)
+        assert not summary
+        assert summary.unchanged == stored_df.digest.nunique()
+        # Change pmids of first record, drop second and duplicate third record
+        with open(csv_path) as csv_file:
+            lines = csv_file.readlines()
+        first = lines[1].rsplit(",", 1)[0] + ",1|2|3\n"
+        new_path = str(tmp_path / "CTD_genes_diseases.csv")
+        with open(new_path, "w") as new_file:
+            new_file.writelines([lines[0], first, lines[3], *lines[3:]])
+        summary = self.test_dao.download_file(new_path, 7, delta=True)
+        new_df = pd.concat(self.test_dao._parser.fetch_file(new_path, 100))
+        old_pmids = stored_df.groupby("digest").pmids.apply(sorted)
+        new_pmids = new_df.groupby("digest").pmids.apply(sorted)
+        common = old_pmids.index.intersection(new_pmids.index)
+        updated = common[old_pmids[common] != new_pmids[common]]
+        assert set(summary.updated) == set(updated)
+        assert new_df.digest[0] in summary.updated
+        assert set(summary.deleted) == set(old_pmids.index.difference(new_pmids.index))
+        assert not summary.inserted.size
+        result_df = next(self.test_dao.query(self.test_dao.query_all, 100))
+        key = ["digest", "pmids"]
+        assert sorted(map(tuple, result_df[key].values)) == sorted(
+            map(tuple, new_df[key].values)
+        )
+
+    def test_download_delta_unchanged(self):
+        """Delta downloads of unchanged releases should keep stored records."""
+        self.test_dao.purge()
+        self.test_dao.download(TEST_CHUNKSIZE)
+        summary = self.test_dao.download_delta(iter([]), TEST_CHUNKSIZE)
+        assert not summary
+        result_df = next(self.test_dao.query(self.test_dao.query_all, 100))
+        assert result_df.shape[0] == 21
+        summary = self.test_dao.download(TEST_CHUNKSIZE, delta=True)
+        assert summary.unchanged == result_df.digest.nunique()
+
+    def test_download_delta_failed(self, tmp_path, monkeypatch):
+        """Releases of failed delta downloads should be downloaded again."""
+        csv_path = os.path.join(get_resources_path(), "sample_ctd_db.csv")
+        scraper = CtdScraper(csv_path, str(tmp_path / "ctd_release.json"))
+        test_dao = CtdDao(dr.SqlRepository("sqlite://", CTD_PROPTY), scraper)
+        save = dr.SqlRepository.save
+
+        def failing_save(repository, payload, mode="append"):
+            monkeypatch.setattr(dr.SqlRepository, "save", save)
+            raise DaoError("Failed save")
+
+        monkeypatch.setattr(dr.SqlRepository, "save", failing_save)
+        with pytest.raises(DaoError):
+            test_dao.download(TEST_CHUNKSIZE, delta=True)
+        assert scraper.read_state() == {}
+        summary = test_dao.download(TEST_CHUNKSIZE, delta=True)
+        result_df = next(test_dao.query(test_dao.query_all, 100))
+        assert result_df.shape[0] == 21
+        assert len(summary.inserted) == result_df.digest.nunique()
+        assert scraper.read_state()["sha256"] == scraper.checksum()
+        assert not test_dao.download(TEST_CHUNKSIZE, delta=True)
@@ -1,6 +1,8 @@
 """Module to test Data Access Objects."""
 import pytest
+import pandas as pd
 from geniepy.datamgmt.daos import BaseDao, PubMedDao
+from geniepy.datamgmt.pipeline import Pipeline
 from geniepy.errors import SchemaError
 import tests.testdata as td
 from tests.resources.mock import MockPubMedScraper
@@ -120,3 +122,27 @@ class TestPubMedDao:
         # Generator should return values
         result_df = next(generator)
         assert not result_df.empty
+
+    def test_download_pipeline(self):
+        """Download through concurrent pipeline should save every article."""
+        self.test_dao.purge()
+        self.test_dao.download(2, Pipeline(parse_workers=2, queue_size=2))
+        generator = self.test_dao.query(self.test_dao.query_all, 100)
+        result_df = next(generator)
+        assert result_df.shape[0] == 17
+        assert result_df.pmid.is_unique
+
+    def test_query_pkeys(self, monkeypatch):
+        """Batched lookup should return the records of every known pmid."""
+        monkeypatch.setattr(dr.SqlRepository, "LOOKUP_BATCH", 4)
+        self.test_dao.purge()
+        self.test_dao.download(TEST_CHUNKSIZE)
+        stored = next(self.test_dao.query(self.test_dao.query_all, 100))
+        pmids = list(stored.pmid) + [0, stored.pmid[0]]
+        chunks = list(self.test_dao.query_pkeys(pmids, 3))
+        assert all(0 < len(chunk) <= 3 for chunk in chunks)
+        result_df = pd.concat(chunks, ignore_index=True)
+        assert sorted(result_df.pmid) == sorted(stored.pmid)
+        # List columns are decoded
+        assert all(isinstance(authors, list) for authors in result_df.authors)
+        assert not list(self.test_dao.query_pkeys([], 3))
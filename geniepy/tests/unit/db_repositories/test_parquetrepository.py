@@ -0,0 +1,175 @@
+"""Module to test the Parquet files repository."""
+import os
+import pytest
+import pandas as pd
+import tests.testdata as td
+from geniepy.datamgmt.daos import PubMedDao
+from geniepy.datamgmt.repositories import ParquetRepository, parse_select
+from geniepy.datamgmt.tables import PUBMED_PROPTY, CTD_PROPTY
+from geniepy.errors import DaoError
+from tests import get_test_output_path
+from tests.resources.mock import MockPubMedScraper, TEST_CHUNKSIZE
+
+pytest.importorskip("pyarrow.parquet")
+
+ROOT_PATH = os.path.join(get_test_output_path(), "parquet_repo")
+PUBMED_DF = pd.concat(td.PUBMED_VALID_DF, ignore_index=True)
+"""Sample pubmed records."""
+CTD_DF = pd.concat(td.CTD_VALID_DF, ignore_index=True)
+"""Sample ctd records, some digests have several records."""
+
+
+@pytest.fixture
+def pubmed_repo():
+    """Generate empty pubmed repository, partitioned by ranges of 10 pmids."""
+    repo = ParquetRepository(ROOT_PATH, PUBMED_PROPTY, range_size=10)
+    repo.delete_all()
+    yield repo
+    repo.delete_all()
+
+
+@pytest.fixture
+def ctd_repo():
+    """Generate ctd repository holding sample records."""
+    repo = ParquetRepository(ROOT_PATH, CTD_PROPTY, prefix_length=1)
+    repo.delete_all()
+    repo.save(CTD_DF)
+    yield repo
+    repo.delete_all()
+
+
+def pubmed_records(pmids: [int]) -> pd.DataFrame:
+    """Generate pubmed records of pmids from the first sample record."""
+    records = pd.concat([td.PUBMED_VALID_DF[0]] * len(pmids), ignore_index=True)
+    return records.assign(pmid=pmids)
+
+
+def test_parse_select():
+    """Simple queries should be parsed into projection and conditions."""
+    query = "SELECT digest, pmids FROM ctd WHERE digest IN ('a', 'b''c') AND geneid>=3;"
+    assert parse_select(query) == (
+        ["digest", "pmids"],
+        "ctd",
+        [("digest", "IN", ["a", "b'c"]), ("geneid", ">=", 3)],
+    )
+    assert parse_select("SELECT * FROM ctd;") == (None, "ctd", [])
+    with pytest.raises(DaoError):
+        parse_select("DELETE FROM ctd;")
+
+
+class TestParquetRepository:
+    """PyTest Parquet repository test class."""
+
+    @pytest.mark.parametrize("payload", td.PUBMED_INVALID_SCHEMA)
+    def test_save_invalid_schema(self, pubmed_repo, payload):
+        """Saving dataframes not matching the table schema should raise dao error."""
+        with pytest.raises(DaoError):
+            pubmed_repo.save(payload)
+
+    @pytest.mark.parametrize("payload", td.PUBMED_VALID_DF)
+    def test_query_pkey(self, pubmed_repo, payload):
+        """Saved records should be read back unchanged."""
+        pubmed_repo.save(payload)
+        query_str = pubmed_repo.query_pkey(payload.pmid[0])
+        chunk = next(pubmed_repo.query(query_str, TEST_CHUNKSIZE))
+        assert chunk.equals(payload)
+        with pytest.raises(StopIteration):
+            next(pubmed_repo.query(pubmed_repo.query_pkey(0), TEST_CHUNKSIZE))
+
+    @pytest.mark.parametrize("chunksize", [1, 3, 100])
+    def test_query_ordered(self, pubmed_repo, chunksize):
+        """Whole table should be read in chunks ordered by primary key."""
+        pmids = [42, 7, 1000, 3, 15, 8, 41]
+        pubmed_repo.save(pubmed_records(pmids[:4]))
+        pubmed_repo.save(pubmed_records(pmids[4:]))
+        chunks = list(pubmed_repo.query(pubmed_repo.query_all, chunksize))
+        assert all(len(chunk) == chunksize for chunk in chunks[:-1])
+        assert [pmid for chunk in chunks for pmid in chunk.pmid] == sorted(pmids)
+        assert pubmed_repo._list_partitions() == [  # pylint: disable=protected-access
+            "pmid=0",
+            "pmid=1",
+            "pmid=4",
+            "pmid=100",
+        ]
+
+    def test_projection_predicates(self, ctd_repo):
+        """Queries should only return the selected columns of matching records."""
+        digest = CTD_DF.digest[0]
+        query = (
+            f"SELECT pmids, geneid FROM ctd WHERE digest = '{digest}' AND geneid > 0;"
+        )
+        result_df = next(ctd_repo.query(query, 100))
+        assert list(result_df.columns) == ["pmids", "geneid"]
+        expected = CTD_DF[CTD_DF.digest == digest]
+        assert sorted(result_df.pmids) == sorted(expected.pmids)
+        with pytest.raises(DaoError):
+            ctd_repo.query("SELECT unknown FROM ctd;", 100)
+
+    def test_partition_pruning(self, ctd_repo):
+        """Primary key conditions should only read the partitions of their keys."""
+        digest = CTD_DF.digest[0]
+        conditions = [("digest", "=", digest)]
+        # pylint: disable=protected-access
+        assert ctd_repo._prune(conditions) == [f"digest={digest[0]}"]
+        assert len(ctd_repo._list_partitions()) > 1
+        assert ctd_repo._prune([("digest", "=", "zz")]) == []
+
+    def test_query_pkeys(self, ctd_repo):
+        """Batched lookup should return every record of the known keys."""
+        digests = list(CTD_DF.digest.unique()[:2]) + ["unknown"]
+        chunks = list(ctd_repo.query_pkeys(digests, 1))
+        result_df = pd.concat(chunks, ignore_index=True)
+        assert len(result_df) == CTD_DF.digest.isin(digests).sum()
+
+    def test_delete_pkeys(self, ctd_repo):
+        """Deleted keys should not be read anymore."""
+        deleted = CTD_DF.digest[0]
+        ctd_repo.delete_pkeys([deleted, "unknown"])
+        ctd_repo.delete_pkeys([])
+        result_df = next(ctd_repo.query(ctd_repo.query_all, 100))
+        assert deleted not in result_df.digest.values
+        assert len(result_df) == (CTD_DF.digest != deleted).sum()
+
+    def test_upsert(self, pubmed_repo):
+        """Upserted records should replace the records with the same pmid."""
+        pubmed_repo.save(pubmed_records([1, 2, 11]))
+        pubmed_repo.save(pubmed_records([2]))
+        update = pubmed_records([2, 12]).assign(language=["fre", "ger"])
+        pubmed_repo.save(update, mode="upsert")
+        pubmed_repo.save(update, mode="upsert")
+        result_df = next(pubmed_repo.query(pubmed_repo.query_all, 100))
+        assert list(result_df.pmid) == [1, 2, 11, 12]
+        assert list(result_df.language) == ["eng", "fre", "eng", "ger"]
+
+    def test_upsert_new_keys(self, pubmed_repo):
+        """Upserts of new pmids should append files without rewriting partitions."""
+        # pylint: disable=protected-access
+        pubmed_repo.save(pubmed_records([1, 2]), mode="upsert")
+        first_files = pubmed_repo._partition_files("pmid=0")
+        pubmed_repo.save(pubmed_records([3, 4]), mode="upsert")
+        files = pubmed_repo._partition_files("pmid=0")
+        assert len(files) == 2 and set(first_files) < set(files)
+        pubmed_repo.save(pubmed_records([4, 5]), mode="upsert")
+        assert len(pubmed_repo._partition_files("pmid=0")) == 1
+        result_df = next(pubmed_repo.query(pubmed_repo.query_all, 100))
+        assert list(result_df.pmid) == [1, 2, 3, 4, 5]
+
+    def test_delete_all(self, ctd_repo):
+        """No records should be left after deleting all of them."""
+        ctd_repo.delete_all()
+        with pytest.raises(StopIteration):
+            next(ctd_repo.query(ctd_repo.query_all, TEST_CHUNKSIZE))
+        ctd_repo.save(td.CTD_VALID_DF[0])
+        assert not next(ctd_repo.query(ctd_repo.query_all, TEST_CHUNKSIZE)).empty
+
+    def test_dao_download(self, pubmed_repo):
+        """Daos should download into parquet repositories."""
+        dao = PubMedDao(pubmed_repo, MockPubMedScraper())
+        # PubMed downloads upsert, later records replace the earlier ones
+        assert dao.DOWNLOAD_MODE == "upsert"
+        dao.download(TEST_CHUNKSIZE)
+        result_df = next(dao.query(dao.query_all, 100))
+        assert len(result_df) == 17
+        assert result_df.pmid.is_monotonic_increasing
+        dao.download(TEST_CHUNKSIZE)
+        assert next(dao.query(dao.query_all, 100)).equals(result_df)
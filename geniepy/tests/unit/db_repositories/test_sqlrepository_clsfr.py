@@ -1,5 +1,6 @@
 """Module to test data access object repositories."""
 import pytest
+import pandas as pd
 import tests.testdata as td
 from geniepy.datamgmt.repositories import BaseRepository, SqlRepository
 from geniepy.datamgmt.tables import CLSFR_PROPTY
@@ -21,7 +22,7 @@ class TestSqlClsfrRepository:
 
     def test_query_all(self):
         """Test gen query all str."""
-        expected = "SELECT * FROM classifier;"
+        expected = "SELECT * FROM classifier ORDER BY digest;"
         actual = self.repo.query_all
         assert actual == expected
 
@@ -107,3 +108,28 @@ class TestSqlClsfrRepository:
         generator = self.repo.query(self.repo.query_all, TEST_CHUNKSIZE)
         # Generator should return value
         next(generator)
+
+    @pytest.mark.parametrize("unique", [False, True])
+    def test_upsert(self, unique):
+        """Upserted records should replace the records with the same digest."""
+        repo = SqlRepository("sqlite://", CLSFR_PROPTY._replace(unique=unique))
+        payload = pd.concat(VALID_DF, ignore_index=True)
+        payload = payload.drop_duplicates("digest").reset_index(drop=True)
+        repo.save(payload)
+        if not unique:
+            # Duplicates stored by appends are replaced as well
+            repo.save(payload.iloc[:1])
+        update = payload.iloc[:2].assign(pub_score=[0.25, 0.5])
+        update = update.append(update.iloc[[0]].assign(pub_score=0.75))
+        repo.save(update, mode="upsert")
+        repo.save(update, mode="upsert")
+        result_df = next(repo.query(repo.query_all, 100))
+        assert len(result_df) == len(payload)
+        scores = dict(zip(result_df.digest, result_df.pub_score))
+        assert scores[payload.digest[0]] == 0.75
+        assert scores[payload.digest[1]] == 0.5
+
+    def test_save_mode(self):
+        """Unknown save modes should raise dao error."""
+        with pytest.raises(DaoError):
+            self.repo.save(VALID_DF[0], mode="replace")
@@ -21,7 +21,7 @@ class TestSqlCtdRepository:
 
     def test_query_all(self):
         """Test gen query all str."""
-        expected = "SELECT * FROM ctd;"
+        expected = "SELECT * FROM ctd ORDER BY digest;"
         actual = self.repo.query_all
         assert actual == expected
 
@@ -112,3 +112,127 @@ class TestSqlCtdRepository:
         generator = self.repo.query(self.repo.query_all, TEST_CHUNKSIZE)
         # Generator should return value
         next(generator)
+
+    def test_delete_pkeys(self):
+        """Test delete records by primary key values."""
+        self.repo.delete_all()
+        for record in VALID_DF:
+            self.repo.save(record)
+        deleted = [VALID_DF[0].digest[0], "INVALID DIGEST"]
+        self.repo.delete_pkeys(deleted)
+        self.repo.delete_pkeys([])
+        result_df = next(self.repo.query(self.repo.query_all, 100))
+        assert VALID_DF[0].digest[0] not in result_df.digest.values
+        remaining = {df.digest[0] for df in VALID_DF} - {VALID_DF[0].digest[0]}
+        assert set(result_df.digest) == remaining
+
+    @pytest.mark.parametrize("chunksize", [1, 2, 100])
+    def test_query_ordered(self, chunksize):
+        """Whole table should be streamed in chunks ordered by primary key."""
+        self.repo.delete_all()
+        for record in reversed(VALID_DF):
+            self.repo.save(record)
+        chunks = list(self.repo.query(self.repo.query_all, chunksize))
+        assert all(len(chunk) <= chunksize for chunk in chunks)
+        digests = [digest for chunk in chunks for digest in chunk.digest]
+        assert digests == sorted(df.digest[0] for df in VALID_DF)
+
+    def test_query_untouched(self):
+        """Queries with their own ordering and limit should run as given."""
+        self.repo.delete_all()
+        for record in VALID_DF:
+            self.repo.save(record)
+        query = "SELECT * FROM ctd ORDER BY digest DESC LIMIT 2;"
+        chunk = next(self.repo.query(query, 100))
+        expected = sorted((df.digest[0] for df in VALID_DF), reverse=True)[:2]
+        assert chunk.digest.tolist() == expected
+
+
+def index_names(repo: SqlRepository) -> [str]:
+    """List names of the indexes of the repository table."""
+    # pylint: disable=protected-access
+    rows = repo._engine.execute(
+        "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='ctd';"
+    )
+    return sorted(row[0] for row in rows)
+
+
+class TestSqlCtdIndexes:
+    """PyTest repository indexes test class."""
+
+    def test_pkey_index(self):
+        """Primary key lookups should use the primary key index."""
+        repo = SqlRepository("sqlite://", CTD_PROPTY._replace(indexes=["geneid"]))
+        assert index_names(repo) == ["ix_ctd_digest", "ix_ctd_geneid"]
+        plan = repo._engine.execute(  # pylint: disable=protected-access
+            "EXPLAIN QUERY PLAN " + repo.query_pkey("0x1")
+        ).fetchall()
+        assert "ix_ctd_digest" in str(plan)
+        repo.delete_all()
+        assert index_names(repo) == ["ix_ctd_digest", "ix_ctd_geneid"]
+
+    def test_unique_pkey(self):
+        """Unique primary key index should reject duplicate records."""
+        repo = SqlRepository("sqlite://", CTD_PROPTY._replace(unique=True))
+        repo.save(VALID_DF[0])
+        with pytest.raises(DaoError):
+            repo.save(VALID_DF[0])
+
+    def test_deferred_indexes(self):
+        """Bulk loads of empty tables should create indexes once loaded."""
+        repo = SqlRepository("sqlite://", CTD_PROPTY)
+        with repo.bulk_load():
+            assert index_names(repo) == []
+            for record in VALID_DF:
+                repo.save(record)
+        assert index_names(repo) == ["ix_ctd_digest"]
+        # Tables with records keep their indexes during bulk loads
+        with repo.bulk_load():
+            assert index_names(repo) == ["ix_ctd_digest"]
+            repo.delete_all()
+            assert index_names(repo) == []
+        assert index_names(repo) == ["ix_ctd_digest"]
+
+    def test_bulk_load_duplicates(self):
+        """Records appended twice without unique index should be reported."""
+        repo = SqlRepository("sqlite://", CTD_PROPTY._replace(unique=True))
+        with pytest.raises(DaoError):
+            with repo.bulk_load():
+                assert index_names(repo) == []
+                repo.save(VALID_DF[0])
+                repo.save(VALID_DF[1])
+                repo.save(VALID_DF[0])
+        # Duplicates are deleted so the unique index can be created
+        assert repo._bulk_connection is None  # pylint: disable=protected-access
+        assert index_names(repo) == ["ix_ctd_digest"]
+        chunk = next(repo.query(repo.query_all, 100))
+        assert sorted(chunk.digest) == sorted(
+            [VALID_DF[0].digest[0], VALID_DF[1].digest[0]]
+        )
+        # Bulk load errors are raised over cleanup errors
+        repo.delete_all()
+        with pytest.raises(KeyError):
+            with repo.bulk_load():
+                repo.save(VALID_DF[0])
+                repo.save(VALID_DF[0])
+                raise KeyError
+        assert index_names(repo) == ["ix_ctd_digest"]
+
+    @pytest.mark.parametrize("unique", [False, True])
+    def test_upsert_bulk_load(self, unique):
+        """Upserts within bulk loads of empty tables should use the pkey index."""
+        repo = SqlRepository("sqlite://", CTD_PROPTY._replace(unique=unique))
+        with repo.bulk_load():
+            repo.save(VALID_DF[0])
+            assert index_names(repo) == []
+            repo.save(VALID_DF[0], "upsert")
+            assert index_names(repo) == ["ix_ctd_digest"]
+            repo.save(VALID_DF[0], "upsert")
+            repo.delete_all()
+            repo.delete_pkeys([VALID_DF[0].digest[0]])
+            assert index_names(repo) == ["ix_ctd_digest"]
+            for record in VALID_DF:
+                repo.save(record, "upsert")
+                repo.save(record, "upsert")
+        chunk = next(repo.query(repo.query_all, 100))
+        assert sorted(chunk.digest) == sorted(df.digest[0] for df in VALID_DF)
@@ -1,9 +1,17 @@
 """Module to test data access object repositories."""
+import json
+import os
 import pytest
+import pandas as pd
 import tests.testdata as td
-from geniepy.datamgmt.repositories import BaseRepository, SqlRepository
+from geniepy.datamgmt.repositories import (  # pylint: disable=bad-continuation
+    BaseRepository,
+    SqlRepository,
+    GbqRepository,
+)
 from geniepy.datamgmt.tables import PUBMED_PROPTY
 from geniepy.errors import DaoError
+from tests import get_test_output_path
 from tests.resources.mock import TEST_CHUNKSIZE
 
 VALID_DF = td.PUBMED_VALID_DF
@@ -21,7 +29,7 @@ class TestSqlPubMedRepository:
 
     def test_query_all(self):
         """Test gen query all str."""
-        expected = "SELECT * FROM pubmed;"
+        expected = "SELECT * FROM pubmed ORDER BY pmid;"
         actual = self.repo.query_all
         assert actual == expected
 
@@ -107,3 +115,117 @@ class TestSqlPubMedRepository:
         generator = self.repo.query(self.repo.query_all, TEST_CHUNKSIZE)
         # Generator should return value
         next(generator)
+
+    def test_list_columns(self):
+        """List columns should be stored as JSON arrays and read back as lists."""
+        self.repo.delete_all()
+        self.repo.save(VALID_DF[0])
+        raw_df = next(
+            pd.read_sql_query(self.repo.query_all, self.repo._engine, chunksize=1)
+        )
+        assert json.loads(raw_df.authors[0]) == VALID_DF[0].authors[0]
+        chunk = next(self.repo.query(self.repo.query_all, 1))
+        assert chunk.authors[0] == VALID_DF[0].authors[0]
+        assert chunk.mesh_list[0] == []
+
+    def test_save_many(self):
+        """Saving more records than sqlite bound parameters limit should succeed."""
+        self.repo.delete_all()
+        payload = pd.concat([VALID_DF[0]] * 1000, ignore_index=True)
+        payload["pmid"] = range(1, 1001)
+        self.repo.save(payload)
+        chunk = next(self.repo.query(self.repo.query_all, 2000))
+        assert list(chunk.pmid) == list(range(1, 1001))
+        assert chunk.authors[999] == VALID_DF[0].authors[0]
+
+    def test_bulk_load(self):
+        """Bulk loads should tune sqlite connection and restore its settings."""
+        db_path = os.path.join(get_test_output_path(), "bulk_load.db")
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        repo = SqlRepository(f"sqlite:///{db_path}", PUBMED_PROPTY)
+
+        def pragma(name):
+            """Read setting of bulk load connection."""
+            return repo._bulk_connection.execute(f"PRAGMA {name}").scalar()
+
+        with repo.bulk_load():
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1
+            for record in VALID_DF:
+                repo.save(record)
+            # Saved records are committed and visible within the bulk load
+            chunk = next(repo.query(repo.query_all, 100))
+            assert len(chunk) == len(VALID_DF)
+            with repo.bulk_load():
+                repo.delete_pkeys([VALID_DF[0].pmid[0]])
+        assert repo._bulk_connection is None
+        with repo._engine.connect() as connection:
+            assert connection.execute("PRAGMA journal_mode").scalar() == "delete"
+        chunk = next(repo.query(repo.query_all, 100))
+        assert len(chunk) == len(VALID_DF) - 1
+        os.remove(db_path)
+
+    def test_bulk_load_failed_cleanup(self, monkeypatch):
+        """Settings should be restored and bulk load error raised if indexing fails."""
+        db_path = os.path.join(get_test_output_path(), "bulk_load_failed.db")
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        repo = SqlRepository(f"sqlite:///{db_path}", PUBMED_PROPTY)
+
+        def create_indexes(_repo):
+            """Fail to create indexes."""
+            raise KeyError("create_indexes")
+
+        monkeypatch.setattr(SqlRepository, "create_indexes", create_indexes)
+        with pytest.raises(ValueError):
+            with repo.bulk_load():
+                raise ValueError
+        with pytest.raises(DaoError):
+            with repo.bulk_load():
+                pass
+        assert repo._bulk_connection is None
+        with repo._engine.connect() as connection:
+            assert connection.execute("PRAGMA journal_mode").scalar() == "delete"
+        os.remove(db_path)
+
+    def test_gbq_schema(self):
+        """List columns should be repeated string fields in GBQ."""
+        schema = GbqRepository.get_dict_schema(PUBMED_PROPTY.table)
+        fields = {field["name"]: field for field in schema}
+        assert fields["authors"] == {
+            "name": "authors",
+            "type": "STRING",
+            "mode": "REPEATED",
+        }
+        assert fields["num_authors"]["type"] == "INTEGER"
+
+    def test_gbq_bulk_upserts(self, monkeypatch):
+        """GBQ upserts within bulk loads should be merged in batches."""
+
+        class StubRegistry:
+            """Registry without credentials, GBQ jobs are not run."""
+
+            def credentials(self, credentials_path):
+                """Return no credentials."""
+                return None
+
+        merged = []
+        monkeypatch.setattr(GbqRepository, "MERGE_BATCH", 2)
+        monkeypatch.setattr(
+            GbqRepository, "_merge", lambda repo, payload: merged.append(len(payload))
+        )
+        repo = GbqRepository("project", PUBMED_PROPTY, "dataset", "", StubRegistry())
+        with repo.bulk_load():
+            for record in VALID_DF[:3]:
+                repo.save(record, "upsert")
+            assert merged == [2]
+        assert merged == [2, 1]
+        with pytest.raises(KeyError):
+            with repo.bulk_load():
+                repo.save(VALID_DF[0], "upsert")
+                raise KeyError
+        # Upserts of failed bulk loads are left to the retried download
+        assert merged == [2, 1]
+        repo.save(VALID_DF[0], "upsert")
+        assert merged == [2, 1, 1]
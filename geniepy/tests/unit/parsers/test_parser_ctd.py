@@ -1,8 +1,19 @@
 """Module to test online sources parsers."""
+import os
+import gzip
 import pytest
-from geniepy.datamgmt.parsers import BaseParser, CtdParser
+import numpy as np
+import pandas as pd
+from geniepy.datamgmt.parsers import (  # pylint: disable=bad-continuation
+    BaseParser,
+    CtdParser,
+    CompactCtdParser,
+    compact_digest,
+    hash_messages,
+)
 from geniepy.errors import ParserError
 from tests.resources.mock import MockCtdScraper, TEST_CHUNKSIZE
+from tests import get_resources_path, get_test_output_path
 import tests.testdata as td
 
 
@@ -57,3 +68,66 @@ class TestCtdParser:
         gen_data = self.parser.fetch(TEST_CHUNKSIZE)
         data = next(gen_data)
         assert data is not None
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_hash_records(self, max_workers, monkeypatch):
+        """Batched digests should match the digests of individual records."""
+        monkeypatch.setattr(CtdParser, "PARALLEL_HASH_ROWS", 2)
+        parsed_df = self.parser.parse(next(MockCtdScraper().scrape(TEST_CHUNKSIZE)))
+        expected = parsed_df.apply(CtdParser.hash_record, axis=1).tolist()
+        actual = CtdParser.hash_records(
+            parsed_df.geneid, parsed_df.diseaseid, max_workers=max_workers
+        )
+        assert actual == expected
+        assert parsed_df.digest.tolist() == expected
+
+    @pytest.mark.parametrize("compressed", [False, True])
+    def test_fetch_file(self, compressed):
+        """Typed file chunks should parse to the same records as csv strings."""
+        csv_path = os.path.join(get_resources_path(), "sample_ctd_db.csv")
+        with open(csv_path) as csv_file:
+            expected = self.parser.parse(csv_file.read())
+        if compressed:
+            # Mimic CTD downloads with commented out header
+            gz_path = os.path.join(get_test_output_path(), "sample_ctd_db.csv.gz")
+            with open(csv_path) as f_in, gzip.open(gz_path, "wt") as f_out:
+                f_out.write("# Comparative Toxicogenomics Database\n# Fields:\n# ")
+                f_out.write(f_in.read().replace("\n", "\n#\n", 1))
+            csv_path = gz_path
+        assert CtdParser.count_header_lines(csv_path) == (4 if compressed else 1)
+        chunks = list(self.parser.fetch_file(csv_path, 7))
+        assert [len(chunk) for chunk in chunks] == [7, 7, 7]
+        actual = pd.concat(chunks, ignore_index=True)
+        assert actual.genesymbol.dtype.name == "category"
+        assert actual.pmids.tolist() == expected.pmids.tolist()
+        assert actual.astype(str).equals(expected.astype(str))
+
+    def test_fetch_invalid_file(self):
+        """Attempt to read invalid csv file."""
+        csv_path = os.path.join(get_resources_path(), "sample_articleset1.xml")
+        with pytest.raises(ParserError):
+            next(self.parser.fetch_file(csv_path, TEST_CHUNKSIZE))
+
+
+class TestCompactCtdParser:
+    """Pytest compact digest CTD Parser class."""
+
+    parser: BaseParser = CompactCtdParser()
+
+    def test_compact_digest(self):
+        """Compact digests should be the positive int of the first 8 bytes."""
+        assert compact_digest("f" * 64) == 2 ** 63 - 1
+        assert compact_digest("0123456789abcdef" + "f" * 48) == 0x0123456789ABCDEF
+        messages = ["100174880D000014", "1D1"]
+        expected = [compact_digest(digest) for digest in hash_messages(messages)]
+        assert hash_messages(messages, compact=True) == expected
+
+    def test_parse(self):
+        """Compact digests should map from the hex digests."""
+        chunk = next(MockCtdScraper().scrape(TEST_CHUNKSIZE))
+        expected = CtdParser.parse(chunk)
+        actual = self.parser.parse(chunk)
+        assert actual.digest.dtype == np.int64
+        assert actual.digest.tolist() == [compact_digest(d) for d in expected.digest]
+        assert not self.parser.validate(actual)
+        assert self.parser.validate(expected)
@@ -2,6 +2,7 @@
 import pytest
 from geniepy.datamgmt.parsers import BaseParser, PubMedParser
 from geniepy.errors import ParserError
+from geniepy.pubmed import PubMedArticle
 import tests.testdata as td
 from tests.resources.mock import MockPubMedScraper
 
@@ -45,3 +46,22 @@ class TestPubMedParser:
         """Attempt to parse invalid data."""
         with pytest.raises(ParserError):
             self.parser.parse("invalid xml")
+
+    def test_parse_records(self):
+        """Records extracted by xml engines should be parsed directly."""
+        chunksize = 3
+        xml_articles = next(self.parser.scraper.scrape(chunksize=chunksize))
+        expected = self.parser.parse(xml_articles)
+        records = [PubMedArticle(xml).to_record for xml in xml_articles]
+        actual = self.parser.parse(records)
+        assert actual.equals(expected)
+
+    def test_parse_list_columns(self):
+        """List fields should be kept as lists, with their precomputed lengths."""
+        xml_articles = next(self.parser.scraper.scrape(chunksize=3))
+        parsed_df = self.parser.parse(xml_articles)
+        for col, source in PubMedParser.COUNT_COLUMNS.items():
+            expected = [len(value or "") for value in parsed_df[source]]
+            assert parsed_df[col].tolist() == expected
+        for col in ["authors", "chemicals", "mesh_list"]:
+            assert all(isinstance(value, list) for value in parsed_df[col])
@@ -1,10 +1,20 @@
 """Test pub med article model class."""
 import os
+import gzip
+import shutil
 import collections
 import xml.etree.ElementTree as ET
 import pytest
+import jsonlines
 from tests import get_resources_path, get_test_output_path
-from geniepy.pubmed import PubMedArticle, ArticleSetParser
+from geniepy.pubmed import (  # pylint: disable=bad-continuation
+    PubMedArticle,
+    ArticleSetParser,
+    ArticleExtractor,
+    DEFAULT_XML_ENGINE,
+    XML_ENGINES,
+    get_xml_engine,
+)
 
 
 def create_article(article_name: str) -> PubMedArticle:
@@ -205,6 +215,34 @@ class TestPubMedArticle:
         """Test object dictionary."""
         assert data.article.to_dict is not None
 
+    @pytest.mark.parametrize("data", TEST_DATA)
+    def test_record_matches_properties(self, data):
+        """Single pass extraction should match individual property lookups."""
+        article = data.article
+        record = article.to_record
+        for field in record._fields:
+            assert getattr(record, field) == getattr(article, field)
+
+
+class TestArticleExtractor:
+    """Test single pass field extraction engine."""
+
+    @pytest.mark.parametrize("data", TEST_DATA)
+    def test_extract_fields(self, data):
+        """Only requested fields should be extracted."""
+        extractor = ArticleExtractor(["pmid", "authors"])
+        # pylint: disable=protected-access
+        record = extractor.extract(data.article._pubmed_article)
+        assert record.pmid == data.expected.pmid
+        assert record.authors == data.expected.authors
+        assert record.title is None
+        assert record.mesh_list is None
+
+    def test_unknown_field(self):
+        """Unknown fields can't be extracted."""
+        with pytest.raises(ValueError):
+            ArticleExtractor(["invalid"])
+
 
 class TestArticlesSetParser:
     """Test ArticleSetParser. i.e. xml files with array of PubMedArticles."""
@@ -223,6 +261,20 @@ class TestArticlesSetParser:
         assert len(articles) == 2
         assert isinstance(articles[0], PubMedArticle)
 
+    @pytest.mark.parametrize("compressed", [False, True])
+    def test_iter_articles(self, compressed):
+        """Incrementally extract articles from plain and compressed article sets."""
+        xml_path = os.path.join(get_resources_path(), "sample_articleset2.xml")
+        expected = ArticleSetParser.extract_articles(xml_path)
+        if compressed:
+            gz_path = os.path.join(get_test_output_path(), "sample_articleset2.xml.gz")
+            with open(xml_path, "rb") as f_in, gzip.open(gz_path, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            xml_path = gz_path
+        articles = ArticleSetParser.iter_articles(xml_path)
+        actual = [article.to_dict for article in articles]
+        assert actual == ArticleSetParser.articles_to_dict(expected)
+
     def test_articles_to_json(self):
         """Serialize pubmedarticle object into json file."""
         articles: [PubMedArticle] = ArticleSetParser.extract_articles(
@@ -241,6 +293,22 @@ class TestArticlesSetParser:
         target_path = os.path.join(get_test_output_path(), target_file_name)
         ArticleSetParser.articles_to_jsonl(articles, target_path)
 
+    @pytest.mark.parametrize("target_file_name", ["stream.jsonl", "stream.jsonl.gz"])
+    def test_stream_to_jsonl(self, target_file_name):
+        """Stream articles into plain and compressed jsonl files."""
+        target_path = os.path.join(get_test_output_path(), target_file_name)
+        articles = ArticleSetParser.iter_articles(self.SAMPLE_ARTICLE_SET1_PATH)
+        count = ArticleSetParser.stream_to_jsonl(articles, target_path)
+        assert count == 2
+        assert not os.path.exists(target_path + ".part")
+        opener = gzip.open if target_path.endswith(".gz") else open
+        with opener(target_path, "rt", encoding="utf-8") as target_file:
+            actual = list(jsonlines.Reader(target_file))
+        expected = ArticleSetParser.articles_to_dict(
+            ArticleSetParser.extract_articles(self.SAMPLE_ARTICLE_SET1_PATH)
+        )
+        assert actual == expected
+
     def test_serialize_to_pipe_delimited(self):
         """Serialize pubmedarticles to csv file."""
         articles: [PubMedArticle] = ArticleSetParser.extract_articles(
@@ -249,3 +317,117 @@ class TestArticlesSetParser:
         target_file_name = "test_articles.csv"
         target_path = os.path.join(get_test_output_path(), target_file_name)
         ArticleSetParser.articles_to_pipe(articles, target_path)
+
+    def test_articles_to_parquet(self):
+        """Serialize pubmedarticles to columnar parquet file."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        xml_path = os.path.join(get_resources_path(), "sample_articleset2.xml")
+        target_path = os.path.join(get_test_output_path(), "test_articles.parquet")
+        articles = ArticleSetParser.iter_articles(xml_path)
+        count = ArticleSetParser.articles_to_parquet(
+            articles, target_path, row_group_size=5
+        )
+        assert count == 17
+        parquet_file = pq.ParquetFile(target_path)
+        assert parquet_file.num_row_groups == 4
+        # Only requested columns are read back
+        table = pq.read_table(target_path, columns=["pmid", "authors"])
+        assert table.column_names == ["pmid", "authors"]
+        expected = ArticleSetParser.articles_to_dict(
+            ArticleSetParser.extract_articles(xml_path)
+        )
+        actual = table.to_pydict()
+        assert actual["pmid"] == [int(article["pmid"]) for article in expected]
+        assert actual["authors"] == [article["authors"] for article in expected]
+
+    def test_articles_to_parquet_missing_pmid(self):
+        """Articles without PMID should be stored with a null pmid."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        xml_path = os.path.join(get_resources_path(), "sample_articleset2.xml")
+        target_path = os.path.join(get_test_output_path(), "test_no_pmid.parquet")
+        articles = list(ArticleSetParser.iter_articles(xml_path))[:2]
+        # pylint: disable=protected-access
+        citation = articles[0]._pubmed_article.find(PubMedArticle.MEDLINE_TAG)
+        citation.remove(citation.find("PMID"))
+        assert articles[0].pmid == ""
+        assert ArticleSetParser.articles_to_parquet(articles, target_path) == 2
+        table = pq.read_table(target_path, columns=["pmid", "title"])
+        assert table.column("pmid").to_pylist() == [None, int(articles[1].pmid)]
+        assert table.column("title").to_pylist() == [art.title for art in articles]
+
+    @pytest.mark.parametrize("num_ranges", [1, 3, 50])
+    def test_split_article_set(self, num_ranges):
+        """Byte ranges should cover all articles exactly once."""
+        xml_path = os.path.join(get_resources_path(), "sample_articleset2.xml")
+        byte_ranges = ArticleSetParser.split_article_set(xml_path, num_ranges)
+        assert 0 < len(byte_ranges) <= num_ranges
+        articles = []
+        for byte_range in byte_ranges:
+            articles += ArticleSetParser.parse_range(xml_path, byte_range)
+        assert len(articles) == 17
+
+    @pytest.mark.parametrize("engine_name", list(XML_ENGINES))
+    def test_parallel_extract(self, engine_name):
+        """Articles parsed in parallel should be merged in PMID order."""
+        xml_path = os.path.join(get_resources_path(), "sample_articleset2.xml")
+        expected = sorted(
+            ArticleSetParser.articles_to_dict(
+                ArticleSetParser.extract_articles(xml_path)
+            ),
+            key=ArticleSetParser.pmid_key,
+        )
+        actual = ArticleSetParser.parallel_extract(xml_path, 2, engine_name)
+        assert actual == expected
+
+    def test_pmid_key_missing(self):
+        """Articles without PMID should sort before the others."""
+        articles = [{"pmid": "12"}, {"pmid": ""}, {"pmid": "3"}, {"pmid": None}]
+        keys = [ArticleSetParser.pmid_key(article) for article in articles]
+        assert keys == [12, -1, 3, -1]
+        ordered = sorted(articles, key=ArticleSetParser.pmid_key)
+        assert [article["pmid"] for article in ordered] == ["", None, "3", "12"]
+
+    def test_default_engine(self):
+        """Lxml engine should be the default engine when installed."""
+        pytest.importorskip("lxml")
+        assert DEFAULT_XML_ENGINE == "lxml"
+        assert get_xml_engine().name == "lxml"
+
+
+class TestXmlEngines:
+    """Test pluggable xml engines extract the same records."""
+
+    ARTICLE_SETS = [
+        "sample_articleset1.xml",
+        "sample_articleset2.xml",
+        "sample_articleset3.xml",
+    ]
+
+    @pytest.mark.parametrize("engine_name", list(XML_ENGINES))
+    @pytest.mark.parametrize("article_set", ARTICLE_SETS)
+    def test_engine_records(self, engine_name, article_set):
+        """Every engine should match the records of the parsed articles."""
+        if engine_name == "lxml":
+            pytest.importorskip("lxml")
+        xml_path = os.path.join(get_resources_path(), article_set)
+        expected = [
+            article.to_record for article in ArticleSetParser.iter_articles(xml_path)
+        ]
+        actual = list(ArticleSetParser.iter_records(xml_path, engine=engine_name))
+        assert actual == expected
+
+    @pytest.mark.parametrize("engine_name", list(XML_ENGINES))
+    def test_engine_fields(self, engine_name):
+        """Engines should only extract requested fields."""
+        if engine_name == "lxml":
+            pytest.importorskip("lxml")
+        xml_path = os.path.join(get_resources_path(), "sample_articleset1.xml")
+        engine = get_xml_engine(engine_name, fields=["pmid", "mesh_list"])
+        records = list(engine.iter_records(xml_path))
+        assert [record.pmid for record in records] == ["2", "30969"]
+        assert all(record.title is None for record in records)
+
+    def test_unknown_engine(self):
+        """Unknown engine names should be rejected."""
+        with pytest.raises(ValueError):
+            get_xml_engine("invalid")
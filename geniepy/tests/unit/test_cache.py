@@ -0,0 +1,127 @@
+"""Module to test the raw artifacts cache."""
+import io
+import os
+import shutil
+import time
+import pytest
+from geniepy.datamgmt.cache import RawCache
+from tests import get_test_output_path
+
+CACHE_PATH = os.path.join(get_test_output_path(), "raw_cache")
+
+
+@pytest.fixture
+def cache():
+    """Generate fresh cache bounded to 100 bytes."""
+    shutil.rmtree(CACHE_PATH, ignore_errors=True)
+    yield RawCache(CACHE_PATH, max_bytes=100)
+    shutil.rmtree(CACHE_PATH, ignore_errors=True)
+
+
+def objects_count(cache: RawCache) -> int:
+    """Count cached objects."""
+    return sum(
+        len(files) for _, _, files in os.walk(os.path.join(cache.root, "objects"))
+    )
+
+
+class TestRawCache:
+    """Pytest raw cache class."""
+
+    def test_missing(self, cache):
+        """Unknown keys should be reported missing."""
+        assert cache.lookup("missing") is None
+        assert cache.get("missing") is None
+        assert cache.get_bytes("missing") is None
+        assert cache.size() == 0
+
+    def test_put_get(self, cache):
+        """Cached content should be found by key, stored under its digest."""
+        path = cache.put_stream("url|etag", io.BytesIO(b"release"), {"etag": "1"})
+        assert os.path.basename(path) == RawCache.checksum(path)
+        assert cache.get("url|etag") == path
+        assert cache.get_bytes("url|etag") == b"release"
+        assert cache.lookup("url|etag")["meta"] == {"etag": "1"}
+        assert not os.listdir(os.path.join(cache.root, "tmp"))
+
+    def test_content_addressed(self, cache):
+        """Same content under different keys should be stored once."""
+        first = cache.put_bytes("first", b"content")
+        second = cache.put_bytes("second", b"content")
+        assert first == second
+        assert objects_count(cache) == 1
+        assert cache.size() == len(b"content")
+
+    def test_corrupt(self, cache):
+        """Objects not matching their digest should be dropped."""
+        path = cache.put_bytes("key", b"content")
+        with open(path, "wb") as cached_file:
+            cached_file.write(b"corrupt")
+        assert cache.get("key", verify=False) == path
+        assert cache.get("key") is None
+        assert not os.path.exists(path)
+
+    def test_failed_write(self, cache):
+        """Failed writes should not leave partial artifacts behind."""
+
+        def blocks():
+            yield b"partial"
+            raise IOError("Connection lost")
+
+        with pytest.raises(IOError):
+            cache.put_blocks("key", blocks())
+        assert cache.get("key") is None
+        assert objects_count(cache) == 0
+        assert not os.listdir(os.path.join(cache.root, "tmp"))
+
+    def test_lru_eviction(self, cache):
+        """Least recently used objects should be evicted beyond max size."""
+        for idx in range(3):
+            cache.put_bytes(f"key{idx}", bytes([idx]) * 40)
+            time.sleep(0.01)
+        # Third object doesn't fit, first one is evicted
+        assert cache.get("key0") is None
+        assert cache.size() == 80
+        # Using second object makes third one the least recently used
+        time.sleep(0.01)
+        assert cache.get("key1") is not None
+        cache.put_bytes("key3", b"x" * 40)
+        assert cache.get("key2") is None
+        assert cache.get("key1") is not None
+        assert cache.get("key3") is not None
+
+    def test_oversized(self, cache):
+        """Objects larger than max size should be kept until the next write."""
+        cache.put_bytes("small", b"x" * 10)
+        path = cache.put_bytes("large", b"y" * 200)
+        assert cache.get("large") == path
+        assert cache.get("small") is None
+
+    def test_evicted_refs(self, cache):
+        """References of evicted objects should be deleted along with them."""
+        cache.put_bytes("first", b"x" * 60)
+        cache.put_bytes("second", b"x" * 60)
+        cache.put_bytes("third", b"y" * 60)
+        refs = [
+            name
+            for _, _, names in os.walk(os.path.join(cache.root, "refs"))
+            for name in names
+        ]
+        assert refs == [RawCache.key_digest("third") + ".json"]
+
+    def test_running_size(self, cache, monkeypatch):
+        """Writes should only walk the cache once it grows beyond its max size."""
+        walks = []
+        objects = RawCache._objects  # pylint: disable=protected-access
+
+        def tracked_objects(raw_cache):
+            walks.append(raw_cache)
+            return objects(raw_cache)
+
+        monkeypatch.setattr(RawCache, "_objects", tracked_objects)
+        for idx in range(5):
+            cache.put_bytes(f"key{idx}", bytes([idx]) * 10)
+        assert len(walks) == 1
+        cache.put_bytes("large", b"x" * 60)
+        assert len(walks) == 2
+        assert cache.size() == 100
@@ -2,6 +2,8 @@
 from pathlib import Path
 import pytest
 import geniepy.config as config
+import geniepy.datamgmt.daos as daos
+import geniepy.datamgmt.repositories as dr
 from geniepy.errors import ConfigError
 from tests import get_resources_path
 
@@ -25,6 +27,87 @@ def test_get_dao_mgr_invalid_path():
         config.get_daomgr()
 
 
+def test_get_dao_mgr_parquet(monkeypatch):
+    """Test get daomgr on parquet backend."""
+    pytest.importorskip("pyarrow.parquet")
+    configdict = config.read_yaml()
+    configdict["backend"] = "parquet"
+    monkeypatch.setattr(config, "read_yaml", lambda: configdict)
+    daomgr = config.get_daomgr()
+    # pylint: disable=protected-access
+    repository = daomgr._ctd_dao._repository
+    assert isinstance(repository, dr.ParquetRepository)
+    assert isinstance(daomgr._ctd_dao, daos.CompactCtdDao)
+    assert isinstance(daomgr._pubmed_dao._repository, dr.ParquetRepository)
+
+
+def test_get_dao_mgr_unknown_backend(monkeypatch):
+    """Test get daomgr raises config error on unknown backend."""
+    configdict = config.read_yaml()
+    configdict["backend"] = "unknown"
+    monkeypatch.setattr(config, "read_yaml", lambda: configdict)
+    with pytest.raises(ConfigError):
+        config.get_daomgr()
+
+
 def test_get_clsfr():
     """Test getting classifiers."""
     assert config.get_classmgr() is not None
+
+
+def test_pipeline():
+    """Test retrieving download pipeline configuration."""
+    pipeline = config.get_pipeline()
+    assert pipeline.parse_workers == 3
+    assert pipeline.queue_size == 2
+    assert not pipeline.ordered
+
+
+def test_pubmed_scraper():
+    """Test retrieving PubMed mirror scraper configuration."""
+    scraper = config.get_pubmed_scraper()
+    assert scraper.mirror_path == "pubmed_mirror"
+    assert scraper.manifest_path == "pubmed_manifest.json"
+    assert scraper.engine == "etree"
+
+
+def test_ctd_scraper():
+    """Test retrieving CTD release scraper configuration."""
+    scraper = config.get_ctd_scraper()
+    assert scraper.source == "CTD_genes_diseases.csv.gz"
+    assert scraper.state_path == "ctd_release.json"
+
+
+def test_ctd_delta():
+    """Test retrieving CTD delta downloads configuration."""
+    assert config.get_ctd_delta()
+
+
+def test_efetch_scraper():
+    """Test retrieving efetch scraper configuration."""
+    scraper = config.get_efetch_scraper()
+    assert scraper.api_keys == ["key1", "key2"]
+    assert scraper.url == "http://127.0.0.1:8080/efetch.fcgi"
+    assert scraper.rate == 5
+    assert scraper.concurrency == 10
+
+
+def test_efetch_enabled():
+    """Test retrieving whether missing articles are fetched after predictions."""
+    assert not config.get_efetch_enabled()
+
+
+def test_raw_cache():
+    """Test retrieving raw downloads cache configuration."""
+    cache = config.get_raw_cache()
+    assert cache.root == "tests_output/raw_cache"
+    assert cache.max_bytes == 1500000
+    assert config.get_ctd_scraper().cache is not None
+    assert config.get_efetch_scraper().cache is not None
+
+
+def test_connection_registry():
+    """Test retrieving shared connections registry configuration."""
+    registry = config.get_connection_registry()
+    assert registry.pool_size == 2
+    assert registry.max_overflow == 3
@@ -0,0 +1,78 @@
+"""Module to test the registry of shared connections."""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import pytest
+import geniepy.datamgmt.repositories as dr
+from geniepy.datamgmt.connections import ConnectionRegistry, is_memory_db
+from geniepy.datamgmt.tables import PUBMED_PROPTY, CLSFR_PROPTY
+from geniepy.errors import ConnectionError
+import tests.testdata as td
+from tests import get_test_output_path
+
+DB_PATH = os.path.join(get_test_output_path(), "shared.db")
+
+
+@pytest.fixture
+def registry():
+    """Generate fresh registry and database file."""
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    registry = ConnectionRegistry(pool_size=2, max_overflow=1)
+    yield registry
+    registry.dispose()
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+
+
+@pytest.mark.parametrize(
+    "db_loc,memory",
+    [
+        ("sqlite://", True),
+        ("sqlite:///:memory:", True),
+        ("sqlite:///file:genie?mode=memory&uri=true", True),
+        (f"sqlite:///{DB_PATH}", False),
+        ("postgresql://user@localhost/genie", False),
+    ],
+)
+def test_is_memory_db(db_loc, memory):
+    """In memory sqlite databases should be recognized."""
+    assert is_memory_db(db_loc) == memory
+
+
+def test_memory_not_shared():
+    """Every in memory database repository should get its own database."""
+    registry = ConnectionRegistry()
+    first = dr.SqlRepository("sqlite://", CLSFR_PROPTY, registry)
+    second = dr.SqlRepository("sqlite://", CLSFR_PROPTY, registry)
+    first.save(td.CLSFR_VALID_DF[0])
+    with pytest.raises(StopIteration):
+        next(second.query(second.query_all, 10))
+
+
+def test_shared_engine(registry):
+    """Repositories of the same database should share its engine."""
+    db_loc = f"sqlite:///{DB_PATH}"
+    pubmed_repo = dr.SqlRepository(db_loc, PUBMED_PROPTY, registry)
+    clsfr_repo = dr.SqlRepository(db_loc, CLSFR_PROPTY, registry)
+    # pylint: disable=protected-access
+    assert pubmed_repo._engine is clsfr_repo._engine
+    clsfr_repo.save(td.CLSFR_VALID_DF[0])
+    # Existing tables are reused
+    reopened = dr.SqlRepository(db_loc, CLSFR_PROPTY, registry)
+    assert len(next(reopened.query(reopened.query_all, 10))) == 1
+
+
+def test_concurrent_engine(registry):
+    """Concurrent requests should get the same engine."""
+    db_loc = f"sqlite:///{DB_PATH}"
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        engines = list(executor.map(registry.engine, [db_loc] * 32))
+    assert all(engine is engines[0] for engine in engines)
+    registry.dispose()
+    assert registry.engine(db_loc) is not engines[0]
+
+
+def test_missing_credentials(registry):
+    """Missing credentials should raise connection error."""
+    with pytest.raises(ConnectionError):
+        registry.credentials(os.path.join(get_test_output_path(), "missing.json"))
@@ -0,0 +1,206 @@
+"""Module to test the CTD releases scraper."""
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import gzip
+import os
+import shutil
+import threading
+import pytest
+from geniepy.datamgmt.cache import RawCache
+from geniepy.datamgmt.parsers import CtdParser
+from geniepy.datamgmt.scrapers import CtdScraper
+from geniepy.errors import ScraperError
+from tests import get_resources_path, get_test_output_path
+from tests.resources.mock import TEST_CHUNKSIZE
+
+OUTPUT_PATH = os.path.join(get_test_output_path(), "ctd_scraper")
+SAMPLE_PATH = os.path.join(get_resources_path(), "sample_ctd_db.csv")
+COMMENTS = (
+    "# Comparative Toxicogenomics Database (CTD)\n"
+    "#\n"
+    "# Fields:\n"
+    "# " + ",".join(CtdScraper.CSV_COLUMNS) + "\n"
+    "#\n"
+)
+"""Comment header of CTD releases."""
+
+
+def read_records() -> [str]:
+    """Read the records lines of the sample CTD file."""
+    with open(SAMPLE_PATH) as sample_file:
+        return sample_file.readlines()[1:]
+
+
+def write_release(path: str, records: [str]):
+    """Write gzipped CTD release with comment header."""
+    with gzip.open(path, "wt") as release_file:
+        release_file.write(COMMENTS + "".join(records))
+
+
+@pytest.fixture
+def output_path():
+    """Generate fresh output directory."""
+    shutil.rmtree(OUTPUT_PATH, ignore_errors=True)
+    os.makedirs(OUTPUT_PATH)
+    yield OUTPUT_PATH
+    shutil.rmtree(OUTPUT_PATH, ignore_errors=True)
+
+
+class ReleaseHandler(BaseHTTPRequestHandler):
+    """Serve the CTD release of the server, honoring ETag conditional requests."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Reply with release or 304 if unchanged."""
+        self.server.requests += 1
+        if self.path != "/CTD_genes_diseases.csv.gz":
+            self.send_error(404)
+            return
+        etag = f'"{self.server.version}"'
+        if self.server.conditional and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        with open(self.server.release_path, "rb") as release_file:
+            body = release_file.read()
+        self.server.downloads += 1
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Silence requests log."""
+
+
+@pytest.fixture
+def server(output_path):
+    """Start local http server standing in for the CTD website."""
+    httpd = HTTPServer(("127.0.0.1", 0), ReleaseHandler)
+    httpd.release_path = os.path.join(output_path, "served.csv.gz")
+    httpd.version = 1
+    httpd.conditional = True
+    httpd.requests = 0
+    httpd.downloads = 0
+    write_release(httpd.release_path, read_records())
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestCtdScraper:
+    """Pytest CTD scraper class."""
+
+    def test_missing_file(self, output_path):
+        """Scraping a missing file should raise scraper error."""
+        scraper = CtdScraper(os.path.join(output_path, "missing.csv.gz"))
+        with pytest.raises(ScraperError):
+            next(scraper.scrape(TEST_CHUNKSIZE))
+
+    @pytest.mark.parametrize("chunksize", [1, TEST_CHUNKSIZE, 1000])
+    def test_scrape_local(self, output_path, chunksize):
+        """Scraper should skip comments and yield csv chunks with header."""
+        records = read_records()
+        release_path = os.path.join(output_path, "CTD_genes_diseases.csv.gz")
+        write_release(release_path, records)
+        scraper = CtdScraper(release_path)
+        chunks = list(scraper.scrape(chunksize))
+        assert len(chunks) == -(-len(records) // chunksize)
+        assert all(chunk.startswith(CtdScraper.HEADER) for chunk in chunks)
+        lines = [line for chunk in chunks for line in chunk.splitlines(True)[1:]]
+        assert lines == records
+        parsed = CtdParser.parse(chunks[0])
+        assert len(parsed) == min(chunksize, len(records))
+
+    def test_plain_header(self):
+        """Local extracts with a plain header line should be scraped."""
+        scraper = CtdScraper(SAMPLE_PATH)
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        assert sum(len(chunk.splitlines()) - 1 for chunk in chunks) == len(
+            read_records()
+        )
+
+    def test_unchanged_local(self, output_path):
+        """Unchanged local releases should be skipped."""
+        records = read_records()
+        release_path = os.path.join(output_path, "CTD_genes_diseases.csv.gz")
+        state_path = os.path.join(output_path, "state", "ctd_release.json")
+        write_release(release_path, records)
+        scraper = CtdScraper(release_path, state_path)
+        # Interrupted scrapes don't record the release
+        next(scraper.scrape(1))
+        assert scraper.read_state() == {}
+        assert list(scraper.scrape(TEST_CHUNKSIZE))
+        # Scraped releases are only recorded once committed, i.e. saved
+        assert scraper.read_state() == {}
+        assert list(scraper.scrape(TEST_CHUNKSIZE))
+        scraper.commit()
+        assert scraper.read_state()["sha256"] == scraper.checksum()
+        assert not list(scraper.scrape(TEST_CHUNKSIZE))
+        write_release(release_path, records[:-1])
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        assert sum(len(chunk.splitlines()) - 1 for chunk in chunks) == len(records) - 1
+
+    def test_scrape_remote(self, server, output_path):
+        """Remote releases should be skipped while their ETag is unchanged."""
+        records = read_records()
+        url = f"http://127.0.0.1:{server.server_port}/CTD_genes_diseases.csv.gz"
+        state_path = os.path.join(output_path, "ctd_release.json")
+        scraper = CtdScraper(url, state_path)
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        lines = [line for chunk in chunks for line in chunk.splitlines(True)[1:]]
+        assert lines == records
+        scraper.commit()
+        assert scraper.read_state()["etag"] == '"1"'
+        assert not list(scraper.scrape(TEST_CHUNKSIZE))
+        server.version = 2
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        # Partially saved releases aren't committed
+        scraper.commit(len(chunks) - 1)
+        assert scraper.read_state()["etag"] == '"1"'
+        scraper.commit(len(chunks))
+        assert scraper.read_state()["etag"] == '"2"'
+        assert server.requests == 3
+
+    def test_unconditional_remote(self, server, output_path):
+        """Unchanged releases should be skipped if served despite their ETag."""
+        url = f"http://127.0.0.1:{server.server_port}/CTD_genes_diseases.csv.gz"
+        scraper = CtdScraper(url, os.path.join(output_path, "ctd_release.json"))
+        assert list(scraper.scrape(TEST_CHUNKSIZE))
+        scraper.commit()
+        # Server ignoring the conditional request
+        server.conditional = False
+        assert not list(scraper.scrape(TEST_CHUNKSIZE))
+        assert server.downloads == 2
+        assert scraper.read_state()["etag"] == '"1"'
+
+    def test_remote_error(self, server):
+        """Download errors should raise scraper error."""
+        url = f"http://127.0.0.1:{server.server_port}/missing.csv.gz"
+        with pytest.raises(ScraperError):
+            next(CtdScraper(url).scrape(TEST_CHUNKSIZE))
+
+    def test_cached_remote(self, server, output_path):
+        """Retried scrapes of a release should read it from the cache."""
+        records = read_records()
+        url = f"http://127.0.0.1:{server.server_port}/CTD_genes_diseases.csv.gz"
+        cache = RawCache(os.path.join(output_path, "cache"))
+        scraper = CtdScraper(url, os.path.join(output_path, "state.json"), cache)
+        # Interrupted scrape, i.e. failed job
+        next(scraper.scrape(1))
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        lines = [line for chunk in chunks for line in chunk.splitlines(True)[1:]]
+        assert lines == records
+        assert server.requests == 2
+        assert server.downloads == 1
+        assert cache.size() == os.path.getsize(server.release_path)
+        scraper.commit()
+        assert not list(scraper.scrape(TEST_CHUNKSIZE))
+        # New release replaces cached one
+        server.version = 2
+        assert list(scraper.scrape(TEST_CHUNKSIZE))
+        scraper.commit()
+        assert server.downloads == 2
+        assert scraper.read_state()["etag"] == '"2"'
+        assert cache.lookup(url)["meta"]["etag"] == '"2"'
@@ -66,4 +66,11 @@ class TestDaoManager:
         # Read data back from output tables to make sure records were saved
         clsfr_dao = self.dao_mgr._classifier_dao
         saved_df = next(clsfr_dao.query(clsfr_dao.query_all, TEST_CHUNKSIZE))
-        assert saved_df.equals(predictions_df)
+        # Predictions are upserted, last prediction of each digest is kept
+        expected_df = predictions_df.drop_duplicates("digest", keep="last")
+        expected_df = expected_df.sort_values("digest").reset_index(drop=True)
+        assert saved_df.equals(expected_df)
+        # Saving predictions again doesn't duplicate them
+        self.dao_mgr.save_predictions(predictions_df)
+        saved_df = next(clsfr_dao.query(clsfr_dao.query_all, TEST_CHUNKSIZE))
+        assert saved_df.equals(expected_df)
@@ -0,0 +1,43 @@
+"""Module to test key level release deltas."""
+import pandas as pd
+import geniepy.datamgmt.delta as dd
+
+RELEASE = pd.DataFrame(
+    {"digest": ["a", "b", "a", "c", "a"], "pmids": ["1", "2", "3", "4|5", "6"]}
+)
+
+
+def test_fingerprint_order_independent():
+    """Fingerprints should not depend on rows order or chunking."""
+    whole = dd.fingerprint(RELEASE, "digest", "pmids")
+    shuffled = RELEASE.iloc[[4, 2, 0, 3, 1]]
+    chunks = [shuffled.iloc[:2], shuffled.iloc[2:3], shuffled.iloc[3:]]
+    folded = dd.accumulate([dd.fingerprint(df, "digest", "pmids") for df in chunks])
+    assert folded.loc[whole.index].equals(whole)
+    assert list(whole.rows) == [3, 1, 1]
+    assert str(whole.hash.dtype) == "uint64"
+
+
+def test_compare():
+    """Compare should classify inserted, updated, deleted and unchanged keys."""
+    previous = dd.fingerprint(RELEASE, "digest", "pmids")
+    release = RELEASE.drop(index=[3, 4]).append(
+        pd.DataFrame({"digest": ["b", "d"], "pmids": ["2", "7"]}), ignore_index=True
+    )
+    summary = dd.compare(previous, dd.fingerprint(release, "digest", "pmids"))
+    assert list(summary.inserted) == ["d"]
+    assert sorted(summary.updated) == ["a", "b"]
+    assert list(summary.deleted) == ["c"]
+    assert summary.unchanged == 0
+    assert sorted(summary.removed) == ["a", "b", "c"]
+    assert sorted(summary.changed) == ["a", "b", "d"]
+    assert summary
+
+
+def test_compare_unchanged():
+    """Identical releases should have an empty delta."""
+    current = dd.fingerprint(RELEASE, "digest", "pmids")
+    summary = dd.compare(current, dd.accumulate([current]))
+    assert not summary
+    assert summary.unchanged == 3
+    assert not dd.compare(dd.accumulate([]), dd.accumulate([]))
@@ -0,0 +1,209 @@
+"""Module to test the E-utilities efetch scraper against a local stand-in server."""
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+import asyncio
+import os
+import shutil
+import threading
+import time
+import pytest
+import geniepy.datamgmt.daos as daos
+import geniepy.datamgmt.repositories as dr
+from geniepy.datamgmt import DaoManager
+from geniepy.datamgmt.cache import RawCache
+from geniepy.datamgmt.scrapers import EfetchScraper, TokenBucket
+from geniepy.datamgmt.tables import PUBMED_PROPTY, CTD_PROPTY, CLSFR_PROPTY
+from geniepy.errors import ScraperError
+import tests.resources.mock as mock
+from tests import get_resources_path, get_test_output_path
+from tests.resources.mock import TEST_CHUNKSIZE
+
+with open(os.path.join(get_resources_path(), "sample_article1.xml")) as sample:
+    TEMPLATE = sample.read().split("\n", 1)[1]
+"""Sample article, its PMID is replaced by the requested ones."""
+UNKNOWN_PMID = 1000
+"""PMIDs from this one on are unknown to the stand-in server."""
+
+
+class EfetchHandler(BaseHTTPRequestHandler):
+    """Serve article sets of the requested PMIDs, failing the first requests."""
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Reply with the article set of the requested PMIDs."""
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        with self.server.lock:
+            self.server.requests.append(form)
+            failing = self.server.failures > 0
+            self.server.failures -= 1
+        if failing:
+            self.send_error(503)
+            return
+        pmids = [int(pmid) for pmid in form["id"][0].split(",")]
+        articles = [
+            TEMPLATE.replace('<PMID Version="1">1</PMID>', f"<PMID>{pmid}</PMID>", 1)
+            for pmid in pmids
+            if pmid < UNKNOWN_PMID
+        ]
+        body = (
+            '<?xml version="1.0" ?>\n<PubmedArticleSet>\n'
+            + "".join(articles)
+            + "</PubmedArticleSet>\n"
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Silence requests log."""
+
+
+class EfetchServer(ThreadingMixIn, HTTPServer):
+    """Threaded efetch stand-in server."""
+
+    daemon_threads = True
+
+
+@pytest.fixture
+def server():
+    """Start local http server standing in for E-utilities."""
+    # Scraping requires the optional aiohttp dependency
+    pytest.importorskip("aiohttp")
+    httpd = EfetchServer(("127.0.0.1", 0), EfetchHandler)
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.failures = 0
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}/efetch.fcgi"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def article_pmids(chunks) -> [int]:
+    """Return PMIDs of scraped articles."""
+    return [
+        int(article.find("MedlineCitation/PMID").text)
+        for chunk in chunks
+        for article in chunk
+    ]
+
+
+def test_token_bucket():
+    """Token bucket should space requests by its rate after the initial burst."""
+    bucket = TokenBucket(rate=50, capacity=2)
+
+    async def acquire_all():
+        start = asyncio.get_event_loop().time()
+        for _ in range(7):
+            await bucket.acquire()
+        return asyncio.get_event_loop().time() - start
+
+    loop = asyncio.new_event_loop()
+    try:
+        elapsed = loop.run_until_complete(acquire_all())
+    finally:
+        loop.close()
+    # 2 tokens burst, then 5 tokens at 50 per second
+    assert elapsed >= 0.09
+
+
+class TestEfetchScraper:
+    """Pytest efetch scraper class."""
+
+    def test_batches(self):
+        """PMIDs should be validated, deduplicated and split in batches of 200."""
+        scraper = EfetchScraper(batch_size=500)
+        batches = scraper.batches([*range(-1, 451), "3", 3])
+        assert [len(batch) for batch in batches] == [200, 200, 50]
+        assert batches[0][:3] == ["1", "2", "3"]
+
+    def test_scrape(self, server):
+        """Scraper should fetch every known PMID, spreading batches across keys."""
+        scraper = EfetchScraper(["key1", "key2"], server.url, rate=20, batch_size=7)
+        pmids = [*range(1, 31), UNKNOWN_PMID, UNKNOWN_PMID + 1]
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE, pmids=pmids))
+        assert all(0 < len(chunk) <= TEST_CHUNKSIZE for chunk in chunks)
+        assert sorted(article_pmids(chunks)) == [*range(1, 31)]
+        assert len(server.requests) == 5
+        keys = sorted(form["api_key"][0] for form in server.requests)
+        assert keys == ["key1", "key1", "key1", "key2", "key2"]
+        assert all(form["db"] == ["pubmed"] for form in server.requests)
+
+    def test_scrape_nothing(self, server):
+        """Scraping no PMIDs should not send any request."""
+        assert not list(EfetchScraper(url=server.url).scrape(TEST_CHUNKSIZE))
+        assert not server.requests
+
+    def test_rate_limit(self, server):
+        """Requests of a key should be rate limited."""
+        scraper = EfetchScraper(url=server.url, rate=20, batch_size=1)
+        start = time.perf_counter()
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE, pmids=range(1, 6)))
+        elapsed = time.perf_counter() - start
+        assert len(article_pmids(chunks)) == 5
+        assert "api_key" not in server.requests[0]
+        # First request is sent right away, then one every 50ms
+        assert elapsed >= 0.19
+
+    def test_retry(self, server):
+        """Failed requests should be retried."""
+        server.failures = 2
+        scraper = EfetchScraper(url=server.url, rate=100, backoff=0.01)
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE, pmids=[1, 2]))
+        assert article_pmids(chunks) == [1, 2]
+        assert len(server.requests) == 3
+
+    def test_failure(self, server):
+        """Requests failing more than max retries should raise scraper error."""
+        server.failures = 10
+        scraper = EfetchScraper(url=server.url, rate=100, max_retries=1, backoff=0.01)
+        with pytest.raises(ScraperError):
+            list(scraper.scrape(TEST_CHUNKSIZE, pmids=[1, 2]))
+        assert len(server.requests) == 2
+
+    def test_cached(self, server):
+        """Cached responses should not be requested again."""
+        cache_path = os.path.join(get_test_output_path(), "efetch_cache")
+        shutil.rmtree(cache_path, ignore_errors=True)
+        cache = RawCache(cache_path)
+        scraper = EfetchScraper(url=server.url, rate=100, batch_size=2, cache=cache)
+        first = article_pmids(scraper.scrape(TEST_CHUNKSIZE, pmids=[1, 2, 3]))
+        assert len(server.requests) == 2
+        second = article_pmids(scraper.scrape(TEST_CHUNKSIZE, pmids=[1, 2, 3, 4]))
+        assert len(server.requests) == 3
+        assert first == [1, 2, 3] and second == [1, 2, 3, 4]
+        shutil.rmtree(cache_path, ignore_errors=True)
+
+
+def test_fetch_missing_pubmeds(server):
+    """Dao manager should fetch the PMIDs found missing while generating records."""
+    ctd_dao = daos.CtdDao(dr.SqlRepository("sqlite://", CTD_PROPTY))
+    # pylint: disable=protected-access
+    ctd_dao._parser.scraper = mock.MockCtdScraper()
+    pubmed_dao = daos.PubMedDao(dr.SqlRepository("sqlite://", PUBMED_PROPTY))
+    classifier_dao = daos.ClassifierDao(dr.SqlRepository("sqlite://", CLSFR_PROPTY))
+    dao_mgr = DaoManager(
+        ctd_dao=ctd_dao,
+        pubmed_dao=pubmed_dao,
+        classifier_dao=classifier_dao,
+        efetch_scraper=EfetchScraper(url=server.url, rate=100),
+    )
+    ctd_dao.download(TEST_CHUNKSIZE)
+    for _ in dao_mgr.gen_records(TEST_CHUNKSIZE):
+        pass
+    missing = set(dao_mgr.missing_pmids)
+    assert 1 in missing and 24552493 in missing
+    known = {pmid for pmid in missing if 0 < pmid < UNKNOWN_PMID}
+    assert dao_mgr.fetch_missing_pubmeds(TEST_CHUNKSIZE) == len(known)
+    assert not dao_mgr.missing_pmids
+    saved = next(pubmed_dao.query(pubmed_dao.query_all, 1000))
+    assert set(saved.pmid) == known
+    # Records now include the fetched articles
+    records = next(dao_mgr.gen_records(100))
+    assert not records.pubmeds[0].empty
+    assert dao_mgr.missing_pmids == missing - known
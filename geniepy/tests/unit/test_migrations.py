@@ -0,0 +1,41 @@
+"""Module to test repository migrations."""
+from geniepy.datamgmt.daos import CtdDao, CompactCtdDao
+from geniepy.datamgmt.migrations import compact_gbq_query, migrate_to_compact
+from geniepy.datamgmt.parsers import compact_digest
+import geniepy.datamgmt.repositories as dr
+from geniepy.datamgmt.tables import (  # pylint: disable=bad-continuation
+    CTD_PROPTY,
+    CTD_COMPACT_PROPTY,
+    CTD_DAO_TABLE,
+    CTD_COMPACT_DAO_TABLE,
+)
+from tests.resources.mock import MockCtdScraper, TEST_CHUNKSIZE
+
+
+def test_migrate_to_compact():
+    """Migrated records should match the records parsed with compact digests."""
+    source = dr.SqlRepository("sqlite://", CTD_PROPTY)
+    target = dr.SqlRepository("sqlite://", CTD_COMPACT_PROPTY)
+    hex_dao = CtdDao(source)
+    hex_dao._parser.scraper = MockCtdScraper()
+    hex_dao.download(TEST_CHUNKSIZE)
+    assert migrate_to_compact(source, target, TEST_CHUNKSIZE) == 21
+    hex_df = next(source.query(source.query_all, 100))
+    compact_df = next(CompactCtdDao(target).query(target.query_all, 100))
+    # Records are queried ordered by digest, compact digests sort differently
+    compact_digests = [compact_digest(d) for d in hex_df.digest]
+    order = sorted(range(len(hex_df)), key=lambda pos: compact_digests[pos])
+    hex_df = hex_df.iloc[order].reset_index(drop=True)
+    assert compact_df.digest.tolist() == [compact_digests[pos] for pos in order]
+    assert compact_df.drop(columns="digest").equals(hex_df.drop(columns="digest"))
+    # Compact digests are queried as integers
+    digest = compact_df.digest[0]
+    assert not next(target.query(target.query_pkey(int(digest)), 1)).empty
+
+
+def test_compact_gbq_query():
+    """Query should convert the digest and copy the other columns."""
+    query = compact_gbq_query("Genie", CTD_DAO_TABLE, CTD_COMPACT_DAO_TABLE)
+    assert query.startswith("CREATE OR REPLACE TABLE Genie.ctd_compact AS SELECT")
+    assert "AS INT64) AS digest, genesymbol, geneid" in query
+    assert query.endswith("FROM Genie.ctd;")
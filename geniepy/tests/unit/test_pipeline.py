@@ -0,0 +1,85 @@
+"""Module to test the staged scrape/parse pipeline."""
+import time
+import pytest
+from geniepy.datamgmt.pipeline import Pipeline
+from geniepy.errors import GeniePyError, ParserError
+
+
+def parse_chunk(chunk: [int]) -> [int]:
+    """Parse chunk, slower for even chunks to shuffle completion order."""
+    if chunk[0] % 2 == 0:
+        time.sleep(0.01)
+    return [value * 2 for value in chunk]
+
+
+def parse_invalid(chunk: [int]) -> [int]:
+    """Fail parsing third chunk."""
+    if chunk[0] == 2:
+        raise ParserError("Invalid chunk")
+    return chunk
+
+
+def scrape(count: int):
+    """Generate single value chunks."""
+    for value in range(count):
+        yield [value]
+
+
+def scrape_invalid(count: int):
+    """Fail after scraping some chunks."""
+    yield from scrape(count)
+    raise GeniePyError("Connection lost")
+
+
+class TestPipeline:
+    """Pytest pipeline class."""
+
+    @pytest.mark.parametrize("parse_workers", [0, 2])
+    def test_ordered(self, parse_workers):
+        """Ordered pipeline should yield chunks in scraped order."""
+        pipeline = Pipeline(parse_workers=parse_workers, queue_size=2)
+        actual = list(pipeline.run(scrape(20), parse_chunk))
+        assert actual == [[value * 2] for value in range(20)]
+
+    @pytest.mark.parametrize("parse_workers", [0, 2])
+    def test_unordered(self, parse_workers):
+        """Unordered pipeline should yield every parsed chunk."""
+        pipeline = Pipeline(parse_workers=parse_workers, queue_size=2, ordered=False)
+        actual = list(pipeline.run(scrape(20), parse_chunk))
+        assert sorted(actual) == [[value * 2] for value in range(20)]
+
+    @pytest.mark.parametrize("parse_workers", [0, 2])
+    def test_parse_error(self, parse_workers):
+        """Parser errors should be raised after preceding chunks."""
+        pipeline = Pipeline(parse_workers=parse_workers, queue_size=1)
+        generator = pipeline.run(scrape(10), parse_invalid)
+        assert next(generator) == [0]
+        assert next(generator) == [1]
+        with pytest.raises(ParserError):
+            next(generator)
+
+    def test_scrape_error(self):
+        """Scraper errors should be raised after scraped chunks."""
+        pipeline = Pipeline(parse_workers=0)
+        generator = pipeline.run(scrape_invalid(3), parse_chunk)
+        assert [next(generator) for _ in range(3)] == [[0], [2], [4]]
+        with pytest.raises(GeniePyError):
+            next(generator)
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_backpressure(self, ordered):
+        """Scraper should not run ahead of consumer more than the queue bounds."""
+        scraped = []
+
+        def tracked_scrape():
+            for chunk in scrape(20):
+                scraped.append(chunk)
+                yield chunk
+
+        pipeline = Pipeline(parse_workers=0, queue_size=3, ordered=ordered)
+        generator = pipeline.run(tracked_scrape(), parse_chunk)
+        next(generator)
+        time.sleep(0.2)
+        # Consumed chunk, queued chunks and the chunk waiting for a free slot
+        assert len(scraped) <= 5
+        generator.close()
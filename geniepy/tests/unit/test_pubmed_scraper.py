@@ -0,0 +1,173 @@
+"""Module to test the PubMed local mirror scraper."""
+import gzip
+import os
+import shutil
+import pytest
+from geniepy.datamgmt.daos import PubMedDao
+from geniepy.datamgmt.scrapers import PubMedScraper
+from geniepy.datamgmt.tables import PUBMED_PROPTY
+from geniepy.errors import DaoError, ScraperError
+from geniepy.pubmed import PubMedRecord
+import geniepy.datamgmt.repositories as dr
+from tests import get_resources_path, get_test_output_path
+from tests.resources.mock import TEST_CHUNKSIZE
+
+MIRROR_PATH = os.path.join(get_test_output_path(), "pubmed_mirror")
+MIRROR_FILES = {
+    "baseline/pubmed20n0001.xml.gz": "sample_articleset1.xml",
+    "baseline/pubmed20n0002.xml.gz": "sample_articleset2.xml",
+    "updatefiles/pubmed20n1016.xml.gz": "sample_articleset3.xml",
+}
+"""Mirror article sets and their sample article set."""
+
+
+def add_article_set(name: str, sample: str):
+    """Compress sample article set into mirror."""
+    target_path = os.path.join(MIRROR_PATH, name)
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    sample_path = os.path.join(get_resources_path(), sample)
+    with open(sample_path, "rb") as sample_file:
+        with gzip.open(target_path, "wb") as target_file:
+            shutil.copyfileobj(sample_file, target_file)
+
+
+@pytest.fixture
+def mirror():
+    """Generate fresh local mirror with two baseline files and an update file."""
+    shutil.rmtree(MIRROR_PATH, ignore_errors=True)
+    for name, sample in MIRROR_FILES.items():
+        add_article_set(name, sample)
+    yield MIRROR_PATH
+    shutil.rmtree(MIRROR_PATH, ignore_errors=True)
+
+
+def count_articles(sample: str) -> int:
+    """Count articles of sample article set."""
+    with open(os.path.join(get_resources_path(), sample), "rb") as sample_file:
+        return sample_file.read().count(b"<PubmedArticle>")
+
+
+class TestPubMedScraper:
+    """Pytest PubMed scraper class."""
+
+    def test_missing_mirror(self):
+        """Scraping a missing mirror should raise scraper error."""
+        scraper = PubMedScraper(os.path.join(MIRROR_PATH, "missing"))
+        with pytest.raises(ScraperError):
+            next(scraper.scrape(TEST_CHUNKSIZE))
+
+    def test_list_files(self, mirror):
+        """Baseline files should be listed before update files."""
+        scraper = PubMedScraper(mirror)
+        assert scraper.list_files() == list(MIRROR_FILES)
+
+    def test_scrape(self, mirror):
+        """Scraper should yield all records in chunks not spanning files."""
+        scraper = PubMedScraper(mirror)
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        assert all(0 < len(chunk) <= TEST_CHUNKSIZE for chunk in chunks)
+        assert all(isinstance(rec, PubMedRecord) for chunk in chunks for rec in chunk)
+        expected = [count_articles(sample) for sample in MIRROR_FILES.values()]
+        expected_chunks = sum(-(-count // TEST_CHUNKSIZE) for count in expected)
+        assert len(chunks) == expected_chunks
+        assert sum(len(chunk) for chunk in chunks) == sum(expected)
+        # Files are only added to manifest once committed, i.e. saved
+        assert scraper.read_manifest() == {}
+        scraper.commit()
+        manifest = scraper.read_manifest()
+        assert list(manifest) == list(MIRROR_FILES)
+        assert [entry["articles"] for entry in manifest.values()] == expected
+        assert os.path.exists(os.path.join(mirror, PubMedScraper.MANIFEST_NAME))
+
+    def test_rescrape(self, mirror):
+        """Rescraping should only read new update files."""
+        scraper = PubMedScraper(mirror)
+        for _ in scraper.scrape(TEST_CHUNKSIZE):
+            pass
+        scraper.commit()
+        assert not list(scraper.scrape(TEST_CHUNKSIZE))
+        add_article_set("updatefiles/pubmed20n1017.xml.gz", "sample_articleset1.xml")
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        expected = count_articles("sample_articleset1.xml")
+        assert sum(len(chunk) for chunk in chunks) == expected
+        scraper.commit()
+        assert "updatefiles/pubmed20n1017.xml.gz" in scraper.read_manifest()
+
+    def test_rescrape_replaced(self, mirror):
+        """Files replaced with same size should be scraped again."""
+        scraper = PubMedScraper(mirror)
+        for _ in scraper.scrape(TEST_CHUNKSIZE):
+            pass
+        scraper.commit()
+        name = "baseline/pubmed20n0001.xml.gz"
+        path = os.path.join(mirror, name)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        expected = count_articles(MIRROR_FILES[name])
+        assert sum(len(chunk) for chunk in chunks) == expected
+        scraper.commit()
+        assert scraper.read_manifest()[name]["mtime"] == os.stat(path).st_mtime_ns
+
+    def test_partial_commit(self, mirror):
+        """Files should only be added to manifest once all their chunks are saved."""
+        scraper = PubMedScraper(mirror)
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        first = -(-count_articles(next(iter(MIRROR_FILES.values()))) // TEST_CHUNKSIZE)
+        scraper.commit(first - 1)
+        assert scraper.read_manifest() == {}
+        scraper.commit(first)
+        assert list(scraper.read_manifest()) == list(MIRROR_FILES)[:1]
+        scraper.commit(len(chunks))
+        assert list(scraper.read_manifest()) == list(MIRROR_FILES)
+
+    def test_interrupted(self, mirror):
+        """Partially scraped files should not be added to manifest."""
+        manifest_path = os.path.join(mirror, "custom_manifest.json")
+        scraper = PubMedScraper(mirror, manifest_path)
+        generator = scraper.scrape(1)
+        next(generator)
+        next(generator)
+        generator.close()
+        scraper.commit()
+        assert scraper.read_manifest() == {}
+        chunks = list(scraper.scrape(TEST_CHUNKSIZE))
+        total = sum(count_articles(sample) for sample in MIRROR_FILES.values())
+        assert sum(len(chunk) for chunk in chunks) == total
+        scraper.commit()
+        assert os.path.exists(manifest_path)
+
+    def test_download(self, mirror):
+        """Dao should download all mirror articles through injected scraper."""
+        scraper = PubMedScraper(mirror, engine="etree")
+        test_dao = PubMedDao(dr.SqlRepository("sqlite://", PUBMED_PROPTY), scraper)
+        # Scraper is injected in the dao's own parser
+        # pylint: disable=protected-access
+        assert test_dao._parser.scraper is scraper
+        assert PubMedDao._parser.scraper is not scraper
+        test_dao.download(TEST_CHUNKSIZE)
+        # Articles found again in later files replace the saved ones
+        counter = PubMedScraper(mirror, os.path.join(mirror, "count.json"))
+        pmids = {rec.pmid for chunk in counter.scrape(TEST_CHUNKSIZE) for rec in chunk}
+        saved = next(test_dao.query(test_dao.query_all, 100))
+        assert sorted(saved.pmid) == sorted(int(pmid) for pmid in pmids)
+        assert list(scraper.read_manifest()) == list(MIRROR_FILES)
+
+    def test_failed_download(self, mirror, monkeypatch):
+        """Files of failed saves should be scraped again by the next download."""
+        scraper = PubMedScraper(mirror, engine="etree")
+        test_dao = PubMedDao(dr.SqlRepository("sqlite://", PUBMED_PROPTY), scraper)
+        first = -(-count_articles(next(iter(MIRROR_FILES.values()))) // TEST_CHUNKSIZE)
+        save = dr.SqlRepository.save
+        saved = []
+
+        def failing_save(repository, payload, mode="append"):
+            if len(saved) == first:
+                raise DaoError("Failed save")
+            saved.append(len(payload))
+            save(repository, payload, mode)
+
+        monkeypatch.setattr(dr.SqlRepository, "save", failing_save)
+        with pytest.raises(DaoError):
+            test_dao.download(TEST_CHUNKSIZE)
+        assert list(scraper.read_manifest()) == list(MIRROR_FILES)[:1]
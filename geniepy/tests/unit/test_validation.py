@@ -0,0 +1,110 @@
+"""Module to test vectorized schema validation."""
+import pickle
+import numpy as np
+import pandas as pd
+from geniepy.datamgmt.tables import CTD_DAO_TABLE, PUBMED_DAO_TABLE
+from geniepy.datamgmt.validation import Column, Schema, ValidationSummary
+import tests.testdata as td
+
+
+class TestSchema:
+    """Pytest vectorized schema class."""
+
+    schema = Schema.from_table(
+        CTD_DAO_TABLE, dtypes={"geneid": np.int64}, patterns={"diseaseid": "^D[0-9]+$"}
+    )
+
+    def test_from_table(self):
+        """Nullability should be taken from table definition."""
+        columns = {column.name: column for column in self.schema.columns}
+        assert list(columns) == [column.name for column in CTD_DAO_TABLE.columns]
+        assert not columns["digest"].nullable
+        assert columns["genesymbol"].nullable
+        assert columns["geneid"] == Column("geneid", np.int64, None, False)
+
+    def test_valid(self):
+        """Valid dataframe should return empty summary."""
+        summary = self.schema.validate(td.CTD_VALID_DF[0])
+        assert isinstance(summary, ValidationSummary)
+        assert not summary
+        assert summary.num_invalid_rows == 0
+
+    def test_invalid_columns(self):
+        """Dataframe with different columns should be invalid."""
+        summary = self.schema.validate(pd.DataFrame({"invalid": [1, 2]}))
+        assert len(summary) == 1
+
+    def test_summary(self):
+        """Summary should count invalid values and keep first invalid rows."""
+        payload = pd.concat([td.CTD_VALID_DF[0]] * 20, ignore_index=True)
+        payload.loc[[3, 5, 7], "diseaseid"] = "MESH:D000014"
+        payload.loc[[5, 11], "pmids"] = None
+        summary = self.schema.validate(payload, max_rows=2)
+        assert summary
+        assert summary.counts == {("diseaseid", "pattern"): 3, ("pmids", "nullable"): 2}
+        assert summary.num_invalid_rows == 4
+        assert summary.invalid_rows.index.tolist() == [3, 5]
+        assert "4 invalid rows" in str(summary)
+
+    def test_categorical_pattern(self):
+        """Patterns should be checked on categorical columns."""
+        payload = td.CTD_VALID_DF[0].copy()
+        payload["diseaseid"] = payload.diseaseid.astype("category")
+        assert not self.schema.validate(payload)
+        payload["diseaseid"] = pd.Categorical(["X1"])
+        assert self.schema.validate(payload).counts == {("diseaseid", "pattern"): 1}
+
+    def test_validated_mark(self):
+        """Valid dataframes should be marked until reshaped."""
+        payload = td.CTD_VALID_DF[0].copy()
+        Schema.unmark(payload)
+        assert not self.schema.is_validated(payload)
+        assert not self.schema.validate(payload)
+        assert self.schema.is_validated(payload)
+        assert not self.schema.is_validated(pd.concat([payload] * 2))
+        payload["geneid"] = payload.geneid.astype(float)
+        assert not self.schema.is_validated(payload)
+
+    def test_copies_not_validated(self):
+        """Marks carried over to copies and derived dataframes should not count."""
+        payload = pd.concat(td.CTD_VALID_DF[:2], ignore_index=True)
+        assert not self.schema.validate(payload)
+        assert self.schema.is_validated(payload)
+        modified = payload.copy()
+        assert not self.schema.is_validated(modified)
+        assert not self.schema.is_validated(payload[::-1].reset_index(drop=True))
+
+    def test_adopt(self):
+        """Dataframes carrying a matching mark should be adoptable."""
+        payload = td.CTD_VALID_DF[0].copy()
+        self.schema.validate(payload)
+        received = pickle.loads(pickle.dumps(payload))
+        assert not self.schema.is_validated(received)
+        assert self.schema.adopt(received)
+        assert self.schema.is_validated(received)
+        unvalidated = td.CTD_VALID_DF[0].copy()
+        Schema.unmark(unvalidated)
+        assert not self.schema.adopt(unvalidated)
+        assert not self.schema.is_validated(unvalidated)
+
+    def test_unmark(self):
+        """Unmarked dataframes should not be considered validated."""
+        payload = td.CTD_VALID_DF[0].copy()
+        self.schema.validate(payload)
+        Schema.unmark(payload)
+        assert not self.schema.is_validated(payload)
+
+    def test_invalid_not_marked(self):
+        """Invalid dataframes should not be marked."""
+        payload = td.CTD_VALID_DF[0].copy()
+        payload["diseaseid"] = "MESH:D000014"
+        assert self.schema.validate(payload)
+        assert not self.schema.is_validated(payload)
+
+    def test_list_columns(self):
+        """List of strings columns should be required to hold lists."""
+        schema = Schema.from_table(PUBMED_DAO_TABLE)
+        payload = td.PUBMED_VALID_DF[0].copy()
+        assert not schema.validate(payload)
+        payload["authors"] = "Weemaes, Matthias"
+        assert schema.validate(payload)